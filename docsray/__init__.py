@@ -21,6 +21,7 @@ if "LLAMA_CPP_LOG_LEVEL" not in os.environ:
 from .config import FAST_MODE, STANDARD_MODE, FULL_FEATURE_MODE
 from .config import FAST_MODELS, STANDARD_MODELS, FULL_FEATURE_MODELS, ALL_MODELS
 from .config import MAX_TOKENS, DOCSRAY_HOME, DATA_DIR, MODEL_DIR, CACHE_DIR, USE_TESSERACT
+from .config import CUDA_AVAILABLE, MPS_AVAILABLE
 
 # Check if this is the first run after installation
 def check_first_run():
@@ -109,5 +110,7 @@ __all__ = [
     "FULL_FEATURE_MODELS",
     "ALL_MODELS",
     "USE_TESSERACT",
-    "MAX_TOKENS"
+    "MAX_TOKENS",
+    "CUDA_AVAILABLE",
+    "MPS_AVAILABLE"
 ]
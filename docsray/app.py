@@ -14,7 +14,7 @@ import atexit
 
 from docsray.chatbot import PDFChatBot
 from docsray.scripts import pdf_extractor, chunker, build_index, section_rep_builder
-from docsray.scripts.file_converter import FileConverter
+from docsray.scripts.file_converter import get_converter
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -74,7 +74,7 @@ def process_document_file(document_path: str) -> tuple[list, list, Optional[str]
         raise FileNotFoundError(f"Document file not found: {document_path}")
     
     # Check if file format is supported
-    converter = FileConverter()
+    converter = get_converter()
     if not converter.is_supported(document_path) and not document_path.lower().endswith('.pdf'):
         raise ValueError(f"Unsupported file format: {Path(document_path).suffix}")
     
@@ -158,7 +158,7 @@ async def health_check():
 @app.get("/supported-formats")
 async def get_supported_formats():
     """Get list of supported file formats."""
-    converter = FileConverter()
+    converter = get_converter()
     formats = converter.get_supported_formats()
     
     return {
@@ -173,7 +173,8 @@ async def get_activity():
         "processing": current_activity["processing"],
         "start_time": current_activity["start_time"],
         "request_path": current_activity["request_path"],
-        "elapsed": time.time() - current_activity["start_time"] if current_activity["start_time"] else 0
+        # Measured on the monotonic clock so wall-clock jumps can't fake a timeout
+        "elapsed": time.monotonic() - current_activity["started_at"] if current_activity.get("started_at") else 0
     }
 
 @app.get("/cache/info")
@@ -182,7 +183,7 @@ async def get_cache_info():
     cache_info = []
     for path, data in document_cache.items():
         file_ext = Path(data["document_name"]).suffix.lower()
-        converter = FileConverter()
+        converter = get_converter()
         file_type = converter.SUPPORTED_FORMATS.get(file_ext, "PDF" if file_ext == ".pdf" else "Unknown")
         
         cache_info.append({
@@ -226,6 +227,7 @@ async def ask_question(
     current_activity = {
         "processing": True,
         "start_time": time.time(),
+        "started_at": time.monotonic(),
         "request_path": document_path
     }
     
@@ -315,12 +317,17 @@ async def clear_cache():
     }
 
 
-def main():
-    """Entry point for docsray-api command"""
+def _build_parser():
+    """Argument parser for the standalone docsray-api entry point"""
     parser = argparse.ArgumentParser(description="Launch DocsRay API server")
     parser.add_argument("--host", default="0.0.0.0", help="Host address")
     parser.add_argument("--port", type=int, default=8000, help="Port number")
-    args = parser.parse_args()
+    return parser
+
+def main(args=None):
+    """Entry point for docsray-api command (`args`: optional parsed namespace with host/port)"""
+    if args is None:
+        args = _build_parser().parse_args()
     
     print("🚀 Starting DocsRay API server...")
     print("📝 Server accepts document paths with each request")
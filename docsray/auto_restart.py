@@ -2,6 +2,10 @@
 """
 Auto-restart wrapper for DocsRay servers - FIXED VERSION
 Monitors and automatically restarts web_demo or mcp_server on crashes
+
+Keep this module light: it must not import torch or model code, and child
+processes are started without preexec_fn/cwd so CPython can launch them via
+posix_spawn/vfork instead of fork()-copying the monitor's address space.
 """
 
 import subprocess
@@ -23,9 +27,15 @@ try:
 except ImportError:
     psutil = None
 
-USE_LSOF = shutil.which("lsof") is not None
+# Absolute path lets subprocess take the posix_spawn fast path
+LSOF_PATH = shutil.which("lsof")
+USE_LSOF = LSOF_PATH is not None
 # --- Watchdog settings ---
 PROCESS_WATCHDOG_TIMEOUT = 600  # Seconds with no child activity → force kill
+# --- API activity check settings ---
+ACTIVITY_CHECK_INTERVAL = 10      # Base seconds between /activity checks
+ACTIVITY_CHECK_MAX_INTERVAL = 60  # Upper bound once the API has been idle for a while
+ACTIVITY_IDLE_BACKOFF_AFTER = 5   # Consecutive idle checks before the interval doubles
 
 # Setup logging
 log_dir = Path.home() / ".docsray" / "logs"
@@ -74,7 +84,7 @@ def kill_port_holders(port: int):
     if USE_LSOF:
         try:
             out = subprocess.check_output(
-                ["lsof", "-t", f"-i:{port}"], text=True
+                [LSOF_PATH, "-t", f"-i:{port}"], text=True
             ).strip()
             for pid in out.splitlines():
                 try:
@@ -92,6 +102,23 @@ def kill_port_holders(port: int):
     if psutil is None:
         return  # No way to inspect ports on this platform
 
+    # One system-wide socket table read instead of one per process
+    try:
+        listeners = {
+            conn.pid for conn in psutil.net_connections(kind="tcp")
+            if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port and conn.pid
+        }
+    except (psutil.AccessDenied, psutil.Error):
+        listeners = None  # e.g. macOS without root: scan per process below
+
+    if listeners is not None:
+        for pid in listeners:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                continue
+        return
+
     for proc in psutil.process_iter(['pid']):
         try:
             # connections()는 메서드로 직접 호출
@@ -104,7 +131,14 @@ def kill_port_holders(port: int):
             continue
 
 class SimpleServiceMonitor:
-    """Simple but working service monitor"""
+    """Simple but working service monitor
+
+    Nothing here polls: the main thread blocks in Popen.wait() (bounded by the
+    watchdog timeout) and the optional API activity thread sleeps on an Event
+    that is set as soon as the child exits. An asyncio version would still
+    need a child-watcher thread for waitpid and an executor thread for the
+    blocking HTTP check, so threads are kept deliberately.
+    """
     
     def __init__(self, service_name, command_args, max_retries=None, retry_delay=5, request_timeout=None, port=None):
         self.service_name = service_name
@@ -117,8 +151,15 @@ class SimpleServiceMonitor:
         self.retry_count = 0
         self.last_activity_time = None
         self.monitoring_thread = None
-        self.should_stop_monitoring = False
+        self.stop_monitoring = threading.Event()
         self.process = None
+        self._session = None  # Keep-alive HTTP session for activity checks
+        
+    def _get_session(self):
+        """Return the shared requests session, creating it on first use"""
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
         
     def monitor_api_activity(self):
         """Monitor API activity and kill process if timeout exceeded"""
@@ -127,7 +168,12 @@ class SimpleServiceMonitor:
             
         self.logger.info(f"📡 Starting API activity monitor (timeout: {self.request_timeout}s)")
         
-        while not self.should_stop_monitoring:
+        # Never back off past half the timeout so a stuck request is still caught in time
+        max_interval = max(ACTIVITY_CHECK_INTERVAL, min(ACTIVITY_CHECK_MAX_INTERVAL, self.request_timeout / 2))
+        interval = ACTIVITY_CHECK_INTERVAL
+        idle_checks = 0
+        
+        while not self.stop_monitoring.is_set():
             try:
                 # Check if process is still running
                 if self.process and self.process.poll() is not None:
@@ -135,13 +181,17 @@ class SimpleServiceMonitor:
                 
                 # Try to get current activity status from API
                 try:
-                    response = requests.get(f"http://localhost:{self.port}/activity", timeout=5)
+                    response = self._get_session().get(f"http://localhost:{self.port}/activity", timeout=5)
                     if response.status_code == 200:
                         data = response.json()
                         if data.get("processing"):
-                            # API is processing a request
-                            start_time = data.get("start_time", time.time())
-                            elapsed = time.time() - start_time
+                            idle_checks = 0
+                            interval = ACTIVITY_CHECK_INTERVAL
+                            # API is processing a request; prefer the server's
+                            # monotonic elapsed time over wall-clock arithmetic
+                            elapsed = data.get("elapsed")
+                            if elapsed is None:
+                                elapsed = time.time() - data.get("start_time", time.time())
                             
                             if elapsed > self.request_timeout:
                                 self.logger.error(f"⏰ Request timeout exceeded ({elapsed:.1f}s > {self.request_timeout}s)")
@@ -151,15 +201,27 @@ class SimpleServiceMonitor:
                                 break
                             else:
                                 self.logger.debug(f"Request in progress: {elapsed:.1f}s / {self.request_timeout}s")
+                        else:
+                            # Healthy and idle: check less often the longer it stays idle
+                            idle_checks += 1
+                            if idle_checks >= ACTIVITY_IDLE_BACKOFF_AFTER:
+                                idle_checks = 0
+                                interval = min(interval * 2, max_interval)
                 except requests.exceptions.RequestException:
                     # API might not be ready yet or doesn't have activity endpoint
-                    pass
+                    idle_checks = 0
+                    interval = ACTIVITY_CHECK_INTERVAL
                 
-                time.sleep(10)  # Check every 10 seconds
+                # Wakes immediately when the child exits
+                self.stop_monitoring.wait(interval)
                 
             except Exception as e:
                 self.logger.error(f"Error in activity monitor: {e}")
-                time.sleep(10)
+                self.stop_monitoring.wait(interval)
+        
+        if self._session is not None:
+            self._session.close()
+            self._session = None
         
         self.logger.info("📡 API activity monitor stopped")
         
@@ -187,43 +249,37 @@ class SimpleServiceMonitor:
                 # Run the service
                 self.process = subprocess.Popen(
                     self.command_args,
-                    env=env
+                    env=env,
+                    close_fds=True
                 )
                 
                 # Start monitoring thread for API timeout if applicable
-                self.should_stop_monitoring = False
+                self.stop_monitoring.clear()
                 if self.request_timeout and self.port and "api" in str(self.command_args):
                     self.monitoring_thread = threading.Thread(target=self.monitor_api_activity)
                     self.monitoring_thread.daemon = True
                     self.monitoring_thread.start()
                 
                 # --- Wait with watchdog ---
-                start_ts = time.time()
-                exit_code = None
-                while True:
-                    exit_code = self.process.poll()
-                    if exit_code is not None:
-                        # Child exited normally or via os._exit
-                        break
-
+                # Block in the kernel until the child exits instead of polling
+                try:
+                    # Child exited normally or via os._exit
+                    exit_code = self.process.wait(timeout=PROCESS_WATCHDOG_TIMEOUT)
+                except subprocess.TimeoutExpired:
                     # Hung‑process watchdog
-                    if time.time() - start_ts > PROCESS_WATCHDOG_TIMEOUT:
-                        self.logger.error("Watchdog timeout – child appears hung, terminating…")
-                        self.process.terminate()
-                        try:
-                            exit_code = self.process.wait(timeout=10)
-                        except subprocess.TimeoutExpired:
-                            self.logger.error("Graceful terminate failed – killing…")
-                            self.process.kill()
-                            exit_code = self.process.wait(timeout=5)
-                        # Mark forced kill with special code
-                        exit_code = 99
-                        break
-
-                    time.sleep(5)
+                    self.logger.error("Watchdog timeout – child appears hung, terminating…")
+                    self.process.terminate()
+                    try:
+                        self.process.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        self.logger.error("Graceful terminate failed – killing…")
+                        self.process.kill()
+                        self.process.wait(timeout=5)
+                    # Mark forced kill with special code
+                    exit_code = 99
                 
                 # Stop monitoring thread
-                self.should_stop_monitoring = True
+                self.stop_monitoring.set()
                 if self.monitoring_thread and self.monitoring_thread.is_alive():
                     self.monitoring_thread.join(timeout=5)
                 
@@ -253,7 +309,7 @@ class SimpleServiceMonitor:
                 
             except KeyboardInterrupt:
                 self.logger.info("Received keyboard interrupt, stopping...")
-                self.should_stop_monitoring = True
+                self.stop_monitoring.set()
                 if self.process and self.process.poll() is None:
                     self.process.terminate()
                     self.process.wait()
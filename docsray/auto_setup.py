@@ -44,6 +44,9 @@ def run_command(cmd, check=True):
     
     return subprocess.run(cmd, check=check)
 
+# nvidia-smi can block for a long time on a wedged driver
+NVIDIA_SMI_TIMEOUT = 5
+
 def get_gpu_type():
     """Detect GPU type (CUDA, ROCm, Metal, or CPU)"""
     # Check for NVIDIA GPU (CUDA)
@@ -54,12 +57,13 @@ def get_gpu_type():
     except ImportError:
         pass
     
-    # Check nvidia-smi command
+    # Check nvidia-smi command (-L only lists devices, skipping the full status query)
     try:
-        result = subprocess.run(['nvidia-smi'], capture_output=True, text=True)
+        result = subprocess.run(['nvidia-smi', '-L'], capture_output=True, text=True,
+                                timeout=NVIDIA_SMI_TIMEOUT)
         if result.returncode == 0:
             return "cuda"
-    except FileNotFoundError:
+    except (FileNotFoundError, subprocess.TimeoutExpired):
         pass
     
     # Check for AMD GPU (ROCm)
@@ -173,7 +177,8 @@ def get_cuda_version():
     """Detect installed CUDA version"""
     try:
         # Try nvidia-smi first
-        result = subprocess.run(['nvidia-smi'], capture_output=True, text=True)
+        result = subprocess.run(['nvidia-smi'], capture_output=True, text=True,
+                                timeout=NVIDIA_SMI_TIMEOUT)
         if result.returncode == 0:
             # Parse CUDA version from nvidia-smi output
             for line in result.stdout.split('\n'):
@@ -8,8 +8,8 @@ from typing import List, Dict, Any, Tuple
 
 from docsray.search.section_coarse_search import coarse_search_sections
 from docsray.search.fine_search import fine_search_chunks
-from docsray.inference.embedding_model import embedding_model
-from docsray.inference.llm_model import local_llm
+from docsray.inference.embedding_model import get_embedding_model
+from docsray.inference import llm_model  # model loads on first use of llm_model.local_llm
 from docsray.config import FAST_MODE, STANDARD_MODE, FULL_FEATURE_MODE
 
 DEFAULT_SYSTEM_PROMPT = (
@@ -20,7 +20,8 @@ DEFAULT_SYSTEM_PROMPT = (
 )
 
 class PDFChatBot:
-    def __init__(self, sections, chunk_index, system_prompt: str = DEFAULT_SYSTEM_PROMPT):
+    def __init__(self, sections, chunk_index, system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+                 chunk_embeddings=None, pq_index=None):
         """
         Parameters
         ----------
@@ -32,10 +33,27 @@ class PDFChatBot:
             ``{"embedding": [...], "metadata": {...}}``.
         system_prompt : str
             System prompt that is prepended before calling the LLM.
+        chunk_embeddings : np.ndarray, optional
+            (N, D) embedding matrix aligned with ``chunk_index`` (e.g. the
+            memory-mapped CLI cache); used for the chunk-level search.
+        pq_index : faiss.Index, optional
+            Approximate index over ``chunk_embeddings`` for large documents.
         """
         self.sections = sections
         self.chunk_index = chunk_index
         self.system_prompt = system_prompt
+        self.chunk_embeddings = chunk_embeddings
+        self.pq_index = pq_index
+
+    def build_context(self, retrieved_chunks):
+        """Join the retrieved chunks into the document-context block of the prompt"""
+        context_parts = []
+        for item in retrieved_chunks:
+            meta = item.get("metadata", {})
+            section_title = meta.get("section_title", "")
+            content = meta.get("content", "")
+            context_parts.append(f"[{section_title}] {content}")
+        return "\n\n".join(context_parts)
 
     def build_prompt(self, user_query, retrieved_chunks):
         """
@@ -54,18 +72,13 @@ class PDFChatBot:
         str
             A fully formatted prompt string.
         """
-        context_parts = []
-        for item in retrieved_chunks:
-            meta = item.get("metadata", {})
-            section_title = meta.get("section_title", "")
-            content = meta.get("content", "")
-            context_parts.append(f"[{section_title}] {content}")
-        context_text = "\n\n".join(context_parts)
+        context_text = self.build_context(retrieved_chunks)
         prompt = f"{self.system_prompt}\n\n=== Document Context ===\n{context_text}\n\n=== User Question ===\n{user_query}\n\n=== Answer ===\n"
         return prompt.strip()
 
         
-    def answer(self, query: str, beta: float = 0.5, max_iterations = 2, fine_only=False):
+    def answer(self, query: str, beta: float = 0.5, max_iterations = 2, fine_only=False,
+               question_emb=None):
         """
         End‑to‑end answer generation pipeline.
 
@@ -87,6 +100,8 @@ class PDFChatBot:
             Number of chunks to use in the fine search.
         streaming : bool, default = False
             If ``True``, stream tokens as they are generated.
+        question_emb : np.ndarray, optional
+            Precomputed query embedding of *query*; skips embedding it again.
 
         Returns
         -------
@@ -108,8 +123,13 @@ class PDFChatBot:
             top_sections = 7
             top_chunks = 15
 
+        def _embed_query(text):
+            if question_emb is not None and text == query:
+                return question_emb
+            return get_embedding_model().get_embedding(text, is_query=True)
+
         for iter in range(max_iterations):
-            query_emb = embedding_model.get_embedding(augmented_query, is_query=True)
+            query_emb = _embed_query(augmented_query)
             # 1st Search
             if fine_only:              
                 relevant_secs = self.sections
@@ -122,7 +142,9 @@ class PDFChatBot:
             best_chunks = fine_search_chunks(query_emb, chunk_index, 
                                              relevant_secs, 
                                              top_k=top_chunks * (max_iterations - iter + 1), 
-                                             fine_only=fine_only)
+                                             fine_only=fine_only,
+                                             chunk_embeddings=self.chunk_embeddings,
+                                             pq_index=self.pq_index)
             # Build a single string that contains the content of every retrieved chunk
             combined_answer = "\n\n".join(
                 chunk["metadata"].get("content", "") for chunk in best_chunks
@@ -134,12 +156,12 @@ class PDFChatBot:
                 "Write ONE concise follow‑up question that would help retrieve even more relevant information.\n"
                 "Return ONLY the question text. Do not include any additional text or explanations."
             )
-            raw_improved_query = local_llm.generate(query_improvement_prompt)
+            raw_improved_query = llm_model.local_llm.generate(query_improvement_prompt)
             # clean up
-            improved_query = local_llm.strip_response(raw_improved_query)
+            improved_query = llm_model.local_llm.strip_response(raw_improved_query)
             augmented_query = query + ':' + improved_query
 
-        query_emb = embedding_model.get_embedding(augmented_query, is_query=True) 
+        query_emb = _embed_query(augmented_query)
         if fine_only:              
             relevant_secs = self.sections
         else:
@@ -149,17 +171,19 @@ class PDFChatBot:
                        
         best_chunks = fine_search_chunks(query_emb, chunk_index, 
                                          relevant_secs, top_k=top_chunks, 
-                                         fine_only=fine_only)
+                                         fine_only=fine_only,
+                                         chunk_embeddings=self.chunk_embeddings,
+                                         pq_index=self.pq_index)
         # Generate answer with LLM
         prompt = self.build_prompt(query, best_chunks)
         import time
         start_time = time.time()
-        answer_text = local_llm.generate(prompt)
+        answer_text = llm_model.local_llm.generate(prompt)
         end_time = time.time()
         print(f"LLM generation took {end_time - start_time:.2f} seconds")
-        answer = answer_text.split("=== Document Context ===")[1].split("=== User Question ===")
-        reference_output = answer[0].strip()
-        answer_output = local_llm.strip_response(answer[1])
+        # The LLM returns only its completion, so references come from our own context
+        reference_output = self.build_context(best_chunks).strip()
+        answer_output = llm_model.local_llm.strip_response(answer_text)
         return answer_output, reference_output
     
     async def answer_async(self, query: str, **kwargs):
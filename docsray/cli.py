@@ -3,6 +3,10 @@
 """DocsRay Command Line Interface with Auto-Restart Support and doc Timeout"""
 
 import argparse
+import functools
+import json
+import logging
+import platform
 import sys
 import os
 import time
@@ -10,14 +14,26 @@ import signal
 import threading
 import concurrent.futures
 from pathlib import Path
-from docsray.post_install import hotfix_check
-import requests
 
 
 class ProcessingTimeoutError(Exception):
     """Exception raised when document processing takes too long"""
     pass
 
+
+# Slice length (seconds) for waiting on the worker, so Ctrl-C is handled promptly
+# (a single long wait isn't interruptible on every platform, e.g. Windows)
+WAIT_SLICE = 0.1
+
+
+# Set once SIGTERM arrives; the processing worker checks it between stages
+_SHUTDOWN = threading.Event()
+
+def _term_handler(signum, frame):
+    """Treat SIGTERM (systemd, docker, auto-restart monitor) like Ctrl-C"""
+    _SHUTDOWN.set()
+    raise KeyboardInterrupt
+
 def check_and_warn_dependencies():
     """Check dependencies and warn if missing"""
     try:
@@ -38,7 +54,9 @@ def check_and_warn_dependencies():
     except:
         pass
 
-def main():
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """Build the argument parser once per process"""
     parser = argparse.ArgumentParser(
         description="DocsRay - Document Question-Answering System",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -53,6 +71,9 @@ Examples:
   # Start MCP server with auto-restart
   docsray mcp --auto-restart
   
+  # Replay MCP tool calls from a scenario file and time them
+  docsray mcp --scenario scenario.json --csv timings.csv
+  
   # Start web interface
   docsray web
   
@@ -98,6 +119,8 @@ Examples:
     download_parser.add_argument("--model-type", choices=["lite", "base", "pro"], default="lite",
                                 help="Model type to download: lite(4b), base(12b), pro(27b) (default: lite)")
     download_parser.add_argument("--force", action="store_true", help="Force re-download existing models")
+    download_parser.add_argument("--abort-on-error", action="store_true",
+                                help="Stop at the first failed download (default: skip it and continue)")
     
     # MCP server command
     mcp_parser = subparsers.add_parser("mcp", help="Start MCP server")
@@ -110,6 +133,10 @@ Examples:
                            help="Delay between restarts in seconds (default: 5)")
     mcp_parser.add_argument("--model-type", choices=["lite", "base", "pro"], default="lite",
                            help="Model type to use: lite(4b), base(12b), pro(27b) (default: lite)")
+    mcp_parser.add_argument("--scenario", default=None,
+                           help="Replay tool calls from a JSON scenario file and print timings")
+    mcp_parser.add_argument("--csv", default=None,
+                           help="Write scenario timings to this CSV file (default: stdout)")
     
     # Web interface command
     web_parser = subparsers.add_parser("web", help="Start web interface")
@@ -173,7 +200,18 @@ Examples:
     perf_parser.add_argument("--iterations", type=int, default=1, help="Number of test iterations (default: 1)")
     perf_parser.add_argument("--timeout", type=int, default=None, help="Request timeout in seconds (no timeout if not specified)")
     
-    args = parser.parse_args()
+    return parser
+
+def _parse_args(argv):
+    """Parse a command line with the shared parser (each call gets its own Namespace)"""
+    return _build_parser().parse_args(list(argv))
+
+def main():
+    # Route SIGTERM through the existing KeyboardInterrupt handling so children
+    # are terminated and workers stop cleanly instead of being SIGKILLed later
+    signal.signal(signal.SIGTERM, _term_handler)
+    
+    args = _parse_args(sys.argv[1:])
     
     if args.command == "setup":
         from docsray.auto_setup import check_dependencies, run_setup
@@ -207,15 +245,24 @@ Examples:
         
         from docsray.download_models import download_models, check_models
         if args.check:
-            check_models(model_type=args.model_type)
+            check_models(model_type=args.model_type, validate=True)
         else:
-            download_models(model_type=args.model_type, force=args.force)
+            ok = download_models(model_type=args.model_type, force=args.force,
+                                 abort_on_error=args.abort_on_error)
+            return 0 if ok else 1
     
     elif args.command == "mcp":
         # Set model type environment variable
         os.environ["DOCSRAY_MODEL_TYPE"] = args.model_type
         
-        if args.auto_restart:
+        if args.scenario:
+            # Scripted replay, no client involved
+            from docsray.mcp_server import main as mcp_main
+            mcp_argv = ["--scenario", args.scenario]
+            if args.csv:
+                mcp_argv += ["--csv", args.csv]
+            mcp_main(mcp_argv)
+        elif args.auto_restart:
             # Use auto-restart wrapper
             from docsray.auto_restart import SimpleServiceMonitor
             
@@ -234,9 +281,8 @@ Examples:
                 print("\n🛑 MCP Server stopped by user", file=sys.stderr)
         else:
             # Direct start
-            import asyncio
             from docsray.mcp_server import main as mcp_main
-            asyncio.run(mcp_main())
+            mcp_main([])
     
     elif args.command == "web":
         # Check dependencies before starting web interface
@@ -284,18 +330,7 @@ Examples:
         else:
             # Direct start without auto-restart
             from docsray.web_demo import main as web_main
-            sys.argv = ["docsray-web"]
-            if args.share:
-                sys.argv.append("--share")
-            if args.port:
-                sys.argv.extend(["--port", str(args.port)])
-            if args.host:
-                sys.argv.extend(["--host", args.host])
-            if args.timeout is not None:
-                sys.argv.extend(["--timeout", str(args.timeout)])
-            if args.pages is not None:
-                sys.argv.extend(["--pages", str(args.pages)])
-            web_main()
+            web_main(args)
 
     
     elif args.command == "api":
@@ -342,8 +377,7 @@ Examples:
         else:
             # Direct start without auto-restart
             from docsray.app import main as api_main
-            sys.argv = ["docsray-api", "--host", args.host, "--port", str(args.port)]
-            api_main()
+            api_main(args)
     
     elif args.command == "configure-claude":
         configure_claude_desktop()
@@ -364,30 +398,18 @@ Examples:
         run_performance_test(args.file_path, args.question, args.host, args.port, args.iterations, args.timeout)
     
     else:
+        from docsray.post_install import hotfix_check
         if hotfix_check():
-            parser.print_help()
+            _build_parser().print_help()
         else:
             return
 
-def configure_claude_desktop():
-    """Configure Claude Desktop for MCP integration"""
-    import json
-    import platform
-    import sys
-    import os
-    from pathlib import Path
-    
-    # Determine config path based on OS
-    system = platform.system()
-    if system == "Darwin":  # macOS
-        config_path = Path.home() / "Library" / "Application Support" / "Claude" / "claude_desktop_config.json"
-    elif system == "Windows":
-        config_path = Path(os.environ["APPDATA"]) / "Claude" / "claude_desktop_config.json"
-    else:
-        print("❌ Unsupported OS for Claude Desktop", file=sys.stderr)
-        return
+@functools.lru_cache(maxsize=1)
+def _find_mcp_server():
+    """Locate (mcp_server.py, docsray package dir), or None if it can't be found
     
-    # Get DocsRay installation path
+    Memoized: the module-path probing and fallback stat() calls run once.
+    """
     try:
         import docsray
         
@@ -438,7 +460,27 @@ def configure_claude_desktop():
             print("❌ Could not locate mcp_server.py", file=sys.stderr)
             print("💡 Please ensure DocsRay is properly installed", file=sys.stderr)
             print("   Try: pip install -e . (in the DocsRay directory)", file=sys.stderr)
-            return
+            return None
+    
+    return mcp_server_path, docsray_path
+
+def configure_claude_desktop():
+    """Configure Claude Desktop for MCP integration"""
+    # Determine config path based on OS
+    system = platform.system()
+    if system == "Darwin":  # macOS
+        config_path = Path.home() / "Library" / "Application Support" / "Claude" / "claude_desktop_config.json"
+    elif system == "Windows":
+        config_path = Path(os.environ["APPDATA"]) / "Claude" / "claude_desktop_config.json"
+    else:
+        print("❌ Unsupported OS for Claude Desktop", file=sys.stderr)
+        return
+    
+    # Get DocsRay installation path
+    found = _find_mcp_server()
+    if found is None:
+        return
+    mcp_server_path, docsray_path = found
     
     # Create config
     config = {
@@ -467,10 +509,11 @@ def configure_claude_desktop():
         return
     
     # Check if config already exists and merge
+    existing_bytes = None
     if config_path.exists():
         try:
-            with open(config_path, "r") as f:
-                existing = json.load(f)
+            existing_bytes = config_path.read_bytes()
+            existing = json.loads(existing_bytes)
             
             if "mcpServers" in existing:
                 existing["mcpServers"]["docsray"] = config["mcpServers"]["docsray"]
@@ -480,10 +523,19 @@ def configure_claude_desktop():
         except Exception as e:
             print(f"⚠️  Warning: Could not read existing config: {e}", file=sys.stderr)
     
-    # Write config
+    # Write config (via a temp file, so an interrupted write can't corrupt
+    # the user's existing Claude Desktop settings)
     try:
-        with open(config_path, "w") as f:
-            json.dump(config, f, indent=2)
+        new_bytes = json.dumps(config, indent=2).encode("utf-8")
+        if new_bytes == existing_bytes:
+            # Nothing changed: don't touch the file (Claude Desktop watches it)
+            print(f"✅ Claude Desktop config already up to date", file=sys.stderr)
+            print(f"📁 Config location: {config_path}", file=sys.stderr)
+            return
+        
+        from docsray.utils.json_io import atomic_open
+        with atomic_open(config_path) as f:
+            f.write(new_bytes)
         
         print(f"✅ Claude Desktop configured successfully!", file=sys.stderr)
         print(f"📁 Config location: {config_path}", file=sys.stderr)
@@ -498,48 +550,88 @@ def configure_claude_desktop():
         print("\n💡 You can manually create the config file with:", file=sys.stderr)
         print(json.dumps(config, indent=2), file=sys.stderr)
 
+@functools.lru_cache(maxsize=1)
+def _get_process_logger():
+    """stderr logger for processing progress (configured once, on first use)"""
+    log = logging.getLogger("docsray.process")
+    if not log.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    return log
+
+@functools.lru_cache(maxsize=1)
+def _get_process_executor():
+    """Persistent worker thread for timed document processing"""
+    # A single worker: every stage shares the llama.cpp models, which are not thread-safe
+    return concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="docsray-proc")
+
 def process_pdf_with_timeout(file_path: str, analyze_visuals: bool, timeout: int):
     """Process doc with optional timeout handling"""
+    cancel_event = threading.Event()
+
+    def _check_cancelled():
+        # Checked between stages so a timed-out or terminated job frees the worker promptly
+        if cancel_event.is_set() or _SHUTDOWN.is_set():
+            raise ProcessingTimeoutError("Processing cancelled")
+
     def _process():
-        from docsray.scripts import pdf_extractor, chunker, build_index, section_rep_builder
+        from docsray.scripts import ingest, section_rep_builder
+        log = _get_process_logger()
         
-        # Extract
-        print("📖 Extracting content...", file=sys.stderr)
-        extracted = pdf_extractor.extract_content(
+        # Extract / chunk / build index (pipelined: pages are chunked and
+        # embedded while extraction continues)
+        log.info("📖 Extracting content (✂️  chunking and 🔍 indexing pages as they arrive)...")
+        extracted, chunks, chunk_index = ingest.extract_and_index(
             file_path,
+            check_cancelled=_check_cancelled,
             analyze_visuals=analyze_visuals
         )
-
-        # Chunk
-        print("✂️  Creating chunks...", file=sys.stderr)
-        chunks = chunker.process_extracted_file(extracted)
-        
-        # Build index
-        print("🔍 Building search index...", file=sys.stderr)
-        chunk_index = build_index.build_chunk_index(chunks)
+        _check_cancelled()
         
         # Build section representations
-        print("📊 Building section representations...", file=sys.stderr)
+        log.info("📊 Building section representations...")
         sections = section_rep_builder.build_section_reps(extracted["sections"], chunk_index)
         
         return sections, chunk_index
     
+    # Under the auto-restart wrapper the parent already supervises this process,
+    # so skip the extra worker hand-off and let KeyboardInterrupt reach _process()
+    if os.environ.get("DOCSRAY_AUTO_RESTART") == "1":
+        return _process()
+    
     # Check if timeout is enabled
     if timeout > 0:
-        # Run with timeout
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            print(f"⏰ Processing timeout: {timeout} seconds ({timeout//60}m {timeout%60}s)", file=sys.stderr)
-            future = executor.submit(_process)
-            
-            try:
-                sections, chunks = future.result(timeout=timeout)
-                return sections, chunks
-            except concurrent.futures.TimeoutError:
-                future.cancel()
-                print(f"\n⏰ Processing timeout exceeded!", file=sys.stderr)
-                print(f"❌ Document processing took longer than {timeout} seconds", file=sys.stderr)
-                print(f"💡 Try with a smaller document or use --no-visuals flag", file=sys.stderr)
-                raise ProcessingTimeoutError(f"Processing timeout after {timeout} seconds")
+        # Run with timeout on the shared worker (a per-call executor's shutdown
+        # would block on the still-running job and defeat the timeout)
+        print(f"⏰ Processing timeout: {timeout} seconds ({timeout//60}m {timeout%60}s)", file=sys.stderr)
+        future = _get_process_executor().submit(_process)
+        
+        deadline = time.monotonic() + timeout
+        try:
+            while not future.done():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise concurrent.futures.TimeoutError
+                if _SHUTDOWN.is_set():
+                    raise KeyboardInterrupt
+                concurrent.futures.wait([future], timeout=min(WAIT_SLICE, remaining))
+            sections, chunks = future.result()
+            return sections, chunks
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            cancel_event.set()
+            print(f"\n⏰ Processing timeout exceeded!", file=sys.stderr)
+            print(f"❌ Document processing took longer than {timeout} seconds", file=sys.stderr)
+            print(f"💡 Try with a smaller document or use --no-visuals flag", file=sys.stderr)
+            raise ProcessingTimeoutError(f"Processing timeout after {timeout} seconds")
+        except KeyboardInterrupt:
+            # Don't leave the worker running (and blocking interpreter exit)
+            future.cancel()
+            cancel_event.set()
+            raise
     else:
         # Run without timeout
         print("⏰ No timeout limit set", file=sys.stderr)
@@ -583,7 +675,10 @@ def process_pdf_cli(file_path: str, no_visuals: bool = False, timeout: int = 300
         print(f"\n❌ {e}", file=sys.stderr)
         return
     except KeyboardInterrupt:
-        print(f"\n🛑 Processing interrupted by user", file=sys.stderr)
+        if _SHUTDOWN.is_set():
+            print(f"\n🛑 Processing stopped (SIGTERM)", file=sys.stderr)
+        else:
+            print(f"\n🛑 Processing interrupted by user", file=sys.stderr)
         return
     except Exception as e:
         elapsed_time = time.time() - start_time
@@ -591,43 +686,105 @@ def process_pdf_cli(file_path: str, no_visuals: bool = False, timeout: int = 300
         print(f"Error: {e}", file=sys.stderr)
         return
 
+def _cache_paths(file_path: str):
+    """Return (sections, embeddings, chunk metadata) cache paths for a document"""
+    cache_dir = Path.home() / ".docsray" / "cache"
+    file_name = Path(file_path).stem
+    return (
+        cache_dir / f"{file_name}_sections.json",
+        cache_dir / f"{file_name}_index.npy",
+        cache_dir / f"{file_name}_index_meta.json",
+    )
+
+def _quant_path(emb_path: Path) -> Path:
+    """Sidecar describing how the embedding matrix is quantized (absent for float32)"""
+    return emb_path.with_name(f"{emb_path.stem}_quant.json")
+
+def _pq_path(emb_path: Path) -> Path:
+    """Optional faiss IVF-PQ index built for large documents"""
+    return emb_path.with_suffix(".faiss")
+
 def save_cache(file_path: str, sections, chunks):
     """Save processed data to cache"""
-    import json
-    import pickle
-    from pathlib import Path
+    import numpy as np
+    from docsray.utils import json_io
+    from docsray.config import INDEX_QUANT
     
     # Create cache directory
-    cache_dir = Path.home() / ".docsray" / "cache"
+    sec_path, emb_path, meta_path = _cache_paths(file_path)
+    cache_dir = sec_path.parent
     cache_dir.mkdir(parents=True, exist_ok=True)
     
-    # Use doc filename without extension as base name
-    file_name = Path(file_path).stem
-    
-    # Save sections as JSON
-    sec_path = cache_dir / f"{file_name}_sections.json"
-    with open(sec_path, "w") as f:
-        json.dump(sections, f, indent=2)
-    
-    # Save chunk index as pickle
-    idx_path = cache_dir / f"{file_name}_index.pkl"
-    with open(idx_path, "wb") as f:
-        pickle.dump(chunks, f)
+    # Save sections as compact JSON (a cache, not meant to be read by hand)
+    json_io.dump_file(sections, sec_path)
+    
+    # Save chunk index as one contiguous embedding matrix plus JSON metadata,
+    # so loading is a single (memory-mapped) read instead of unpickling per chunk
+    embeddings = np.asarray([c["embedding"] for c in chunks], dtype=np.float32)
+    quant_path = _quant_path(emb_path)
+    if INDEX_QUANT != "none" and embeddings.size:
+        from docsray.utils.quantize import quantize
+        codes, scale = quantize(embeddings, INDEX_QUANT)
+        with json_io.atomic_open(emb_path) as f:
+            np.save(f, codes)
+        json_io.dump_file({"mode": INDEX_QUANT, "scale": scale, "dim": embeddings.shape[1]}, quant_path)
+    else:
+        with json_io.atomic_open(emb_path) as f:
+            np.save(f, embeddings)
+        quant_path.unlink(missing_ok=True)
+    
+    # Large documents also get an approximate index (only with faiss installed)
+    from docsray.scripts import build_index
+    pq_path = _pq_path(emb_path)
+    pq_index = build_index.build_pq_index(embeddings) if embeddings.size else None
+    if pq_index is not None:
+        with json_io.atomic_open(pq_path) as f:
+            f.write(build_index.serialize_pq_index(pq_index))
+    else:
+        pq_path.unlink(missing_ok=True)
+    json_io.dump_file([c["metadata"] for c in chunks], meta_path)
     
     print(f"📁 Cache saved to: {cache_dir}", file=sys.stderr)
 
+def load_cached_index(file_path: str, with_embeddings: bool = False):
+    """Load the cached chunk index, or None if the document wasn't processed
+    
+    With ``with_embeddings=True`` returns ``(chunk_index, embeddings)``, where
+    embeddings is the memory-mapped (N, D) matrix (None for legacy caches).
+    Quantized caches are not decoded: the matrix holds the int8 / packed binary
+    codes (which fine_search scores directly) and each chunk's "embedding" is a
+    view of its row, so nothing beyond the rows actually read is paged in. The
+    ``*_index_quant.json`` sidecar (mode, scale, dim) can be passed to
+    ``quantize.decode`` when real values are needed.
+    """
+    import numpy as np
+    from docsray.utils import json_io
+    
+    _, emb_path, meta_path = _cache_paths(file_path)
+    if emb_path.exists() and meta_path.exists():
+        embeddings = np.load(emb_path, mmap_mode="r")
+        metadata = json_io.load_file(meta_path)
+        chunk_index = [{"embedding": emb, "metadata": meta} for emb, meta in zip(embeddings, metadata)]
+        return (chunk_index, embeddings) if with_embeddings else chunk_index
+    
+    # Caches written before the .npy layout
+    legacy_path = emb_path.with_suffix(".pkl")
+    if legacy_path.exists():
+        import pickle
+        with open(legacy_path, "rb") as f:
+            chunk_index = pickle.load(f)
+        return (chunk_index, None) if with_embeddings else chunk_index
+    return (None, None) if with_embeddings else None
+
 def ask_question_cli(question: str, file_path: str):
     """Ask a question about a doc from command line"""
-    from docsray.chatbot import PDFChatBot
-    import json
+    from docsray.utils import json_io
     
     # Look for cached data
-    cache_dir = Path.home() / ".docsray" / "cache"
-    file_name_stem = Path(file_path).stem
-    sec_path = cache_dir / f"{file_name_stem}_sections.json"
-    idx_path = cache_dir / f"{file_name_stem}_index.pkl"
+    sec_path, emb_path, meta_path = _cache_paths(file_path)
+    has_index = (emb_path.exists() and meta_path.exists()) or emb_path.with_suffix(".pkl").exists()
 
-    if not sec_path.exists() or not idx_path.exists():
+    if not sec_path.exists() or not has_index:
         print(f"❌ No cached data for {file_path}. Please process the document first:", file=sys.stderr)
         print(f'docsray process "{file_path}"', file=sys.stderr)
         return
@@ -635,24 +792,26 @@ def ask_question_cli(question: str, file_path: str):
     # Load data
     print(f"📁 Loading cached data for {file_path}...", file=sys.stderr)
     try:
-        with open(sec_path, "r") as f:
-            sections = json.load(f)
+        sections = json_io.load_file(sec_path)
         
-        import pickle
-        with open(idx_path, "rb") as f:
-            chunk_index = pickle.load(f)
+        chunk_index, embeddings = load_cached_index(file_path, with_embeddings=True)
             
     except Exception as e:
         print(f"❌ Failed to load cached data: {e}", file=sys.stderr)
         print(f'💡 Try reprocessing the document: docsray process "{file_path}"', file=sys.stderr)
         return
     
+    # Only load the models (via the chatbot) once there is something to ask about
+    from docsray.chatbot import PDFChatBot
+    
     # Create chatbot and get answer
     print(f"🤔 Thinking about: {question}", file=sys.stderr)
     start_time = time.time()
     
     try:
-        chatbot = PDFChatBot(sections, chunk_index)
+        from docsray.scripts.build_index import load_pq_index
+        pq_index = load_pq_index(_pq_path(emb_path)) if embeddings is not None else None
+        chatbot = PDFChatBot(sections, chunk_index, chunk_embeddings=embeddings, pq_index=pq_index)
         answer, references = chatbot.answer(question)
         
         elapsed_time = time.time() - start_time
@@ -667,6 +826,8 @@ def ask_question_cli(question: str, file_path: str):
 
 def run_performance_test(file_path: str, question: str, host: str, port: int, iterations: int, timeout: int = None):
     """Run performance test against the API server"""
+    import requests
+    
     if not os.path.exists(file_path):
         print(f"❌ Document file not found: {file_path}", file=sys.stderr)
         return
@@ -1,7 +1,12 @@
 import os
+import re
+import math
+import bisect
+import atexit
+import logging
 import sys
-import torch
-import psutil
+import json
+import time
 from pathlib import Path
 
 # Suppress logs
@@ -9,6 +14,8 @@ os.environ["LLAMA_LOG_LEVEL"] = "40"
 os.environ["GGML_LOG_LEVEL"] = "error"
 os.environ["LLAMA_CPP_LOG_LEVEL"] = "ERROR"
 
+logger = logging.getLogger("docsray")
+
 # Paths
 DOCSRAY_HOME = Path(os.environ.get("DOCSRAY_HOME", Path.home() / ".docsray"))
 DATA_DIR = DOCSRAY_HOME / "data"
@@ -20,66 +27,293 @@ from docsray.utils.pandoc_utils import ensure_pandoc
 
 # Ensure pandoc is available
 if not ensure_pandoc():
-    print("Warning: Pandoc is not available. Some file conversions may not work.", file=sys.stderr)
+    logger.warning("Pandoc is not available. Some file conversions may not work.")
 try:
     import pytesseract
     USE_TESSERACT =True
 except:
-    print("Pytesseract not installed. Using gemma3 for OCR", file=sys.stderr)
+    logger.info("Pytesseract not installed. Using gemma3 for OCR")
     USE_TESSERACT = False
 
-# Create directories
-for dir_path in [DOCSRAY_HOME, DATA_DIR, MODEL_DIR, CACHE_DIR]:
-    dir_path.mkdir(parents=True, exist_ok=True)
+# Create directories; one stat per directory when they already exist, and a
+# directory deleted later (e.g. clearing ~/.docsray/cache) is recreated
+for dir_path in [DATA_DIR, MODEL_DIR, CACHE_DIR]:
+    if not os.path.isdir(dir_path):
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+_MEMAVAILABLE_RE = re.compile(r"^MemAvailable:\s+(\d+) kB", re.MULTILINE)
+_INACTIVE_FILE_RE = re.compile(r"^(?:total_)?inactive_file\s+(\d+)", re.MULTILINE)
+
+# (limit, usage, stat) files for cgroup v2 and v1
+_CGROUP_MEMORY_FILES = [
+    ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current", "/sys/fs/cgroup/memory.stat"),
+    ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+     "/sys/fs/cgroup/memory/memory.stat"),
+]
+
+def _read_text(path):
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def get_cgroup_available_bytes():
+    """Return memory left under the container's cgroup limit, or None if unlimited"""
+    for limit_file, usage_file, stat_file in _CGROUP_MEMORY_FILES:
+        limit = _read_text(limit_file)
+        if limit is None:
+            continue
+        limit = limit.strip()
+        if not limit.isdigit() or int(limit) >= 2 ** 62:
+            return None  # "max" (v2) or the v1 "unlimited" sentinel
+
+        usage = _read_text(usage_file)
+        if usage is None or not usage.strip().isdigit():
+            return int(limit)
+        # Reclaimable page cache (e.g. model files just read) doesn't count as used
+        stat = _read_text(stat_file) or ""
+        match = _INACTIVE_FILE_RE.search(stat)
+        used = int(usage) - (int(match.group(1)) if match else 0)
+        return max(int(limit) - used, 0)
+    return None
 
 def get_available_ram_gb():
-    mem = psutil.virtual_memory()
-    return mem.available / (1024 ** 3)
+    # Linux: read MemAvailable directly instead of building psutil's full snapshot
+    available_gb = None
+    try:
+        with open("/proc/meminfo", "r") as f:
+            match = _MEMAVAILABLE_RE.search(f.read())
+        if match:
+            available_gb = int(match.group(1)) / (1024 ** 2)
+    except OSError:
+        pass
+
+    if available_gb is None:
+        import psutil
+        available_gb = psutil.virtual_memory().available / (1024 ** 3)
+
+    # Inside Docker/k8s the host figure ignores the container's memory limit
+    cgroup_bytes = get_cgroup_available_bytes()
+    if cgroup_bytes is not None:
+        available_gb = min(available_gb, cgroup_bytes / (1024 ** 3))
+    return available_gb
+
+# NVML device handles, initialised on first use (GPU topology is fixed for the process)
+_NVML_HANDLES = None
+
+def _visible_device_indices():
+    """Parse numeric CUDA_VISIBLE_DEVICES into NVML indices (None = all devices)"""
+    visible = os.environ.get("CUDA_VISIBLE_DEVICES")
+    if visible is None:
+        return None
+    indices = []
+    for item in visible.split(","):
+        item = item.strip()
+        if not item.isdigit():
+            # UUID/MIG identifiers: the mapping isn't index based, use every device
+            return None
+        indices.append(int(item))
+    return indices
+
+def _get_nvml_handles():
+    """Initialise NVML once and return the device handles, or None if unavailable"""
+    global _NVML_HANDLES
+    if _NVML_HANDLES is not None:
+        return _NVML_HANDLES
+
+    try:
+        import pynvml
+    except ImportError:
+        return None
+
+    try:
+        pynvml.nvmlInit()
+    except pynvml.NVMLError:
+        return None
+
+    try:
+        # NVML ignores CUDA_VISIBLE_DEVICES, so only query the devices CUDA will use
+        count = pynvml.nvmlDeviceGetCount()
+        indices = _visible_device_indices()
+        if indices is None:
+            indices = range(count)
+        handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in indices if i < count]
+    except pynvml.NVMLError:
+        pynvml.nvmlShutdown()
+        return None
+
+    atexit.register(pynvml.nvmlShutdown)
+    _NVML_HANDLES = handles
+    return _NVML_HANDLES
+
+def get_min_gpu_vram_gb():
+    """Return the smallest free VRAM (GB) across NVIDIA GPUs via NVML, or None"""
+    if GPU_DISABLED or os.environ.get("CUDA_VISIBLE_DEVICES") == "":
+        return None
+    handles = _get_nvml_handles()
+    if not handles:
+        return None
+
+    import pynvml
+    try:
+        free_bytes = [pynvml.nvmlDeviceGetMemoryInfo(h).free for h in handles]
+    except pynvml.NVMLError:
+        return None
+
+    return min(free_bytes) / (1024 ** 3)
+
+def is_igpu():
+    """Return True on NVIDIA integrated/unified-memory systems (Jetson/Tegra)"""
+    if Path("/etc/nv_tegra_release").exists():
+        return True
+    try:
+        with open("/proc/device-tree/compatible", "rb") as f:
+            return b"nvidia,tegra" in f.read()
+    except OSError:
+        return False
 
 def get_device_memory_gb():
     try:
-        if torch.cuda.is_available():
-            gpu_properties = torch.cuda.get_device_properties(0)
-            total_memory = gpu_properties.total_memory / (1024**3)
-            allocated_memory = torch.cuda.memory_allocated(0) / (1024**3)
-            available_memory = total_memory - allocated_memory
-            return available_memory, 'cuda'
-        elif torch.backends.mps.is_available():
+        if CUDA_AVAILABLE:
+            # Unified memory: VRAM queries only report kernel-free pages, so
+            # budget against available system RAM (page cache included)
+            if is_igpu():
+                return get_available_ram_gb(), 'cuda'
+            # NVML is an in-process driver query; fall back to torch if unavailable
+            vram_gb = get_min_gpu_vram_gb()
+            if vram_gb is not None:
+                return vram_gb, 'cuda'
+            # mem_get_info reports real free memory (other processes included)
+            # and follows CUDA_VISIBLE_DEVICES ordinals
+            import torch
+            try:
+                free_bytes = [torch.cuda.mem_get_info(i)[0] for i in range(torch.cuda.device_count())]
+            except RuntimeError:
+                free_bytes = []
+            if free_bytes:
+                return min(free_bytes) / (1024**3), 'cuda'
+            return get_available_ram_gb(), 'cuda'
+        elif MPS_AVAILABLE:
             available_memory = get_available_ram_gb()
             return available_memory * 0.8, 'mps'  
         else:
             # CPU only
             return get_available_ram_gb(), 'cpu'
     except Exception as e:
-        print(e)
+        logger.warning("Device memory detection failed, assuming CPU: %s", e)
         return get_available_ram_gb(), 'cpu'
 
 
-has_gpu = torch.cuda.is_available() or torch.backends.mps.is_available()
-device_type = 'cpu'
+# Hardware detection results are shared between processes started within
+# ENV_CACHE_TTL seconds (CLI calls, auto-restart children, workers).
+# Child processes receive the parent's result through DOCSRAY_DETECTED_ENV;
+# unrelated processes go through ENV_CACHE_FILE.
+# Set DOCSRAY_REDETECT=1 to force a fresh probe.
+ENV_CACHE_FILE = CACHE_DIR / "env.json"
+ENV_CACHE_TTL = 60
+ENV_CACHE_VAR = "DOCSRAY_DETECTED_ENV"
 
-available_gb, device_type = get_device_memory_gb()
+# Explicit CPU-only opt-out: skips every GPU probe and keeps models off the GPU
+GPU_DISABLED = os.environ.get("DOCSRAY_NO_GPU", "0") == "1"
+N_GPU_LAYERS = 0 if GPU_DISABLED else -1
+
+def _env_cache_key():
+    """Settings that change what detection would report"""
+    return {
+        "CUDA_VISIBLE_DEVICES": os.environ.get("CUDA_VISIBLE_DEVICES"),
+        "DOCSRAY_NO_GPU": GPU_DISABLED,
+    }
+
+def _valid_env_cache(data):
+    if not isinstance(data, dict) or data.get("key") != _env_cache_key():
+        return None
+    if time.time() - data.get("time", 0) > ENV_CACHE_TTL:
+        return None
+    return data
+
+def _load_env_cache():
+    if os.environ.get("DOCSRAY_REDETECT", "0") == "1":
+        return None
+    # 1) Inherited from the parent process: no filesystem access needed
+    try:
+        data = _valid_env_cache(json.loads(os.environ.get(ENV_CACHE_VAR, "")))
+    except ValueError:
+        data = None
+    if data is not None:
+        return data
+    # 2) Written by a recent sibling process
+    try:
+        with open(ENV_CACHE_FILE, "r") as f:
+            return _valid_env_cache(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+def _save_env_cache(data):
+    tmp_file = ENV_CACHE_FILE.with_name(f"{ENV_CACHE_FILE.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_file, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, ENV_CACHE_FILE)
+    except OSError:
+        pass
+
+_env_cache = _load_env_cache()
+if _env_cache is None:
+    if GPU_DISABLED:
+        CUDA_AVAILABLE = False
+        MPS_AVAILABLE = False
+    else:
+        # torch is only imported when there is no recent detection result to reuse
+        import torch
+        # Probe accelerators once; other modules should import these instead of re-probing
+        # (CUDA_VISIBLE_DEVICES="" hides every device, so don't initialise CUDA for it)
+        CUDA_AVAILABLE = os.environ.get("CUDA_VISIBLE_DEVICES") != "" and torch.cuda.is_available()
+        MPS_AVAILABLE = torch.backends.mps.is_available()
+    available_gb, device_type = get_device_memory_gb()
+    _env_cache = {
+        "key": _env_cache_key(),
+        "time": time.time(),
+        "cuda_available": CUDA_AVAILABLE,
+        "mps_available": MPS_AVAILABLE,
+        "available_gb": available_gb,
+        "device_type": device_type,
+    }
+    _save_env_cache(_env_cache)
+else:
+    CUDA_AVAILABLE = _env_cache["cuda_available"]
+    MPS_AVAILABLE = _env_cache["mps_available"]
+    available_gb = _env_cache["available_gb"]
+    device_type = _env_cache["device_type"]
+
+# Forked children inherit these globals as-is; spawned/exec'd children
+# (multiprocessing "spawn", auto_restart) pick the result up from here
+os.environ[ENV_CACHE_VAR] = json.dumps(_env_cache)
+
+has_gpu = CUDA_AVAILABLE or MPS_AVAILABLE
 
 
-FAST_MODE = False
 MAX_TOKENS = 32768
-STANDARD_MODE = False
-FULL_FEATURE_MODE = False
 min_available_gb = 8
 
+# (upper memory bound in GB, mode, MAX_TOKENS divisor), sorted by bound
+MODE_THRESHOLDS = [
+    (min_available_gb * 2, "FAST_MODE", 4),
+    (min_available_gb * 4, "STANDARD_MODE", 2),
+    (math.inf, "FULL_FEATURE_MODE", 1),
+]
+_MODE_BOUNDS = [bound for bound, _, _ in MODE_THRESHOLDS]
+
 if not has_gpu:
-    FAST_MODE = True
+    _mode, _divisor = "FAST_MODE", 4
     DISABLE_VISUAL_ANALYSIS = True
-    MAX_TOKENS = MAX_TOKENS // 4
 else:
-    if available_gb < min_available_gb * 2:
-        FAST_MODE = True
-        MAX_TOKENS = MAX_TOKENS // 4
-    elif available_gb < min_available_gb * 4:
-        STANDARD_MODE = True
-        MAX_TOKENS = MAX_TOKENS // 2         
-    else:
-        FULL_FEATURE_MODE = True
+    _, _mode, _divisor = MODE_THRESHOLDS[bisect.bisect_right(_MODE_BOUNDS, available_gb)]
+
+FAST_MODE = _mode == "FAST_MODE"
+STANDARD_MODE = _mode == "STANDARD_MODE"
+FULL_FEATURE_MODE = _mode == "FULL_FEATURE_MODE"
+MAX_TOKENS = MAX_TOKENS // _divisor
 
 FAST_MODELS = []
 STANDARD_MODELS = []
@@ -196,10 +430,53 @@ MODEL_TYPE_TO_SIZE = {
 # Get actual model size from type
 MODEL_SIZE = MODEL_TYPE_TO_SIZE.get(MODEL_TYPE, "4b")
 
+# Opt-in in-memory KV-state cache for text prompts (MB); lets repeated prompts
+# over the same document context reuse the prefill. Off by default: llama.cpp
+# already reuses the prefix shared with the previous prompt, and every cached
+# state also holds a copy of the logits (min(n_tokens, n_batch) x n_vocab
+# float32, ~0.5-1 GB for Gemma-3's 262k vocabulary) that this limit does not
+# count, so real RAM use can be several times the configured size.
+PROMPT_CACHE_MB = int(os.environ.get("DOCSRAY_PROMPT_CACHE_MB", "0"))
+
+# llama.cpp batching for the LLM: logical batch (tokens per decode call) and
+# physical micro-batch. Larger values can speed up prefill of long prompts, but
+# the logits buffer grows with n_batch x n_vocab (~0.5 GB at 512 for Gemma-3).
+LLM_N_BATCH = int(os.environ.get("DOCSRAY_N_BATCH", "512"))
+LLM_N_UBATCH = min(int(os.environ.get("DOCSRAY_N_UBATCH", "512")), LLM_N_BATCH)
+# Lock model weights in RAM (avoids page-outs under memory pressure; needs a
+# sufficient RLIMIT_MEMLOCK)
+USE_MLOCK = os.environ.get("DOCSRAY_MLOCK", "0") == "1"
+
+# Storage format of the CLI's persisted chunk embeddings: "none" (float32),
+# "int8" (4x smaller) or "binary" (sign bits, 32x smaller)
+INDEX_QUANT = os.environ.get("DOCSRAY_INDEX_QUANT", "none").lower()
+if INDEX_QUANT not in ("none", "int8", "binary"):
+    INDEX_QUANT = "none"
+
+# Documents with at least this many chunks also get an IVF-PQ index (needs the
+# optional faiss package) that shortlists candidates for whole-index searches
+PQ_MIN_CHUNKS = int(os.environ.get("DOCSRAY_PQ_MIN_CHUNKS", "20000"))
+
+# Coalescing window (ms) for single-text embedding requests from concurrent
+# callers (web/MCP); requests arriving within it share one batch. 0 disables it.
+EMBED_BATCH_WINDOW_MS = float(os.environ.get("DOCSRAY_EMBED_BATCH_MS", "0"))
+
+# Tokens per decode call for the embedding models. Several texts are packed
+# into one batch, and each text must fit in it whole (llama.cpp caps this at
+# the model's context length).
+EMBED_N_BATCH = int(os.environ.get("DOCSRAY_EMBED_N_BATCH", "2048"))
+
+# Upper bound on concurrent filesystem probes in MCP fan-out paths (folder
+# scans); wide parallelism mostly adds tail latency on slow or network mounts
+MCP_CONCURRENCY = max(1, int(os.environ.get("DOCSRAY_MCP_CONCURRENCY", "8")))
+
+
+logger.info("Device: %s, available memory: %.2f GB, MAX_TOKENS: %d", device_type, available_gb, MAX_TOKENS)
 
+# stdout is the JSON-RPC channel in MCP mode, so debug output goes to stderr
 if os.environ.get("DOCSRAY_DEBUG", "0") == "1":
-    print(f"Current Device: {device_type}")
-    print(f"Available Memory: {available_gb:.2f} GB")
-    print(f"FAST_MODE: {FAST_MODE}")
-    print(f"MAX_TOKENS: {MAX_TOKENS}")
-    print(f"FULL_FEATURE_MODE: {FULL_FEATURE_MODE}")
+    print(f"Current Device: {device_type}", file=sys.stderr)
+    print(f"Available Memory: {available_gb:.2f} GB", file=sys.stderr)
+    print(f"FAST_MODE: {FAST_MODE}", file=sys.stderr)
+    print(f"MAX_TOKENS: {MAX_TOKENS}", file=sys.stderr)
+    print(f"FULL_FEATURE_MODE: {FULL_FEATURE_MODE}", file=sys.stderr)
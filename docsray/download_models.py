@@ -3,78 +3,140 @@
 
 import os
 import sys
-import urllib.request
+import functools
+import threading
+import concurrent.futures
 from docsray.config import MODEL_DIR, FAST_MODE, STANDARD_MODE, FULL_FEATURE_MODE
 from docsray.config import ALL_MODELS, FAST_MODELS, STANDARD_MODELS, FULL_FEATURE_MODELS
 from docsray.config import MODEL_TYPE_TO_SIZE
 
+def _active_mode():
+    """Name of the active system mode (as used in a model's "required" list)"""
+    if STANDARD_MODE and not FAST_MODE:
+        return "STANDARD_MODE"
+    if FULL_FEATURE_MODE and not (FAST_MODE or STANDARD_MODE):
+        return "FULL_FEATURE_MODE"
+    # FAST_MODE, and the default when no mode is set
+    return "FAST_MODE"
+
+_MODE_MODELS = {
+    "FAST_MODE": FAST_MODELS,
+    "STANDARD_MODE": STANDARD_MODELS,
+    "FULL_FEATURE_MODE": FULL_FEATURE_MODELS,
+}
+
+def _is_embedding_model(model):
+    return "bge-m3" in model["file"] or "multilingual-e5" in model["file"]
+
 def get_models_for_download(model_type=None):
     """Get models to download based on model type and system mode"""
+    mode = _active_mode()
+    mode_models = _MODE_MODELS[mode]
+    
     # Include embedding models based on system mode
-    if FAST_MODE:
-        embedding_models = [m for m in FAST_MODELS if "bge-m3" in m["file"] or "multilingual-e5" in m["file"]]
-    elif STANDARD_MODE:
-        embedding_models = [m for m in STANDARD_MODELS if "bge-m3" in m["file"] or "multilingual-e5" in m["file"]]
-    elif FULL_FEATURE_MODE:
-        embedding_models = [m for m in FULL_FEATURE_MODELS if "bge-m3" in m["file"] or "multilingual-e5" in m["file"]]
-    else:
-        # Default to FAST mode embedding models
-        embedding_models = [m for m in FAST_MODELS if "bge-m3" in m["file"] or "multilingual-e5" in m["file"]]
+    embedding_models = [m for m in mode_models if _is_embedding_model(m)]
     
-    # Get LLM models for the specified type
+    # Get LLM models for the specified type (or the system mode's selection),
+    # keeping only the quantization level required by the system mode
     if model_type:
         model_size = MODEL_TYPE_TO_SIZE.get(model_type, "4b")
         llm_models = [m for m in ALL_MODELS if f"gemma-3-{model_size}-it" in m["file"]]
     else:
-        # If no specific type, use system mode selection
-        if FAST_MODE:
-            llm_models = [m for m in FAST_MODELS if "gemma" in m["file"]]
-        elif STANDARD_MODE:
-            llm_models = [m for m in STANDARD_MODELS if "gemma" in m["file"]]
-        elif FULL_FEATURE_MODE:
-            llm_models = [m for m in FULL_FEATURE_MODELS if "gemma" in m["file"]]
-        else:
-            llm_models = [m for m in ALL_MODELS if "gemma-3-4b-it" in m["file"]]  # Default to 4b
-    
-    # Filter LLM models based on system mode for quantization level
-    filtered_llm_models = []
-    for model in llm_models:
-        if FAST_MODE and "FAST_MODE" in model["required"]:
-            filtered_llm_models.append(model)
-        elif STANDARD_MODE and "STANDARD_MODE" in model["required"]:
-            filtered_llm_models.append(model)
-        elif FULL_FEATURE_MODE and "FULL_FEATURE_MODE" in model["required"]:
-            filtered_llm_models.append(model)
-        elif not (FAST_MODE or STANDARD_MODE or FULL_FEATURE_MODE):
-            # Default case - use fast mode models
-            if "FAST_MODE" in model["required"]:
-                filtered_llm_models.append(model)
+        llm_models = [m for m in mode_models if "gemma" in m["file"]]
+    filtered_llm_models = [m for m in llm_models if mode in m["required"]]
     
     return embedding_models + filtered_llm_models
 
 # Default models for backward compatibility
-if FAST_MODE:
-    models = FAST_MODELS
-elif STANDARD_MODE:
-    models = STANDARD_MODELS
-elif FULL_FEATURE_MODE:
-    models = FULL_FEATURE_MODELS
-else:
-    models = FAST_MODELS
-    
-
-def show_progress(block_num, block_size, total_size):
-    """Display download progress"""
-    if total_size > 0:
-        downloaded = block_num * block_size
-        percent = min((downloaded / total_size) * 100, 100)
+models = _MODE_MODELS[_active_mode()]
+    
+
+# Number of models fetched concurrently (downloads are network-bound)
+DOWNLOAD_WORKERS = max(1, int(os.environ.get("DOCSRAY_DOWNLOAD_WORKERS", "4")))
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+
+_print_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def _get_pool():
+    """Shared connection pool: reuses TCP/TLS connections across model files"""
+    import urllib3
+    return urllib3.PoolManager(
+        num_pools=8,
+        maxsize=DOWNLOAD_WORKERS,
+        # Transient network/server errors are retried transparently
+        retries=urllib3.Retry(total=5, backoff_factor=1.0,
+                              status_forcelist=[429, 500, 502, 503, 504]),
+    )
+
+def show_progress(name, downloaded, total_size, last_step):
+    """Print download progress in 10% steps (one line per step, safe across threads)"""
+    if total_size <= 0:
+        return last_step
+    percent = min((downloaded / total_size) * 100, 100)
+    step = int(percent // 10)
+    if step > last_step:
         downloaded_mb = downloaded / (1024 * 1024)
         total_mb = total_size / (1024 * 1024)
-        print(f"\rDownloading: {percent:.1f}% ({downloaded_mb:.1f}/{total_mb:.1f} MB)", 
-              end="", flush=True)
+        with _print_lock:
+            print(f"   {name}: {percent:.0f}% ({downloaded_mb:.1f}/{total_mb:.1f} MB)", flush=True)
+    return max(step, last_step)
+
+def _part_path(model_path):
+    return model_path.with_name(model_path.name + ".part")
+
+def _fetch(model, cancel_event=None):
+    """Stream one model to a .part file and move it into place on success
+    
+    An existing .part file (from an interrupted run) is resumed with an HTTP
+    Range request; it is kept on failure so the next run can resume again.
+    """
+    model_path = model["dir"] / model["file"]
+    part_path = _part_path(model_path)
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else None
+    resp = _get_pool().request("GET", model["url"], headers=headers, preload_content=False)
+    try:
+        if resp.status == 416 and offset:
+            # Range not satisfiable: the partial file is unusable, start over
+            resp.release_conn()
+            part_path.unlink()
+            return _fetch(model, cancel_event)
+        if resp.status == 206:
+            # Content-Range: bytes <start>-<end>/<total>
+            total_size = int(resp.headers.get("Content-Range", "/0").rsplit("/", 1)[-1] or 0)
+            mode = "ab"
+            with _print_lock:
+                print(f"   {model['file']}: resuming at {offset / (1024 * 1024):.1f} MB", flush=True)
+        elif resp.status == 200:
+            # Server ignored the Range header (or nothing to resume): restart
+            total_size = int(resp.headers.get("Content-Length", 0))
+            offset, mode = 0, "wb"
+        else:
+            raise RuntimeError(f"HTTP {resp.status}")
+        downloaded, last_step = offset, -1
+        with open(part_path, mode) as f:
+            for chunk in resp.stream(DOWNLOAD_CHUNK_SIZE):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise RuntimeError("Download cancelled")
+                f.write(chunk)
+                downloaded += len(chunk)
+                last_step = show_progress(model["file"], downloaded, total_size, last_step)
+        # Only a complete file is moved into place
+        if total_size and part_path.stat().st_size != total_size:
+            raise RuntimeError(f"Incomplete download ({part_path.stat().st_size}/{total_size} bytes); "
+                               f"run again to resume")
+        os.replace(part_path, model_path)
+    finally:
+        resp.release_conn()
+    return model_path
 
-def download_models(model_type=None, force=False):
-    """Download required models to user's home directory"""
+def download_models(model_type=None, force=False, abort_on_error=False):
+    """Download required models to user's home directory
+    
+    Failed models are reported and skipped (the rest keep downloading) unless
+    ``abort_on_error`` is set. Returns True if every model is in place.
+    """
     
     # Get models to download
     if model_type:
@@ -89,6 +151,8 @@ def download_models(model_type=None, force=False):
     print(f"Storage location: {MODEL_DIR}")
     print(f"Models to download: {len(models_to_download)}")
     
+    pending = []
+    failed = []
     for i, model in enumerate(models_to_download, 1):
         model_path = model["dir"] / model["file"]    
         print(f"\n[{i}/{len(models_to_download)}] Checking {model['file']}...")
@@ -101,46 +165,118 @@ def download_models(model_type=None, force=False):
             file_size = model_path.stat().st_size / (1024 * 1024)
             print(f"🔄 Force re-downloading ({file_size:.1f} MB)", file=sys.stderr)
         
-        print(f"📥 Starting download: {model['file']}", file=sys.stderr)
+        print(f"📥 Queued for download: {model['file']}", file=sys.stderr)
         print(f"URL: {model['url']}", file=sys.stderr)
         
         # Create directory
         model["dir"].mkdir(parents=True, exist_ok=True)
-        
+        pending.append(model)
+    
+    if pending:
+        print(f"\n📥 Downloading {len(pending)} model(s), up to {DOWNLOAD_WORKERS} at a time...", file=sys.stderr)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS,
+                                                         thread_name_prefix="docsray-download")
+        cancel_event = threading.Event()
+        futures = {executor.submit(_fetch, model, cancel_event): model for model in pending}
         try:
-            urllib.request.urlretrieve(
-                model["url"], 
-                str(model_path), 
-                reporthook=show_progress
-            )
-            print(f"\n✅ Completed: {model['file']}", file=sys.stderr)
-            
-            # Check file size
-            file_size = model_path.stat().st_size / (1024 * 1024)
-            print(f"   File size: {file_size:.1f} MB")
-            
-        except Exception as e:
-            print(f"\n❌ Failed: {model['file']}", file=sys.stderr)
-            print(f"   Error: {e}", file=sys.stderr)
-            
-            # Remove failed file
-            if model_path.exists():
-                model_path.unlink()
-            
-            print(f"   Manual download URL: {model['url']}", file=sys.stderr)
-            print(f"   Save to: {model_path}", file=sys.stderr)
-            
-            # Ask whether to continue
-            response = input("   Continue downloading? (y/n): ")
-            if response.lower() != 'y':
-                print("Download cancelled.", file=sys.stderr)
-                sys.exit(1)
+            for future in concurrent.futures.as_completed(futures):
+                model = futures[future]
+                model_path = model["dir"] / model["file"]
+                try:
+                    future.result()
+                    file_size = model_path.stat().st_size / (1024 * 1024)
+                    with _print_lock:
+                        print(f"✅ Completed: {model['file']} ({file_size:.1f} MB)", file=sys.stderr)
+                except Exception as e:
+                    failed.append(model["file"])
+                    with _print_lock:
+                        print(f"\n❌ Failed: {model['file']}", file=sys.stderr)
+                        print(f"   Error: {e}", file=sys.stderr)
+                        print(f"   Manual download URL: {model['url']}", file=sys.stderr)
+                        print(f"   Save to: {model_path}", file=sys.stderr)
+                        if _part_path(model_path).exists():
+                            print(f"   Partial download kept; run again to resume", file=sys.stderr)
+                    if abort_on_error:
+                        print("Download aborted (--abort-on-error).", file=sys.stderr)
+                        sys.exit(1)
+        except BaseException:
+            # Cancelled or interrupted: stop in-flight downloads (.part files are kept for resume)
+            cancel_event.set()
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+    
+    if failed:
+        print(f"\n⚠️  {len(failed)} model download(s) failed: {', '.join(failed)}", file=sys.stderr)
+        print("💡 Run 'docsray download-models' again to retry (partial files resume).", file=sys.stderr)
+        return False
     
     print("\n🎉 All model downloads completed!", file=sys.stderr)
     print("You can now use DocsRay!", file=sys.stderr)
+    return True
 
-def check_models(model_type=None):
-    """Check the status of currently downloaded models"""
+def _remote_size(url):
+    """Content-Length of a model URL (HEAD over the shared pool), or None if unknown"""
+    import urllib3
+    # Fail fast when offline instead of the download path's retry/backoff schedule
+    retries = urllib3.Retry(total=3, connect=1, read=1, backoff_factor=0)
+    resp = _get_pool().request("HEAD", url, timeout=10.0, retries=retries)
+    if resp.status != 200:
+        return None
+    length = resp.headers.get("Content-Length")
+    return int(length) if length else None
+
+def _scan_model_sizes():
+    """Map every file under MODEL_DIR (one level of model subdirectories) to its size
+    
+    One scandir pass per directory instead of an exists() + stat() per model,
+    which matters on network-mounted model directories.
+    """
+    sizes = {}
+    try:
+        with os.scandir(MODEL_DIR) as top:
+            subdirs = []
+            for entry in top:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                elif entry.is_file():
+                    sizes[entry.path] = entry.stat().st_size
+    except FileNotFoundError:
+        return sizes
+    for subdir in subdirs:
+        with os.scandir(subdir) as it:
+            for entry in it:
+                if entry.is_file():
+                    sizes[entry.path] = entry.stat().st_size
+    return sizes
+
+def _find_incomplete(models_to_check, local_sizes):
+    """Return {file: (local_bytes, remote_bytes)} for local models whose size doesn't match the server"""
+    present = [m for m in models_to_check if str(m["dir"] / m["file"]) in local_sizes]
+    if not present:
+        return {}
+    incomplete = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        futures = {executor.submit(_remote_size, m["url"]): m for m in present}
+        for future in concurrent.futures.as_completed(futures):
+            model = futures[future]
+            try:
+                remote = future.result()
+            except Exception:
+                continue  # unreachable/offline: can't tell, don't flag
+            local = local_sizes[str(model["dir"] / model["file"])]
+            if remote is not None and local != remote:
+                incomplete[model["file"]] = (local, remote)
+    return incomplete
+
+def check_models(model_type=None, validate=False):
+    """Check the status of currently downloaded models
+    
+    With ``validate=True`` the local file sizes are also compared against the
+    server (one HEAD per model); skipped when DOCSRAY_OFFLINE=1.
+    """
     
     # Get models to check
     if model_type:
@@ -158,19 +294,30 @@ def check_models(model_type=None):
     available_models = []
     missing_models = []
     
+    local_sizes = _scan_model_sizes()
     for model in models_to_check:
-        full_path = model["dir"] / model["file"]
+        full_path = str(model["dir"] / model["file"])
         
-        if full_path.exists():
-            file_size = full_path.stat().st_size / (1024 * 1024)
+        if full_path in local_sizes:
+            file_size = local_sizes[full_path] / (1024 * 1024)
             total_size += file_size
             available_models.append((model['file'], file_size))
         else:
             missing_models.append(model['file'])
     
+    incomplete = {}
+    if validate and os.environ.get("DOCSRAY_OFFLINE", "0") != "1":
+        print("🌐 Validating file sizes against the server...", file=sys.stderr)
+        incomplete = _find_incomplete(models_to_check, local_sizes)
+    
     print("\n📊 Available Models:", file=sys.stderr)
     for desc, size in available_models:
-        print(f"  ✅ {desc}: {size:.1f} MB", file=sys.stderr)
+        if desc in incomplete:
+            local, remote = incomplete[desc]
+            print(f"  ⚠️  {desc}: {size:.1f} MB (incomplete or corrupt: "
+                  f"{local / (1024 * 1024):.1f}/{remote / (1024 * 1024):.1f} MB)", file=sys.stderr)
+        else:
+            print(f"  ✅ {desc}: {size:.1f} MB", file=sys.stderr)
     
     if missing_models:
         print("\n❌ Missing Models:", file=sys.stderr)
@@ -183,6 +330,10 @@ def check_models(model_type=None):
         gb_size = total_size / 1024
         print(f"  • Total size: {total_size:.1f} MB ({gb_size:.2f} GB)", file=sys.stderr)
     
+    if incomplete:
+        print(f"\n⚠️  {len(incomplete)} models don't match the server size.", file=sys.stderr)
+        print("💡 Run 'docsray download-models --force' to re-download them.", file=sys.stderr)
+    
     if missing_models:
         print(f"\n⚠️  {len(missing_models)} models are missing.", file=sys.stderr)
         print("💡 Run 'docsray download-models' to download them.", file=sys.stderr)
@@ -196,7 +347,7 @@ def check_models(model_type=None):
                 print("💡 Run 'docsray setup' to install dependencies automatically.", file=sys.stderr)
         except:
             pass
-    else:
+    elif not incomplete:
         print("\n✅ All models are ready for use!", file=sys.stderr)
         
         # Also check dependencies
@@ -212,6 +363,7 @@ def check_models(model_type=None):
     return {
         'available': len(available_models),
         'missing': len(missing_models),
+        'incomplete': len(incomplete),
         'total_size_mb': total_size
     }
 
@@ -222,13 +374,15 @@ def main():
     parser = argparse.ArgumentParser(description="DocsRay Model Download Tool")
     parser.add_argument("--check", action="store_true", help="Check current model status only")
     parser.add_argument("--force", action="store_true", help="Force re-download existing models")
+    parser.add_argument("--abort-on-error", action="store_true", help="Stop at the first failed download")
     
     args = parser.parse_args()
     
     if args.check:
-        check_models()
+        check_models(validate=True)
     else:
-        download_models(force=args.force)
+        ok = download_models(force=args.force, abort_on_error=args.abort_on_error)
+        sys.exit(0 if ok else 1)
 
 if __name__ == "__main__":
     main()
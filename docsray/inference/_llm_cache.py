@@ -0,0 +1,48 @@
+# src/inference/_llm_cache.py
+"""
+Process-wide cache of loaded LLM instances.
+
+Entries are keyed by the identity of the GGUF files on disk (absolute path,
+mtime, size), so asking for the same model again returns the instance that
+is already loaded, while a replaced or re-downloaded file gets a fresh load.
+Nothing is shared across processes; each worker process keeps its own.
+"""
+
+import os
+import threading
+
+_CACHE = {}
+_LOCK = threading.RLock()
+
+
+def _file_key(path):
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def cache_key(model_path, mmproj_path=None):
+    """Cache key for a model (and optional multimodal projector) file"""
+    return (_file_key(model_path), _file_key(mmproj_path))
+
+
+def get_or_load(model_path, mmproj_path, loader):
+    """Return the cached instance for these files, calling loader() on a miss"""
+    key = cache_key(model_path, mmproj_path)
+    with _LOCK:
+        model = _CACHE.get(key)
+        if model is None:
+            model = loader()
+            _CACHE[key] = model
+        return model
+
+
+def clear():
+    """Drop all cached instances (they are freed once no longer referenced)"""
+    with _LOCK:
+        _CACHE.clear()
@@ -1,13 +1,24 @@
 # src/inference/embedding_model.py 
+import functools
 from llama_cpp import Llama
 import numpy as np
-import torch
 import os
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from contextlib import redirect_stderr
 from docsray.config import FAST_MODE, STANDARD_MODE, FULL_FEATURE_MODE, MAX_TOKENS
 from docsray.config import ALL_MODELS, FAST_MODELS, STANDARD_MODELS, FULL_FEATURE_MODELS, MODEL_DIR
+from docsray.config import CUDA_AVAILABLE, MPS_AVAILABLE, N_GPU_LAYERS, USE_MLOCK
+from docsray.config import EMBED_BATCH_WINDOW_MS, EMBED_N_BATCH
+
+try:
+    import numba
+except ImportError:
+    numba = None
 
 def get_embedding_model_paths(models_list):
     """Get the paths for embedding models based on the mode"""    
@@ -24,10 +35,111 @@ def get_embedding_model_paths(models_list):
 
 EPS = 1e-8              
 
-def _l2_normalize(arr):
-    arr = np.asarray(arr, dtype=np.float32)
-    norm = np.linalg.norm(arr, axis=-1, keepdims=True) + EPS
-    return arr / norm
+if numba is not None:
+    @numba.njit(fastmath=True, cache=True)
+    def _fuse_rows(a, b, out):
+        # One read pass for each row's norm, one write pass for the scaled
+        # concatenation; the row is still in cache for the second
+        d1 = a.shape[1]
+        for i in range(a.shape[0]):
+            s = 0.0
+            for j in range(d1):
+                s += a[i, j] * a[i, j]
+            for j in range(b.shape[1]):
+                s += b[i, j] * b[i, j]
+            inv = 1.0 / (np.sqrt(s) + EPS)
+            for j in range(d1):
+                out[i, j] = a[i, j] * inv
+            for j in range(b.shape[1]):
+                out[i, d1 + j] = b[i, j] * inv
+else:
+    def _fuse_rows(a, b, out):
+        # Norms straight from the two inputs, then each half is scaled directly
+        # into its slice of out (no separate copy or in-place divide pass)
+        sq = np.einsum("ij,ij->i", a, a)
+        sq += np.einsum("ij,ij->i", b, b)
+        inv = 1.0 / (np.sqrt(sq) + EPS)
+        d1 = a.shape[1]
+        np.multiply(a, inv[:, None], out=out[:, :d1])
+        np.multiply(b, inv[:, None], out=out[:, d1:])
+
+
+class _FusionBuffers:
+    """
+    Float32 staging matrices for the two models' raw outputs, reused across
+    batches (grown on demand). The fused result is a fresh array because
+    callers keep it.
+    """
+
+    def __init__(self):
+        self._bufs = [np.empty((0, 0), dtype=np.float32), np.empty((0, 0), dtype=np.float32)]
+
+    def _stage(self, slot, embs):
+        n, d = len(embs), len(embs[0])
+        buf = self._bufs[slot]
+        if buf.shape[0] < n or buf.shape[1] != d:
+            buf = np.empty((max(n, buf.shape[0]), d), dtype=np.float32)
+            self._bufs[slot] = buf
+        view = buf[:n]
+        view[...] = embs
+        return view
+
+    def fuse(self, embs_1, embs_2):
+        """Concatenate two embedding batches with each row L2-normalized"""
+        a = self._stage(0, embs_1)
+        b = self._stage(1, embs_2)
+        out = np.empty((a.shape[0], a.shape[1] + b.shape[1]), dtype=np.float32)
+        _fuse_rows(a, b, out)
+        return out
+
+
+def _warm_up_fusion():
+    """Compile (or load the cached) numba kernel now rather than on the first embed"""
+    if numba is not None:
+        tiny = np.ones((1, 2), dtype=np.float32)
+        _fuse_rows(tiny, tiny, np.empty((1, 4), dtype=np.float32))
+
+class _EmbeddingBatcher:
+    """Coalesces single-text requests from concurrent callers into get_embeddings batches"""
+
+    def __init__(self, model, window_s, max_batch=32):
+        self._model = model
+        self._window = window_s
+        self._max_batch = max_batch
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="docsray-embed-batch", daemon=True).start()
+
+    def submit(self, text, is_query=False):
+        future = Future()
+        self._queue.put((text, bool(is_query), future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            # Block for the first request, then gather whatever arrives within the window
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            for is_query in (False, True):
+                group = [item for item in batch if item[1] == is_query]
+                if not group:
+                    continue
+                try:
+                    embs = self._model.get_embeddings([text for text, _, _ in group], is_query=is_query)
+                except Exception as e:
+                    for _, _, future in group:
+                        future.set_exception(e)
+                    continue
+                for (_, _, future), emb in zip(group, embs):
+                    future.set_result(emb)
 
 class EmbeddingModel:
     def __init__(self, model_name_1, model_name_2, device="cpu"):
@@ -53,66 +165,85 @@ class EmbeddingModel:
             with redirect_stderr(devnull):        
                 self.model_1 = Llama(
                     model_path=model_name_1,
-                    n_gpu_layers=-1,
+                    n_gpu_layers=N_GPU_LAYERS,
                     n_ctx=0,
+                    n_batch=EMBED_N_BATCH,
+                    n_ubatch=EMBED_N_BATCH,
                     logits_all=False,
                     embedding=True,
-                    flash_attn= True,
+                    flash_attn=True,
+                    use_mlock=USE_MLOCK,
                     verbose=False
                 )
                 self.model_2 = Llama(
                     model_path=model_name_2,
-                    n_gpu_layers=-1,
+                    n_gpu_layers=N_GPU_LAYERS,
                     n_ctx=0,
+                    n_batch=EMBED_N_BATCH,
+                    n_ubatch=EMBED_N_BATCH,
                     logits_all=False,
                     embedding=True,
+                    flash_attn=True,
+                    use_mlock=USE_MLOCK,
                     verbose=False
                 )
 
+        # The two models have separate contexts and llama.cpp releases the GIL,
+        # so model_2 runs on this helper thread while model_1 runs on the caller's
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="docsray-embed")
+        # ... but each context must only serve one request at a time
+        self._lock = threading.Lock()
+        self._fusion = _FusionBuffers()
+        _warm_up_fusion()
+        self._batcher = (
+            _EmbeddingBatcher(self, EMBED_BATCH_WINDOW_MS / 1000.0) if EMBED_BATCH_WINDOW_MS > 0 else None
+        )
+
+    @staticmethod
+    def _embed(model, texts):
+        """Embed a list of texts in one create_embedding call (results keep input order)"""
+        return [d["embedding"] for d in model.create_embedding(texts)["data"]]
 
     def get_embedding(self, text: str, is_query: bool = False):
         """
-        Return the embedding (1-D list[float]) for a single sentence.
+        Return the embedding (1-D numpy array) for a single sentence.
         """
-        text_1 = text.strip()
-        if is_query:
-            text_2 = "query: " + text.strip()
-        else:   
-            text_2 = "passage: " + text.strip()
-
-        emb_1 = self.model_1.create_embedding(text_1)["data"][0]["embedding"]
-        emb_2 = self.model_2.create_embedding(text_2)["data"][0]["embedding"] 
-        emb = np.concatenate([emb_1, emb_2])
-        emb = _l2_normalize(emb)
-
-        return emb
+        if self._batcher is not None:
+            return self._batcher.submit(text, is_query)
+        return self.get_embeddings([text], is_query=is_query)[0]
 
     def get_embeddings(self, texts: list, is_query: bool = False):
         """
         Return embeddings (2-D numpy array) for multiple sentences.
         """
+        # e5 expects a "query: " / "passage: " prefix; bge-m3 takes the bare text
         texts_1 = [t.strip() for t in texts]
-        if is_query:
-            texts_2 = ["query: " + t.strip() for t in texts]
-        else:
-            texts_2 = ["passage: " + t.strip() for t in texts]
+        prefix = "query: " if is_query else "passage: "
+        texts_2 = [prefix + t for t in texts_1]
 
-        embs_1 = [self.model_1.create_embedding(t)["data"][0]["embedding"] for t in texts_1]
-        embs_2 = [self.model_2.create_embedding(t)["data"][0]["embedding"] for t in texts_2]
-        embs = [np.concatenate([e1, e2]) for e1, e2 in zip(embs_1, embs_2)]
-        embs = _l2_normalize(embs)   
+        if not texts_1:
+            return np.empty((0, 0), dtype=np.float32)
+
+        with self._lock:
+            future = self._executor.submit(self._embed, self.model_2, texts_2)
+            embs_1 = self._embed(self.model_1, texts_1)
+            embs_2 = future.result()
+            # Inside the lock: the staging buffers are shared
+            embs = self._fusion.fuse(embs_1, embs_2)
 
         return embs
 
 
-if torch.cuda.is_available():
+if CUDA_AVAILABLE:
     device = "cuda"
-elif torch.backends.mps.is_available():
+elif MPS_AVAILABLE:
     device = "mps"
 else:
     device = "cpu"
 
+@functools.lru_cache(maxsize=1)
 def get_embedding_model():  
+    """Process-wide embedding model, loaded on first call"""
     if FAST_MODE:
         model_name_1, model_name_2 = get_embedding_model_paths(FAST_MODELS)
     elif STANDARD_MODE: 
@@ -128,4 +259,10 @@ def get_embedding_model():
     
     return embedding_model
 
-embedding_model = get_embedding_model()
+
+def __getattr__(name):
+    # Kept for `from docsray.inference.embedding_model import embedding_model`;
+    # the models load on first access instead of at import time
+    if name == "embedding_model":
+        return get_embedding_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
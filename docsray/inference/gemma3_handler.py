@@ -245,8 +245,11 @@ def resize_images_uniform(pil_images, target_size=(800, 600)):
     """
     resized_images = []
     for img in pil_images:
-        # Resize maintaining aspect ratio
-        img_copy = img.copy()
+        # Resize maintaining aspect ratio. Oversized images are first shrunk by
+        # an integer factor with a cheap box reduce (which also replaces the
+        # full-resolution copy), so LANCZOS only runs on the remaining <2x step
+        factor = min(img.width // target_size[0], img.height // target_size[1])
+        img_copy = img.reduce(factor) if factor >= 2 else img.copy()
         img_copy.thumbnail(target_size, Image.Resampling.LANCZOS)
         
         # Add padding to match exact target_size
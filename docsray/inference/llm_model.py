@@ -1,19 +1,29 @@
 # src/inference/llm_model.py 
 
-import torch
-from llama_cpp import Llama
+from llama_cpp import Llama, LlamaRAMCache
 
 import os
 import sys
 from pathlib import Path
 from docsray.config import FAST_MODE, STANDARD_MODE, FULL_FEATURE_MODE, MAX_TOKENS, MODEL_SIZE, MODEL_TYPE, MODEL_TYPE_TO_SIZE
 from docsray.config import ALL_MODELS, FAST_MODELS, STANDARD_MODELS, FULL_FEATURE_MODELS
+from docsray.config import CUDA_AVAILABLE, MPS_AVAILABLE, N_GPU_LAYERS, PROMPT_CACHE_MB
+from docsray.config import LLM_N_BATCH, LLM_N_UBATCH, USE_MLOCK
 
-import base64
+import binascii
+import hashlib
 import io
+import threading
+from collections import OrderedDict
 from PIL import Image
 from contextlib import redirect_stderr
 from docsray.inference.gemma3_handler import Gemma3ChatHandler, merge_images_to_grid
+from docsray.inference import _llm_cache
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 def get_gemma_model_paths(mode_models, model_size="4b"):
     model_path = None
     mmproj_path = None
@@ -34,19 +44,60 @@ class LlamaTokenizer:
     def __call__(self, text, add_bos=True, return_tensors=None):
         ids = self._llama.tokenize(text, add_bos=add_bos)
         if return_tensors == "pt":
+            import torch  # only needed for tensor output; keeps module import light
             return torch.tensor([ids])
         return ids
 
     def decode(self, ids):
         return self._llama.detokenize(ids).decode("utf-8", errors="ignore")
 
+# Multiple of 3, so chunked base64 output concatenates without padding
+_B64_CHUNK = 57 * 1024
+
 def image_to_base64_data_uri(image: Image.Image, format: str = "JPEG", quality: int = 85) -> str:
     """Convert PIL Image to base64 data URI."""
     buffered = io.BytesIO()
-    image.save(buffered, format=format, quality=quality, optimize=True)
-    img_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
-    mime_type = f"image/{format.lower()}"
-    return f'data:{mime_type};base64,{img_base64}'
+    if format.upper() == "PNG":
+        # PNG ignores quality; optimize=True forces the slowest zlib search for a
+        # few percent of size, and the bytes only travel in-process to the model
+        image.save(buffered, format=format, compress_level=1)
+    else:
+        image.save(buffered, format=format, quality=quality, optimize=True)
+    # Encode straight from the buffer's memory (no getvalue() copy) in chunks
+    # into one bytearray that already holds the data-URI prefix
+    data = buffered.getbuffer()
+    out = bytearray(f"data:image/{format.lower()};base64,".encode("ascii"))
+    for i in range(0, len(data), _B64_CHUNK):
+        out += binascii.b2a_base64(data[i:i + _B64_CHUNK], newline=False)
+    data.release()
+    return out.decode("ascii")
+
+# Recently encoded images: repeated questions about the same page skip the
+# image encode and base64 rebuild
+IMAGE_URI_CACHE_SIZE = 8
+_image_uri_cache = OrderedDict()
+_image_uri_lock = threading.Lock()
+
+def _image_digest(image: Image.Image) -> int:
+    data = image.tobytes()
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).intdigest()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+def cached_image_to_base64_data_uri(image: Image.Image, format: str = "JPEG", quality: int = 85) -> str:
+    """image_to_base64_data_uri with a small LRU cache keyed on the pixel data"""
+    key = (_image_digest(image), image.size, image.mode, format, quality)
+    with _image_uri_lock:
+        uri = _image_uri_cache.get(key)
+        if uri is not None:
+            _image_uri_cache.move_to_end(key)
+            return uri
+    uri = image_to_base64_data_uri(image, format=format, quality=quality)
+    with _image_uri_lock:
+        _image_uri_cache[key] = uri
+        while len(_image_uri_cache) > IMAGE_URI_CACHE_SIZE:
+            _image_uri_cache.popitem(last=False)
+    return uri
     
 class LocalLLM:
     def __init__(self, model_name=None, mmproj_name=None, device="gpu", is_multimodal=False):
@@ -76,14 +127,35 @@ class LocalLLM:
             with redirect_stderr(devnull):
                 self.model = Llama( 
                     model_path=model_name,
-                    n_gpu_layers=-1,
+                    n_gpu_layers=N_GPU_LAYERS,
                     n_ctx=MAX_TOKENS,
+                    n_batch=LLM_N_BATCH,
+                    n_ubatch=LLM_N_UBATCH,
+                    use_mmap=True,
+                    use_mlock=USE_MLOCK,
+                    offload_kqv=True,
                     verbose=False,
                     flash_attn=True,
                     chat_handler=chat_handler
                 )
                 self.tokenizer = LlamaTokenizer(self.model)
 
+        # Gemma chat template and sampling settings, built once per model
+        self._prompt_prefix = "<start_of_turn>user\n"
+        self._prompt_suffix = "<end_of_turn>\n<start_of_turn>model\n"
+        self._stop = ['<end_of_turn>', '<eos>']
+        self._sampling = dict(temperature=0.7, top_p=0.95, repeat_penalty=1.1)
+
+        # Optional prompt (KV state) cache for the text path (DOCSRAY_PROMPT_CACHE_MB);
+        # see config.PROMPT_CACHE_MB for its untracked memory cost
+        self._prompt_cache = None
+        if PROMPT_CACHE_MB > 0:
+            self._prompt_cache = LlamaRAMCache(capacity_bytes=PROMPT_CACHE_MB << 20)
+            self.model.set_cache(self._prompt_cache)
+
+        # A llama context is not safe to use from two threads at once
+        self._lock = threading.Lock()
+
     def generate(self, prompt, images=None):
         """
         Generate text from prompt, optionally with an image for multimodal models.
@@ -92,10 +164,14 @@ class LocalLLM:
             prompt: Text prompt
             image: PIL Image object (optional)
         """
+        with self._lock:
+            return self._generate(prompt, images)
+
+    def _generate(self, prompt, images=None):
         if images is not None and self.is_multimodal:
             image = merge_images_to_grid(images)
             # Convert image to data URI
-            image_uri = image_to_base64_data_uri(image, format="PNG")
+            image_uri = cached_image_to_base64_data_uri(image, format="PNG")
             messages = [
                 {
                     "role": "user",
@@ -105,50 +181,55 @@ class LocalLLM:
                     ]
                 }
             ]
-            # Use chat completion API for multimodal input
-            response = self.model.create_chat_completion(
-                messages=messages,
-                stop = ['<end_of_turn>', '<eos>'],
-                max_tokens=MAX_TOKENS//16,
-                temperature=0.7,
-                top_p=0.95,
-                repeat_penalty=1.1
-            )
+            # Use chat completion API for multimodal input. Image embeddings are
+            # fed outside the token stream, so keep them out of the prompt cache
+            self.model.set_cache(None)
+            try:
+                response = self.model.create_chat_completion(
+                    messages=messages,
+                    stop=self._stop,
+                    max_tokens=MAX_TOKENS//16,
+                    **self._sampling
+                )
+            finally:
+                self.model.set_cache(self._prompt_cache)
             result = response['choices'][0]['message']['content']  
             return result.strip()
         
         else:
             # Text-only generation
-            formatted_prompt = f"<start_of_turn>user\n{prompt}<end_of_turn>\n<start_of_turn>model\n"
+            formatted_prompt = self._prompt_prefix + prompt + self._prompt_suffix
             
             answer = self.model(
                 formatted_prompt,
-                stop=['<end_of_turn>', '<eos>'],
+                stop=self._stop,
                 max_tokens=MAX_TOKENS,
-                echo=True,
-                temperature=0.7,
-                top_p=0.95,
-                repeat_penalty=1.1,
+                echo=False,
+                **self._sampling
             )
             
             result = answer['choices'][0]['text']
             return result.strip()
     
+    def fit_to_tokens(self, text, max_tokens):
+        """Trim text so it tokenizes to at most max_tokens (measured with the model's tokenizer)"""
+        if not text or max_tokens <= 0:
+            return ""
+        tokens = self.model.tokenize(text.encode("utf-8"), add_bos=False)
+        if len(tokens) <= max_tokens:
+            return text
+        return self.model.detokenize(tokens[:max_tokens]).decode("utf-8", errors="ignore")
+
     def strip_response(self, response):
-        """Extract the model's response from the full generated text."""
+        """Clean up generated text (generate() returns only the completion, not the prompt)."""
         if not response:
             return response
-            
-        if '<start_of_turn>model' in response:
-            response = response.split('<start_of_turn>model')[-1]
-        if '<end_of_turn>' in response:
-            response = response.split('<end_of_turn>')[0]
-        return response.strip().lstrip('\n')
+        return response.partition('<end_of_turn>')[0].strip()
 
 
-if torch.cuda.is_available():
+if CUDA_AVAILABLE:
     device = "cuda"
-elif torch.backends.mps.is_available():
+elif MPS_AVAILABLE:
     device = "mps"
 else:
     device = "cpu"
@@ -171,10 +252,22 @@ def get_llm_models(model_size=None, model_type=None):
         model_path, mmproj_path = get_gemma_model_paths(STANDARD_MODELS, size)
     else:
         model_path, mmproj_path = get_gemma_model_paths(FULL_FEATURE_MODELS, size)
-            
-    local_llm = LocalLLM(model_name=model_path, mmproj_name=mmproj_path, device=device, is_multimodal=True)
+    
+    # Reuse an already-loaded instance of the same (unchanged) GGUF files;
+    # loading them again would double VRAM/RAM use and load time
+    local_llm = _llm_cache.get_or_load(
+        model_path, mmproj_path,
+        lambda: LocalLLM(model_name=model_path, mmproj_name=mmproj_path, device=device, is_multimodal=True)
+    )
     
     return local_llm
 
 
-local_llm = get_llm_models()
+def __getattr__(name):
+    # `local_llm` is created on first access rather than at import time, so
+    # importing this module (or modules that use it) stays cheap
+    if name == "local_llm":
+        model = get_llm_models()
+        globals()["local_llm"] = model
+        return model
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,12 +3,19 @@
 
 """Enhanced MCP Server for DocsRay PDF Question-Answering System with Visual Analysis Control"""
 
+import argparse
 import asyncio
+import csv
+import hashlib
 import json
 import os
 import pickle
+import sqlite3
 import sys
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 import numpy as np
@@ -21,13 +28,15 @@ from mcp.types import Tool, TextContent
 # DocsRay imports
 from docsray.chatbot import PDFChatBot, DEFAULT_SYSTEM_PROMPT
 from docsray.scripts import pdf_extractor, chunker, build_index, section_rep_builder
-from docsray.inference.llm_model import local_llm
-from docsray.inference.embedding_model import embedding_model
-from docsray.scripts.file_converter import FileConverter
+from docsray.inference import llm_model  # model loads on first use of llm_model.local_llm
+from docsray.inference.embedding_model import get_embedding_model
+from docsray.scripts.file_converter import get_converter
 from docsray.config import FAST_MODE, DISABLE_VISUAL_ANALYSIS
 from docsray.config import MODEL_DIR, FAST_MODE, STANDARD_MODE, FULL_FEATURE_MODE
+from docsray.config import MCP_CONCURRENCY
 from docsray.download_models import check_models
 from docsray.search.vector_search import vector_search_with_metadata
+from docsray.utils import json_io
 
 SCRIPT_DIR = Path(__file__).parent.absolute()
 base_dir = SCRIPT_DIR / "data"
@@ -83,12 +92,51 @@ try:
 except Exception as e:
     print(f"Warning: Model check failed: {e}", file=sys.stderr)
 
+# Candidate folders probed at once by get_recommended_search_paths
+PATH_PROBE_WORKERS = MCP_CONCURRENCY
+# Probes slower than this (seconds) are reported as they finish
+SLOW_PROBE_SECONDS = 1.0
+
+
+def _probe_search_path(path_info: Dict[str, Any], converter) -> Optional[Dict[str, Any]]:
+    """Quick non-recursive stats for one candidate folder; None if it can't be read."""
+    path = path_info["path"]
+    try:
+        if not (path.exists() and path.is_dir()):
+            return None
+        doc_count = 0
+        total_size = 0
+        subdir_count = 0
+        for item in path.iterdir():
+            try:
+                if item.is_dir():
+                    subdir_count += 1
+                elif item.is_file():
+                    if item.suffix.lower() == '.pdf' or converter.is_supported(str(item)):
+                        doc_count += 1
+                        total_size += item.stat().st_size
+            except OSError:
+                pass
+    except Exception:
+        return None
+
+    return {
+        "path": str(path),
+        "exists": True,
+        "description": path_info["description"],
+        "category": path_info["category"],
+        "immediate_docs": doc_count,
+        "immediate_size_mb": total_size / (1024 * 1024) if total_size > 0 else 0,
+        "is_cloud": path_info["category"] == "cloud",
+        "is_primary": path_info["category"] == "primary",
+        "subdirs": subdir_count
+    }
+
 def get_recommended_search_paths() -> List[Dict[str, Any]]:
     """
     Get recommended search paths based on the operating system and common document locations.
     Returns a list of recommended paths with descriptions and document counts.
     """
-    recommendations = []
     home = Path.home()
     system = platform.system()
     
@@ -148,49 +196,25 @@ def get_recommended_search_paths() -> List[Dict[str, Any]]:
                 "category": "work"
             })
     
-    # Check each path and get quick stats
-    converter = FileConverter()
-    for path_info in common_paths:
-        path = path_info["path"]
-        if path.exists() and path.is_dir():
-            try:
-                # Quick count of documents (non-recursive)
-                doc_count = 0
-                total_size = 0
-                
-                for item in path.iterdir():
-                    if item.is_file():
-                        if item.suffix.lower() == '.pdf' or converter.is_supported(str(item)):
-                            doc_count += 1
-                            try:
-                                total_size += item.stat().st_size
-                            except:
-                                pass
-                
-                recommendation = {
-                    "path": str(path),
-                    "exists": True,
-                    "description": path_info["description"],
-                    "category": path_info["category"],
-                    "immediate_docs": doc_count,
-                    "immediate_size_mb": total_size / (1024 * 1024) if total_size > 0 else 0,
-                    "is_cloud": path_info["category"] == "cloud",
-                    "is_primary": path_info["category"] == "primary"
-                }
-                
-                # Estimate subdirectory count for recursion depth
-                try:
-                    subdir_count = sum(1 for item in path.iterdir() if item.is_dir())
-                    recommendation["subdirs"] = subdir_count
-                except:
-                    recommendation["subdirs"] = 0
-                
-                recommendations.append(recommendation)
-                
-            except PermissionError:
-                continue
-            except Exception:
-                continue
+    # Probe all candidate paths concurrently (slow/cloud/network mounts overlap);
+    # a path that fails is simply left out
+    converter = get_converter()
+
+    def _timed_probe(path_info):
+        start = time.perf_counter()
+        return _probe_search_path(path_info, converter), time.perf_counter() - start
+
+    probed = [None] * len(common_paths)
+    with ThreadPoolExecutor(max_workers=PATH_PROBE_WORKERS) as pool:
+        futures = {pool.submit(_timed_probe, info): i for i, info in enumerate(common_paths)}
+        # Handle each probe as soon as it finishes so slow folders show up right away
+        for future in as_completed(futures):
+            i = futures[future]
+            probed[i], elapsed = future.result()
+            if elapsed > SLOW_PROBE_SECONDS:
+                print(f"🐢 Slow folder probe: {common_paths[i]['path']} ({elapsed:.1f}s)", file=sys.stderr)
+    # Keep candidate order so ties in the sort below stay deterministic
+    recommendations = [rec for rec in probed if rec is not None]
     
     # Sort recommendations by priority
     def sort_key(rec):
@@ -223,7 +247,7 @@ def analyze_path_for_search(path: str) -> Dict[str, Any]:
             return {"error": "Path is not a directory"}
         
         # Quick analysis
-        converter = FileConverter()
+        converter = get_converter()
         stats = {
             "path": str(target_path),
             "total_items": 0,
@@ -330,7 +354,7 @@ def search_files_in_path(
             }
         
         # Setup file extensions
-        converter = FileConverter()
+        converter = get_converter()
         if extensions:
             # Validate extensions
             valid_extensions = []
@@ -574,8 +598,9 @@ def _save_cache(pdf_basename: str, sections: List, chunk_index: List) -> None:
     sec_path, idx_path = _cache_paths(pdf_basename)
     with open(sec_path, "w", encoding="utf-8") as f:
         json.dump(sections, f, ensure_ascii=False, indent=2)
+    data = pickle.dumps(chunk_index, protocol=pickle.HIGHEST_PROTOCOL)
     with open(idx_path, "wb") as f:
-        pickle.dump(chunk_index, f)
+        f.write(data)
 
 def _load_cache(pdf_basename: str) -> Tuple[Optional[List], Optional[List]]:
     """Load processed PDF data from cache."""
@@ -756,7 +781,7 @@ def get_directory_info(folder_path: Optional[str] = None) -> Dict[str, Any]:
     else:
         target_dir = current_pdf_folder
     
-    converter = FileConverter()
+    converter = get_converter()
     
     info = {
         "path": str(target_dir),
@@ -820,7 +845,7 @@ def list_documents(folder_path: Optional[str] = None) -> List[Dict[str, str]]:
     if not doc_dir.exists():
         return []
     
-    converter = FileConverter()
+    converter = get_converter()
     documents = []
     
     for file_path in doc_dir.iterdir():
@@ -871,6 +896,27 @@ def process_pdf(pdf_path: str, analyze_visuals: bool = None) -> Tuple[List, List
     
     return sections, chunk_index, pages_text
 
+# Chatbot for the loaded document, kept across ask_question calls
+_chatbot_state: Dict[str, Any] = {"sections": None, "index": None, "prompt": None, "bot": None}
+
+def _get_chatbot() -> PDFChatBot:
+    """Return the chatbot for the current document, rebuilding it only when the document or prompt changes."""
+    state = _chatbot_state
+    if (state["bot"] is None or state["sections"] is not current_sections
+            or state["index"] is not current_index or state["prompt"] != current_prompt):
+        # Stack the chunk embeddings once instead of on every question
+        chunk_embeddings = (
+            np.asarray([c["embedding"] for c in current_index], dtype=np.float32) if current_index else None
+        )
+        state.update(
+            sections=current_sections,
+            index=current_index,
+            prompt=current_prompt,
+            bot=PDFChatBot(current_sections, current_index, system_prompt=current_prompt,
+                           chunk_embeddings=chunk_embeddings),
+        )
+    return state["bot"]
+
 def get_pdf_list(folder_path: Optional[str] = None) -> List[str]:
     """Get list of PDF files in the specified folder."""
     if folder_path:
@@ -928,7 +974,7 @@ def generate_and_save_summary(
     
     # Generate embedding for the summary
 
-    summary_embedding = embedding_model.get_embedding(summary, is_query=False)
+    summary_embedding = get_embedding_model().get_embedding(summary, is_query=False)
     
     # Save summary
     summary_cache_path = CACHE_DIR / f"{Path(doc_name).stem}_summary_{detail_level}.txt"
@@ -937,13 +983,14 @@ def generate_and_save_summary(
     
     # Save embedding
     embedding_cache_path = CACHE_DIR / f"{Path(doc_name).stem}_summary_{detail_level}_embedding.pkl"
+    data = pickle.dumps({
+        "summary": summary,
+        "embedding": summary_embedding.tolist(),
+        "detail_level": detail_level,
+        "doc_name": doc_name
+    }, protocol=pickle.HIGHEST_PROTOCOL)
     with open(embedding_cache_path, 'wb') as f:
-        pickle.dump({
-            "summary": summary,
-            "embedding": summary_embedding.tolist(),
-            "detail_level": detail_level,
-            "doc_name": doc_name
-        }, f)
+        f.write(data)
     
     return summary, summary_embedding
 def load_document_by_summary_search(
@@ -980,7 +1027,7 @@ def load_document_by_summary_search(
         target_dir = current_pdf_folder
     
     # Look for the document
-    converter = FileConverter()
+    converter = get_converter()
     doc_path = None
     
     for file_path in target_dir.iterdir():
@@ -1044,7 +1091,7 @@ def process_all_documents(
         analyze_visuals = visual_analysis_enabled
     
     # File extension setup
-    converter = FileConverter()
+    converter = get_converter()
     if extensions:
         valid_extensions = []
         for ext in extensions:
@@ -1101,69 +1148,99 @@ def process_all_documents(
     print(f"🚀 Starting batch processing of {len(documents)} documents...", file=sys.stderr)
     print(f"📊 Summary detail level: {detail_level}", file=sys.stderr)
     
-    for i, doc in enumerate(documents):
-        doc_path = doc["path"]
-        doc_name = doc["name"]
-        doc_stem = Path(doc_name).stem
+    # Check which documents were already processed with the same detail level
+    def _has_cached_summary(doc):
+        doc_stem = Path(doc["name"]).stem
+        summary_cache_path = CACHE_DIR / f"{doc_stem}_summary_{detail_level}.txt"
+        embedding_cache_path = CACHE_DIR / f"{doc_stem}_summary_{detail_level}_embedding.pkl"
+        return summary_cache_path.exists() and embedding_cache_path.exists()
+    
+    cached = [_has_cached_summary(doc) for doc in documents]
+    
+    # Extraction/indexing of the next document runs on a background thread while the
+    # current one is summarized (the models serialize their own calls)
+    prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="docsray-prefetch")
+    pending = {}
+    
+    def _process(i):
+        future = pending.pop(i, None)
+        if future is None:
+            future = prefetcher.submit(process_pdf, documents[i]["path"], analyze_visuals=analyze_visuals)
+        return future.result()
+    
+    def _prefetch_after(i):
+        for j in range(i + 1, len(documents)):
+            if not cached[j]:
+                if j not in pending:
+                    pending[j] = prefetcher.submit(
+                        process_pdf, documents[j]["path"], analyze_visuals=analyze_visuals
+                    )
+                return
+    
+    try:
+        for i, doc in enumerate(documents):
+            doc_name = doc["name"]
+            doc_stem = Path(doc_name).stem
         
-        print(f"📄 [{i+1}/{len(documents)}] Processing {doc_name}...", file=sys.stderr)
+            print(f"📄 [{i+1}/{len(documents)}] Processing {doc_name}...", file=sys.stderr)
         
-        try:
-            # Check if already processed with same detail level
-            summary_cache_path = CACHE_DIR / f"{doc_stem}_summary_{detail_level}.txt"
-            embedding_cache_path = CACHE_DIR / f"{doc_stem}_summary_{detail_level}_embedding.pkl"
+            try:
+                if cached[i]:
+                    print(f"⏭️  Using cached summary for {doc_name}", file=sys.stderr)
+                    processed.append({
+                        "name": doc_name,
+                        "sections": "cached",
+                        "chunks": "cached",
+                        "has_summary": True,
+                        "cached": True
+                    })
+                    continue
+            
+                # Process document (possibly already done in the background)
+                sections, chunk_index, pages_text = _process(i)
+                if generate_summaries:
+                    _prefetch_after(i)
+            
+                # Store in global state temporarily for summary generation
+                temp_current_pdf_name = current_pdf_name
+                current_pdf_name = doc_stem
+            
+                # Generate summary if requested
+                if generate_summaries:
+                    print(f"📝 Generating {detail_level} summary for {doc_name}...", file=sys.stderr)
+                    summary, embedding = generate_and_save_summary(
+                        sections, 
+                        chunk_index, 
+                        doc_name,
+                        detail_level
+                    )
+            
+                # Restore global state
+                current_pdf_name = temp_current_pdf_name
             
-            if summary_cache_path.exists() and embedding_cache_path.exists():
-                print(f"⏭️  Using cached summary for {doc_name}", file=sys.stderr)
                 processed.append({
                     "name": doc_name,
-                    "sections": "cached",
-                    "chunks": "cached",
-                    "has_summary": True,
-                    "cached": True
+                    "sections": len(sections),
+                    "chunks": len(chunk_index),
+                    "has_summary": generate_summaries,
+                    "cached": False
                 })
-                continue
-            
-            # Process document
-            sections, chunk_index, pages_text = process_pdf(
-                doc_path,
-                analyze_visuals=analyze_visuals
-            )
-            
-            # Store in global state temporarily for summary generation
-            temp_current_pdf_name = current_pdf_name
-            current_pdf_name = doc_stem
-            
-            # Generate summary if requested
-            if generate_summaries:
-                print(f"📝 Generating {detail_level} summary for {doc_name}...", file=sys.stderr)
-                summary, embedding = generate_and_save_summary(
-                    sections, 
-                    chunk_index, 
-                    doc_name,
-                    detail_level
-                )
-            
-            # Restore global state
-            current_pdf_name = temp_current_pdf_name
-            
-            processed.append({
-                "name": doc_name,
-                "sections": len(sections),
-                "chunks": len(chunk_index),
-                "has_summary": generate_summaries,
-                "cached": False
-            })
             
-            print(f"✅ Successfully processed {doc_name}", file=sys.stderr)
+                print(f"✅ Successfully processed {doc_name}", file=sys.stderr)
             
-        except Exception as e:
-            print(f"❌ Failed to process {doc_name}: {str(e)}", file=sys.stderr)
-            failed.append({
-                "name": doc_name,
-                "error": str(e)
-            })
-    
+            except Exception as e:
+                print(f"❌ Failed to process {doc_name}: {str(e)}", file=sys.stderr)
+                failed.append({
+                    "name": doc_name,
+                    "error": str(e)
+                })
+    finally:
+        # Don't leave a prefetch running next to the tool worker if the batch is
+        # aborted; queued prefetches are cancelled, a running one is waited for
+        for future in pending.values():
+            future.cancel()
+        prefetcher.shutdown(wait=True)
+
     elapsed_time = time.time() - start_time
     
     # Set last processed document as current
@@ -1220,7 +1297,7 @@ def search_by_content(
         target_dir = current_pdf_folder
     
     # Get query embedding
-    query_embedding = embedding_model.get_embedding(query, is_query=True)
+    query_embedding = get_embedding_model().get_embedding(query, is_query=True)
     pattern = f"*_summary_{detail_level}_embedding.pkl"
     embedding_files = list(CACHE_DIR.glob(pattern))    
 
@@ -1294,8 +1371,8 @@ Return only the queries, one per line.
 Alternative queries:"""
             
             try:
-                improved_queries_response = local_llm.generate(improve_prompt)
-                improved_queries = local_llm.strip_response(improved_queries_response).strip().split('\n')
+                improved_queries_response = llm_model.local_llm.generate(improve_prompt)
+                improved_queries = llm_model.local_llm.strip_response(improved_queries_response).strip().split('\n')
                 improved_queries = [query + ':' +q.strip() for q in improved_queries if q.strip()][:3]
                 
                 print(f"🔍 Trying improved queries: {improved_queries}", file=sys.stderr)
@@ -1306,7 +1383,7 @@ Alternative queries:"""
                 
                 for improved_query in improved_queries:
                     # Get embedding for improved query
-                    improved_embedding = embedding_model.get_embedding(improved_query, is_query=True)
+                    improved_embedding = get_embedding_model().get_embedding(improved_query, is_query=True)
                     
                     # Search with improved query
                     improved_results = vector_search_with_metadata(
@@ -1465,10 +1542,10 @@ Provide a brief executive summary (2-3 paragraphs) highlighting the main theme a
         try:
             print("Generating overall summary...", file=sys.stderr)
             start_time = time.time()
-            overall_response = local_llm.generate(overall_prompt)
+            overall_response = llm_model.local_llm.generate(overall_prompt)
             
-            if hasattr(local_llm, 'strip_response'):
-                overall_summary = local_llm.strip_response(overall_response)
+            if hasattr(llm_model.local_llm, 'strip_response'):
+                overall_summary = llm_model.local_llm.strip_response(overall_response)
             else:
                 if "<|im_start|>assistant" in overall_response:
                     overall_summary = overall_response.split("<|im_start|>assistant")[1].split("<|im_end|>")[0].strip()
@@ -1567,8 +1644,8 @@ Summary (2-3 paragraphs):"""
             
             try:
                 start_time = time.time()
-                summary_response = local_llm.generate(section_prompt)
-                summary_text = local_llm.strip_response(summary_response)
+                summary_response = llm_model.local_llm.generate(section_prompt)
+                summary_text = llm_model.local_llm.strip_response(summary_response)
                 elapsed = time.time() - start_time
                 print(f"Section {i+1} summarized in {elapsed:.1f}s", file=sys.stderr)
             except Exception as e:
@@ -1705,1083 +1782,1391 @@ def get_cache_info() -> Dict[str, Any]:
 # MCP Server Setup
 server = Server("docsray-mcp")
 
-@server.list_tools()
-async def list_tools() -> List[Tool]:
-    """List available tools."""
-    return [
-        Tool(
-            name="get_current_directory",
-            description="Get the current PDF directory path",
-            inputSchema={
-                "type": "object",
-                "properties": {}
+# Tool schemas never change, so the list is built once at import rather than
+# on every list_tools request
+TOOLS: List[Tool] = [
+    Tool(
+        name="get_current_directory",
+        description="Get the current PDF directory path",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="set_current_directory",
+        description="Set the current PDF directory",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "folder_path": {"type": "string", "description": "New directory path to set as current"}
+            },
+            "required": ["folder_path"]
+        }
+    ),
+    Tool(
+        name="get_directory_info",
+        description="Get detailed information about a directory (current or specified)",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "folder_path": {"type": "string", "description": "Directory path to inspect (optional, uses current if not specified)"}
             }
-        ),
-        Tool(
-            name="set_current_directory",
-            description="Set the current PDF directory",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "folder_path": {"type": "string", "description": "New directory path to set as current"}
-                },
-                "required": ["folder_path"]
+        }
+    ),
+    Tool(
+        name="list_documents",
+        description="List all supported documents (PDFs, Word, Excel, PowerPoint, images, etc.) in the current or specified folder",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "folder_path": {"type": "string", "description": "Folder path to scan (optional, uses current if not specified)"}
             }
-        ),
-        Tool(
-            name="get_directory_info",
-            description="Get detailed information about a directory (current or specified)",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "folder_path": {"type": "string", "description": "Directory path to inspect (optional, uses current if not specified)"}
+        }
+    ),
+    Tool(
+        name="load_document",
+        description="Load and process any supported document file with optional visual analysis",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "filename": {"type": "string", "description": "Document filename to load"},
+                "folder_path": {"type": "string", "description": "Folder path (optional, uses current if not specified)"},
+                "analyze_visuals": {
+                    "type": "boolean", 
+                    "description": "Whether to analyze visual content (default: uses global setting)",
+                    "default": None
                 }
-            }
-        ),
-        Tool(
-            name="list_documents",
-            description="List all supported documents (PDFs, Word, Excel, PowerPoint, images, etc.) in the current or specified folder",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "folder_path": {"type": "string", "description": "Folder path to scan (optional, uses current if not specified)"}
+            },
+            "required": ["filename"]
+        }
+    ),
+    Tool(
+        name="set_visual_analysis",
+        description="Enable or disable visual analysis globally for all documents",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "enabled": {"type": "boolean", "description": "Enable (true) or disable (false) visual analysis"}
+            },
+            "required": ["enabled"]
+        }
+    ),
+    Tool(
+        name="get_visual_analysis_status",
+        description="Get current visual analysis settings and status",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="reset_initial_setup",
+        description="Reset initial setup and configure PDF directory again",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="ask_question",
+        description="Ask a question about the loaded PDF",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "question": {"type": "string", "description": "Question to ask"},
+                "use_coarse_search": {"type": "boolean", "description": "Use coarse-to-fine search (default: true)"}
+            },
+            "required": ["question"]
+        }
+    ),
+    Tool(
+        name="summarize_document",
+        description="Generate a comprehensive summary of the loaded PDF organized by sections",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "detail_level": {
+                    "type": "string", 
+                    "description": "Level of detail for summary: 'brief', 'standard', or 'detailed'",
+                    "enum": ["brief", "standard", "detailed"],
+                    "default": "standard"
                 }
             }
-        ),
-        Tool(
-            name="load_document",
-            description="Load and process any supported document file with optional visual analysis",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "filename": {"type": "string", "description": "Document filename to load"},
-                    "folder_path": {"type": "string", "description": "Folder path (optional, uses current if not specified)"},
-                    "analyze_visuals": {
-                        "type": "boolean", 
-                        "description": "Whether to analyze visual content (default: uses global setting)",
-                        "default": None
-                    }
+        }
+    ),
+    Tool(
+        name="clear_all_cache",
+        description="Clear all cache files (sections, indices, and summaries)",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="get_cache_info",
+        description="Get information about cached files",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="get_recommended_search_paths",
+        description="Get recommended starting paths for document search based on your OS and common locations",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="analyze_search_path",
+        description="Analyze a specific path to estimate search complexity and document count",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {"type": "string", "description": "Path to analyze"}
+            },
+            "required": ["path"]
+        }
+    ),
+    Tool(
+        name="search_documents",
+        description="Search for documents recursively from a starting path with various filters",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "start_path": {"type": "string", "description": "Starting directory path (optional, defaults to home)"},
+                "extensions": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "File extensions to search for (e.g., ['pdf', 'docx'])"
                 },
-                "required": ["filename"]
-            }
-        ),
-        Tool(
-            name="set_visual_analysis",
-            description="Enable or disable visual analysis globally for all documents",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "enabled": {"type": "boolean", "description": "Enable (true) or disable (false) visual analysis"}
+                "exclude_dirs": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Directory names to exclude from search"
                 },
-                "required": ["enabled"]
-            }
-        ),
-        Tool(
-            name="get_visual_analysis_status",
-            description="Get current visual analysis settings and status",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="reset_initial_setup",
-            description="Reset initial setup and configure PDF directory again",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="ask_question",
-            description="Ask a question about the loaded PDF",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "question": {"type": "string", "description": "Question to ask"},
-                    "use_coarse_search": {"type": "boolean", "description": "Use coarse-to-fine search (default: true)"}
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return",
+                    "default": 1000
                 },
-                "required": ["question"]
-            }
-        ),
-        Tool(
-            name="summarize_document",
-            description="Generate a comprehensive summary of the loaded PDF organized by sections",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "detail_level": {
-                        "type": "string", 
-                        "description": "Level of detail for summary: 'brief', 'standard', or 'detailed'",
-                        "enum": ["brief", "standard", "detailed"],
-                        "default": "standard"
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="clear_all_cache",
-            description="Clear all cache files (sections, indices, and summaries)",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="get_cache_info",
-            description="Get information about cached files",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="get_recommended_search_paths",
-            description="Get recommended starting paths for document search based on your OS and common locations",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="analyze_search_path",
-            description="Analyze a specific path to estimate search complexity and document count",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "path": {"type": "string", "description": "Path to analyze"}
+                "min_size_kb": {
+                    "type": "number",
+                    "description": "Minimum file size in KB"
                 },
-                "required": ["path"]
-            }
-        ),
-        Tool(
-            name="search_documents",
-            description="Search for documents recursively from a starting path with various filters",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "start_path": {"type": "string", "description": "Starting directory path (optional, defaults to home)"},
-                    "extensions": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "File extensions to search for (e.g., ['pdf', 'docx'])"
-                    },
-                    "exclude_dirs": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Directory names to exclude from search"
-                    },
-                    "max_results": {
-                        "type": "integer",
-                        "description": "Maximum number of results to return",
-                        "default": 1000
-                    },
-                    "min_size_kb": {
-                        "type": "number",
-                        "description": "Minimum file size in KB"
-                    },
-                    "max_size_mb": {
-                        "type": "number",
-                        "description": "Maximum file size in MB"
-                    },
-                    "modified_after": {
-                        "type": "string",
-                        "description": "ISO date string (YYYY-MM-DD) to filter files modified after this date"
-                    },
-                    "search_term": {
-                        "type": "string",
-                        "description": "Search term to filter filenames"
-                    }
+                "max_size_mb": {
+                    "type": "number",
+                    "description": "Maximum file size in MB"
+                },
+                "modified_after": {
+                    "type": "string",
+                    "description": "ISO date string (YYYY-MM-DD) to filter files modified after this date"
+                },
+                "search_term": {
+                    "type": "string",
+                    "description": "Search term to filter filenames"
                 }
             }
-        ),
-        Tool(
-            name="process_all_documents",
-            description="Process all documents in the current or specified directory at once, with optional summary generation",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "folder_path": {
-                        "type": "string", 
-                        "description": "Directory path to process (optional, uses current if not specified)"
-                    },
-                                "detail_level": {
-                "type": "string",
-                "description": "Summary detail level: 'brief', 'standard', or 'detailed'",
-                "enum": ["brief", "standard", "detailed"],
-                "default": "brief"
-            },
-                    "analyze_visuals": {
-                        "type": "boolean",
-                        "description": "Whether to analyze visual content (default: uses global setting)"
-                    },
-                    "generate_summaries": {
-                        "type": "boolean",
-                        "description": "Whether to generate summaries with embeddings for each document",
-                        "default": True
-                    },
-                    "extensions": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "File extensions to process (e.g., ['pdf', 'docx'])"
-                    },
-                    "max_files": {
-                        "type": "integer",
-                        "description": "Maximum number of files to process"
-                    }
+        }
+    ),
+    Tool(
+        name="process_all_documents",
+        description="Process all documents in the current or specified directory at once, with optional summary generation",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "folder_path": {
+                    "type": "string", 
+                    "description": "Directory path to process (optional, uses current if not specified)"
+                },
+                            "detail_level": {
+            "type": "string",
+            "description": "Summary detail level: 'brief', 'standard', or 'detailed'",
+            "enum": ["brief", "standard", "detailed"],
+            "default": "brief"
+        },
+                "analyze_visuals": {
+                    "type": "boolean",
+                    "description": "Whether to analyze visual content (default: uses global setting)"
+                },
+                "generate_summaries": {
+                    "type": "boolean",
+                    "description": "Whether to generate summaries with embeddings for each document",
+                    "default": True
+                },
+                "extensions": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "File extensions to process (e.g., ['pdf', 'docx'])"
+                },
+                "max_files": {
+                    "type": "integer",
+                    "description": "Maximum number of files to process"
                 }
             }
-        ),
-
-        Tool(
-            name="search_by_content",
-            description="Search for documents using their summary embeddings",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query to find relevant documents"
-                    },
-                    "folder_path": {
-                        "type": "string",
-                        "description": "Directory to search (optional, uses current if not specified)"
-                    },
-                    "detail_level": {
-                        "type": "string",
-                        "description": "Which summary level to search",
-                        "enum": ["brief", "standard", "detailed"],
-                        "default": "brief"
-                    },
-                    "top_k": {
-                        "type": "integer",
-                        "description": "Number of top results to return",
-                        "default": 5
-                    }
+        }
+    ),
+
+    Tool(
+        name="search_by_content",
+        description="Search for documents using their summary embeddings",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query to find relevant documents"
                 },
-                "required": ["query"]
-            }
-        ),
-
-        Tool(
-            name="load_document_by_summary_search",
-            description="Search for a document by query and automatically load the best match",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query to find and load the most relevant document"
-                    },
-                    "folder_path": {
-                        "type": "string",
-                        "description": "Directory to search (optional, uses current if not specified)"
-                    }
+                "folder_path": {
+                    "type": "string",
+                    "description": "Directory to search (optional, uses current if not specified)"
                 },
-                "required": ["query"]
-            }
-        ),
-
-        Tool(
-            name="get_document_summaries",
-            description="Get all document summaries in the current or specified directory",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "folder_path": {
-                        "type": "string",
-                        "description": "Directory path (optional, uses current if not specified)"
-                    },
-                    "detail_level": {
-                "type": "string",
-                "description": "Filter by detail level (optional)",
-                "enum": ["brief", "standard", "detailed"]
-            }
+                "detail_level": {
+                    "type": "string",
+                    "description": "Which summary level to search",
+                    "enum": ["brief", "standard", "detailed"],
+                    "default": "brief"
+                },
+                "top_k": {
+                    "type": "integer",
+                    "description": "Number of top results to return",
+                    "default": 5
                 }
-            }
-        ),        
-        Tool(
-            name="stop_search",
-            description="Stop an ongoing document search",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="get_search_results",
-            description="Retrieve cached search results using a cache key",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "cache_key": {"type": "string", "description": "Cache key from a previous search"}
+            },
+            "required": ["query"]
+        }
+    ),
+
+    Tool(
+        name="load_document_by_summary_search",
+        description="Search for a document by query and automatically load the best match",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query to find and load the most relevant document"
+                },
+                "folder_path": {
+                    "type": "string",
+                    "description": "Directory to search (optional, uses current if not specified)"
+                }
+            },
+            "required": ["query"]
+        }
+    ),
+
+    Tool(
+        name="get_document_summaries",
+        description="Get all document summaries in the current or specified directory",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "folder_path": {
+                    "type": "string",
+                    "description": "Directory path (optional, uses current if not specified)"
                 },
-                "required": ["cache_key"]
+                "detail_level": {
+            "type": "string",
+            "description": "Filter by detail level (optional)",
+            "enum": ["brief", "standard", "detailed"]
+        }
             }
-        )
+        }
+    ),        
+    Tool(
+        name="stop_search",
+        description="Stop an ongoing document search",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="get_search_results",
+        description="Retrieve cached search results using a cache key",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "cache_key": {"type": "string", "description": "Cache key from a previous search"}
+            },
+            "required": ["cache_key"]
+        }
+    )
 
-    ]
+]
+
+@server.list_tools()
+async def list_tools() -> List[Tool]:
+    """List available tools."""
+    return TOOLS
+
+# Tool bodies run here, one at a time (the models and global document state
+# are not thread-safe), so the event loop stays free while a tool works
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="docsray-tool")
+
+# Cheap control tools answered on the event loop itself, so they are not queued
+# behind the tool they are meant to control (e.g. stop_search during a search)
+INLINE_TOOLS = frozenset({"stop_search", "get_search_results"})
+
+# Short-lived cache of read-only tool results (seconds each result stays valid),
+# so clients that poll the same listing or status get it from memory
+TOOL_CACHE_TTL = 5.0
+CACHED_TOOL_TTLS = {
+    "get_current_directory": TOOL_CACHE_TTL,
+    "get_directory_info": TOOL_CACHE_TTL,
+    "list_documents": TOOL_CACHE_TTL,
+    "get_document_summaries": TOOL_CACHE_TTL,
+    "get_cache_info": TOOL_CACHE_TTL,
+    "get_visual_analysis_status": TOOL_CACHE_TTL,
+    "get_recommended_search_paths": 60.0,
+}
+# Tools that change what the cached tools would report
+INVALIDATING_TOOLS = frozenset({
+    "set_current_directory", "reset_initial_setup", "set_visual_analysis",
+    "load_document", "load_document_by_summary_search", "summarize_document",
+    "process_all_documents", "clear_all_cache",
+})
+TOOL_CACHE_SIZE = 128
+
+
+class LRUTTL:
+    """Size-capped cache whose entries also expire; least recently used goes first."""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if time.monotonic() >= expires:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_TOOL_CACHE = LRUTTL(maxsize=TOOL_CACHE_SIZE, ttl=TOOL_CACHE_TTL)
+_IN_FLIGHT: Dict[Tuple[str, str], "asyncio.Future"] = {}
+
+# Listings a client almost always asks for right after these tools succeed;
+# they are computed in the background so the follow-up call is a cache hit
+PREFETCH_AFTER = {
+    "set_current_directory": ("list_documents", "get_directory_info"),
+    "reset_initial_setup": ("list_documents", "get_directory_info"),
+}
+_PREFETCH_TASKS: set = set()
+
+# Results that do not depend on server state are also kept on disk, so a
+# restarted server (or a second client process) starts warm
+PERSISTED_TOOLS = frozenset({"get_recommended_search_paths"})
+TOOL_CACHE_DB = DATA_DIR / "tool_cache.sqlite"
+
+
+class PersistentToolCache:
+    """SQLite-backed store of tool response texts with wall-clock expiry."""
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, expires REAL, value BLOB)"
+            )
+            # Drop whatever expired since the last run so the file stays small
+            self._conn.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires, value FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] <= time.time():
+                with self._conn:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                row = None
+        if row is None:
+            return None
+        return json_io.loads(row[1])
+
+    def set(self, key: str, texts: List[str], ttl: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache(key, expires, value) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, json_io.dumps(texts)),
+            )
+
+
+try:
+    _PERSISTENT_CACHE: Optional[PersistentToolCache] = PersistentToolCache(TOOL_CACHE_DB)
+except sqlite3.Error as e:
+    print(f"⚠️ Persistent tool cache disabled: {e}", file=sys.stderr)
+    _PERSISTENT_CACHE = None
+
+# Most polled tools are called without arguments; skip serializing those
+_EMPTY_ARGS_JSON = "{}"
+
+def _tool_cache_key(name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+    if not arguments:
+        return (name, _EMPTY_ARGS_JSON)
+    return (name, json.dumps(arguments, sort_keys=True, default=str))
+
+def _int_arg(arguments: Dict[str, Any], key: str, default: Optional[int], minimum: int = 1) -> Optional[int]:
+    """
+    Read an integer tool argument. Clients may send numbers as floats or
+    strings ("5"); anything else, or a value below minimum, is rejected
+    with a message naming the argument.
+    """
+    value = arguments.get(key)
+    if value is None or value == "":
+        return default
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        if isinstance(value, str):
+            value = value.strip()
+        number = float(value)
+        if not number.is_integer():
+            raise ValueError
+        number = int(number)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' must be an integer, got {value!r}") from None
+    if number < minimum:
+        raise ValueError(f"'{key}' must be at least {minimum}, got {number}")
+    return number
+
+_TRUE_STRINGS = frozenset({"true", "yes", "y", "on", "1"})
+_FALSE_STRINGS = frozenset({"false", "no", "n", "off", "0"})
+
+def _bool_arg(arguments: Dict[str, Any], key: str, default: Optional[bool]) -> Optional[bool]:
+    """
+    Read a boolean tool argument. Strings such as "false" or "no" (which are
+    truthy as-is) are mapped explicitly; unknown values are rejected.
+    """
+    value = arguments.get(key)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        token = value.strip().lower()
+        if token in _TRUE_STRINGS:
+            return True
+        if token in _FALSE_STRINGS:
+            return False
+        if not token:
+            return default
+    raise ValueError(f"'{key}' must be true or false, got {value!r}")
+
+def _is_error(result: List[TextContent]) -> bool:
+    return bool(result) and result[0].text.startswith("❌")
+
+def _run_tool(name: str, arguments: Dict[str, Any], key, ttl: Optional[float]) -> List[TextContent]:
+    """Worker-thread side of call_tool: disk cache lookup, then the tool itself."""
+    persist = _PERSISTENT_CACHE is not None and name in PERSISTED_TOOLS
+    if persist:
+        # Tool name + arguments, so tools called with the same arguments don't collide
+        db_key = f"{key[0]}:{key[1]}"
+        try:
+            texts = _PERSISTENT_CACHE.get(db_key)
+        except sqlite3.Error:
+            texts = None
+        if texts is not None:
+            return [TextContent(type="text", text=t) for t in texts]
+
+    result = _call_tool_sync(name, arguments)
+
+    if persist and not _is_error(result):
+        try:
+            _PERSISTENT_CACHE.set(db_key, [c.text for c in result], ttl)
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to persist {name} result: {e}", file=sys.stderr)
+    return result
 
 @server.call_tool()
 async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Execute a tool and return results."""
+    if name in INLINE_TOOLS:
+        return _call_tool_sync(name, arguments)
+
+    ttl = CACHED_TOOL_TTLS.get(name)
+    key = None
+    if ttl is not None:
+        key = _tool_cache_key(name, arguments)
+        hit = _TOOL_CACHE.get(key)
+        if hit is not None:
+            return hit
+        # Share an identical call that is already queued or running (e.g. a prefetch)
+        pending = _IN_FLIGHT.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+    elif name in INVALIDATING_TOOLS:
+        _TOOL_CACHE.clear()
+        _IN_FLIGHT.clear()
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_TOOL_EXECUTOR, _run_tool, name, arguments, key, ttl)
+    if ttl is not None:
+        _IN_FLIGHT[key] = future
+    try:
+        # Shielded: a cancelled caller must not cancel the result for others sharing it
+        result = await asyncio.shield(future)
+    finally:
+        if ttl is not None and _IN_FLIGHT.get(key) is future:
+            del _IN_FLIGHT[key]
+
+    if ttl is not None:
+        # Errors are not cached so a retry actually re-runs the tool
+        if not _is_error(result):
+            _TOOL_CACHE.set(key, result, ttl)
+    elif name in INVALIDATING_TOOLS:
+        # Drop anything cached while this tool was running
+        _TOOL_CACHE.clear()
+        if name in PREFETCH_AFTER and not _is_error(result):
+            _schedule_prefetch(PREFETCH_AFTER[name])
+    return result
+
+async def _prefetch(names: Tuple[str, ...]) -> None:
+    for prefetch_name in names:
+        try:
+            await call_tool(prefetch_name, {})
+        except Exception as e:
+            print(f"⚠️ Prefetch of {prefetch_name} failed: {e}", file=sys.stderr)
+
+def _schedule_prefetch(names: Tuple[str, ...]) -> None:
+    task = asyncio.get_running_loop().create_task(_prefetch(names))
+    _PREFETCH_TASKS.add(task)
+    task.add_done_callback(_PREFETCH_TASKS.discard)
+
+def _tool_get_current_directory(arguments: Dict[str, Any]) -> List[TextContent]:
+    current_dir = get_current_directory()
+    dir_info = get_directory_info()
+
+    response = f"📁 **Current PDF Directory:**\n"
+    response += f"🗂️ Path: `{current_dir}`\n"
+    response += f"📊 PDF files: {dir_info['pdf_count']}\n"
+
+    if dir_info['pdf_count'] > 0:
+        response += f"💾 Total size: {dir_info['total_size_mb']:.1f} MB\n"
+
+    if not dir_info['exists']:
+        response += "\n⚠️ Directory does not exist!"
+    elif not dir_info['is_directory']:
+        response += "\n⚠️ Path is not a directory!"
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_set_current_directory(arguments: Dict[str, Any]) -> List[TextContent]:
+    folder_path = arguments["folder_path"]
+    success, message = set_current_directory(folder_path)
+
+    if success:
+        dir_info = get_directory_info()
+        response = f"✅ {message}\n"
+        response += f"📊 Found {dir_info['pdf_count']} PDF files"
+        if dir_info['pdf_count'] > 0:
+            response += f" ({dir_info['total_size_mb']:.1f} MB total)"
+    else:
+        response = f"❌ {message}"
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_get_directory_info(arguments: Dict[str, Any]) -> List[TextContent]:
+    folder_path = arguments.get("folder_path")
+    dir_info = get_directory_info(folder_path)
+
+    target_path = folder_path if folder_path else "current directory"
+
+    if dir_info['error']:
+        response = f"❌ Error accessing {target_path}: {dir_info['error']}"
+    elif not dir_info['exists']:
+        response = f"❌ Directory does not exist: {dir_info['path']}"
+    elif not dir_info['is_directory']:
+        response = f"❌ Path is not a directory: {dir_info['path']}"
+    else:
+        response = f"📁 **Directory Information:**\n"
+        response += f"🗂️ Path: `{dir_info['path']}`\n"
+        response += f"📊 PDF files: {dir_info['pdf_count']}\n"
+
+        if dir_info['pdf_count'] > 0:
+            response += f"💾 Total size: {dir_info['total_size_mb']:.1f} MB\n\n"
+            response += "📄 **PDF Files:**\n"
+
+            for i, file_info in enumerate(dir_info['pdf_files'], 1):
+                response += f"{i}. {file_info['name']} ({file_info['size_mb']:.1f} MB)\n"
+        else:
+            response += "\n📭 No PDF files found in this directory."
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_list_documents(arguments: Dict[str, Any]) -> List[TextContent]:
+    folder_path = arguments.get("folder_path")
+    doc_list = list_documents(folder_path)
+
+    if folder_path:
+        folder_name = folder_path
+    else:
+        folder_name = f"current directory ({current_pdf_folder})"
+
+    if not doc_list:
+        return [TextContent(type="text", text=f"❌ No supported documents found in {folder_name}")]
+
+    # Group by type
+    by_type = {}
+    for doc in doc_list:
+        doc_type = doc["type"]
+        if doc_type not in by_type:
+            by_type[doc_type] = []
+        by_type[doc_type].append(doc["name"])
+
+    # Format the list (collected in parts; folders can hold thousands of files)
+    parts = [f"📁 Found {len(doc_list)} supported documents in {folder_name}:\n\n"]
+
+    for doc_type, files in sorted(by_type.items()):
+        parts.append(f"**{doc_type}** ({len(files)} files):\n")
+        parts.extend(f"  {i}. {filename}\n" for i, filename in enumerate(files, 1))
+        parts.append("\n")
+
+    parts.append(f"💡 Use 'load_document' with the filename to process any of these files.")
+
+    return [TextContent(type="text", text="".join(parts))]
+
+
+def _tool_load_document(arguments: Dict[str, Any]) -> List[TextContent]:
     global current_sections, current_index, current_pdf_name, current_pages_text
-    
+    filename = arguments["filename"]
+    folder_path = arguments.get("folder_path")
+    analyze_visuals = _bool_arg(arguments, "analyze_visuals", None)
+
+    if folder_path:
+        file_path = Path(folder_path) / filename
+    else:
+        file_path = current_pdf_folder / filename
+
+    # Check if file exists
+    if not file_path.exists():
+        # Try with common extensions if no extension provided
+        if '.' not in filename:
+            converter = get_converter()
+            for ext in converter.SUPPORTED_FORMATS.keys():
+                test_path = file_path.parent / f"{filename}{ext}"
+                if test_path.exists():
+                    file_path = test_path
+                    break
+
+        if not file_path.exists():
+            return [TextContent(type="text", text=f"❌ Document file not found: {file_path}")]
+
+    # Process the document
+    #try:
+    from docsray.scripts import pdf_extractor
+
+    # Use global setting if not specified
+    if analyze_visuals is None:
+        analyze_visuals = visual_analysis_enabled
+
+    # Extract content with visual analysis option
+    extracted = pdf_extractor.extract_content(
+        str(file_path),
+        analyze_visuals=analyze_visuals
+    )
+
+    # Process extracted content
+    chunks = chunker.process_extracted_file(extracted)
+    chunk_index = build_index.build_chunk_index(chunks)
+    sections = section_rep_builder.build_section_reps(extracted["sections"], chunk_index)
+
+    current_sections = sections
+    current_index = chunk_index
+    current_pdf_name = file_path.name
+    current_pages_text = extracted.get("pages_text", [])
+
+    # Get file info
+    file_size = file_path.stat().st_size / (1024 * 1024)  # MB
+    num_sections = len(sections)
+    num_chunks = len(chunk_index)
+    num_pages = len(current_pages_text)
+
+    response = f"✅ Successfully loaded: {file_path.name}\n"
+    response += f"📂 From: {file_path.parent}\n"
+
+    if extracted["metadata"].get("was_converted", False):
+        original_format = extracted["metadata"].get("original_format", "unknown")
+        response += f"🔄 Converted from: {original_format.upper()} to PDF\n"
+
+    response += f"👁️ Visual analysis: {'Enabled' if analyze_visuals else 'Disabled'}\n"
+    response += f"📊 File size: {file_size:.1f} MB\n"
+    response += f"📄 Pages: {num_pages}\n"
+    response += f"📑 Sections: {num_sections}\n"
+    response += f"🔍 Chunks: {num_chunks}\n\n"
+    response += "You can now:\n"
+    response += "• Ask questions about this document using 'ask_question'\n"
+    response += "• Generate a comprehensive summary using 'summarize_document'"
+
+    return [TextContent(type="text", text=response)]
+
+    #except Exception as e:
+    #    return [TextContent(type="text", text=f"❌ Error processing document: {str(e)}")]
+
+
+def _tool_set_visual_analysis(arguments: Dict[str, Any]) -> List[TextContent]:
+    enabled = _bool_arg(arguments, "enabled", None)
+    if enabled is None:
+        raise ValueError("'enabled' is required")
+    success, message = set_visual_analysis(enabled)
+
+    if success:
+        # Add status information
+        status = get_visual_analysis_status()
+        response = f"{message}\n\n"
+        response += f"📊 **Current Settings:**\n"
+        response += f"• Visual Analysis: {'✅ Enabled' if status['enabled'] else '❌ Disabled'}\n"
+        response += f"• Fast Mode: {'Yes' if status['fast_mode'] else 'No'}\n"
+        response += f"• Environment Override: {'Yes' if status['env_disabled'] else 'No'}\n"
+    else:
+        response = message
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_get_visual_analysis_status(arguments: Dict[str, Any]) -> List[TextContent]:
+    status = get_visual_analysis_status()
+
+    response = f"👁️ **Visual Analysis Status:**\n\n"
+    response += f"• **Currently:** {'✅ Enabled' if status['enabled'] else '❌ Disabled'}\n"
+    response += f"• **Fast Mode:** {'Yes (forced off)' if status['fast_mode'] else 'No'}\n"
+    response += f"• **Environment Variable:** {'DOCSRAY_DISABLE_VISUALS=1 (forced off)' if status['env_disabled'] else 'Not set'}\n"
+    response += f"• **Can Enable:** {'Yes' if status['can_enable'] else 'No'}\n\n"
+
+    if not status['can_enable']:
+        response += "⚠️ **Note:** Visual analysis cannot be enabled due to:\n"
+        if status['env_disabled']:
+            response += "• DOCSRAY_DISABLE_VISUALS environment variable is set\n"
+    else:
+        response += "💡 **Tip:** Use 'set_visual_analysis' to toggle this setting."
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_reset_initial_setup(arguments: Dict[str, Any]) -> List[TextContent]:
+    # Reset config and run initial setup again
     try:
-        if name == "get_current_directory":
-            current_dir = get_current_directory()
-            dir_info = get_directory_info()
-            
-            response = f"📁 **Current PDF Directory:**\n"
-            response += f"🗂️ Path: `{current_dir}`\n"
-            response += f"📊 PDF files: {dir_info['pdf_count']}\n"
-            
-            if dir_info['pdf_count'] > 0:
-                response += f"💾 Total size: {dir_info['total_size_mb']:.1f} MB\n"
-            
-            if not dir_info['exists']:
-                response += "\n⚠️ Directory does not exist!"
-            elif not dir_info['is_directory']:
-                response += "\n⚠️ Path is not a directory!"
-            
-            return [TextContent(type="text", text=response)]
-        
-        elif name == "set_current_directory":
-            folder_path = arguments["folder_path"]
-            success, message = set_current_directory(folder_path)
-            
-            if success:
-                dir_info = get_directory_info()
-                response = f"✅ {message}\n"
-                response += f"📊 Found {dir_info['pdf_count']} PDF files"
-                if dir_info['pdf_count'] > 0:
-                    response += f" ({dir_info['total_size_mb']:.1f} MB total)"
-            else:
-                response = f"❌ {message}"
-            
-            return [TextContent(type="text", text=response)]
-        
-        elif name == "get_directory_info":
-            folder_path = arguments.get("folder_path")
-            dir_info = get_directory_info(folder_path)
-            
-            target_path = folder_path if folder_path else "current directory"
-            
-            if dir_info['error']:
-                response = f"❌ Error accessing {target_path}: {dir_info['error']}"
-            elif not dir_info['exists']:
-                response = f"❌ Directory does not exist: {dir_info['path']}"
-            elif not dir_info['is_directory']:
-                response = f"❌ Path is not a directory: {dir_info['path']}"
+        # Remove the saved directory preference
+        config = load_config()
+        if "current_pdf_folder" in config:
+            del config["current_pdf_folder"]
+        if "setup_completed" in config:
+            del config["setup_completed"]
+        save_config(config)
+
+        # Run setup again
+        globals()['current_pdf_folder'] = setup_initial_directory()
+        dir_info = get_directory_info()
+        response = f"🔄 **Initial setup reset completed!**\n"
+        response += f"📁 New current directory: `{current_pdf_folder}`\n"
+        response += f"📊 Found {dir_info['pdf_count']} PDF files"
+        if dir_info['pdf_count'] > 0:
+            response += f" ({dir_info['total_size_mb']:.1f} MB total)"
+
+        return [TextContent(type="text", text=response)]
+
+    except Exception as e:
+        return [TextContent(type="text", text=f"❌ Error resetting setup: {str(e)}")]
+
+
+def _tool_ask_question(arguments: Dict[str, Any]) -> List[TextContent]:
+    if current_sections is None or current_index is None:
+        return [TextContent(type="text", text="❌ Please load a PDF first using 'load_document'")]
+
+    question = arguments["question"]
+    use_coarse = _bool_arg(arguments, "use_coarse_search", True)
+    fine_only = not use_coarse
+
+    # Reuse the document's chatbot and get answer
+    chatbot = _get_chatbot()
+    answer_output, reference_output = chatbot.answer(question, max_iterations=1, fine_only=fine_only)
+
+    # Format response
+    response = f"📄 **Current PDF:** {current_pdf_name}\n"
+    response += f"❓ **Question:** {question}\n\n"
+    response += f"💡 **Answer:**\n{answer_output}\n\n"
+    response += f"📚 **References:**\n{reference_output}"
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_summarize_document(arguments: Dict[str, Any]) -> List[TextContent]:
+    if current_sections is None or current_index is None:
+        return [TextContent(type="text", text="❌ Please load a PDF first using 'load_document'")]
+
+    detail_level = arguments.get("detail_level", "standard")
+
+    # Generate and save summary with embedding
+    response = f"📄 **Generating {detail_level} summary for:** {current_pdf_name}\n"
+
+    try:
+        start_time = time.time()
+
+        summary, embedding = generate_and_save_summary(
+            current_sections,
+            current_index,
+            current_pdf_name,
+            detail_level
+        )
+
+        elapsed = time.time() - start_time
+
+        response += f"⏱️ Generated in {elapsed:.1f} seconds\n"
+        response += f"✅ Summary saved with embedding\n\n"
+        response += summary
+
+    except Exception as e:
+        response += f"❌ Error generating summary: {str(e)}"
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_process_all_documents(arguments: Dict[str, Any]) -> List[TextContent]:
+    folder_path = arguments.get("folder_path")
+    analyze_visuals = _bool_arg(arguments, "analyze_visuals", None)
+    generate_summaries = _bool_arg(arguments, "generate_summaries", True)
+    detail_level = arguments.get("detail_level", "brief")
+    extensions = arguments.get("extensions")
+    max_files = _int_arg(arguments, "max_files", None)
+
+    response = "🚀 **Batch Processing Documents**\n\n"
+
+    # Process all documents
+    result = process_all_documents(
+        folder_path=folder_path,
+        analyze_visuals=analyze_visuals,
+        generate_summaries=generate_summaries,
+        detail_level=detail_level,
+        extensions=extensions,
+        max_files=max_files
+    )
+
+    if "error" in result:
+        return [TextContent(type="text", text=f"❌ Error: {result['error']}")]
+
+    # Format results
+    response += f"📁 Directory: {result['folder']}\n"
+    response += f"📊 Total files found: {result['total_files']}\n"
+    response += f"✅ Successfully processed: {result['processed']}\n"
+
+    if result.get('skipped_sensitive', 0) > 0:
+        response += f"⏭️  Skipped (sensitive): {result['skipped_sensitive']}\n"
+
+    if result['failed'] > 0:
+        response += f"❌ Failed: {result['failed']}\n"
+
+    response += f"⏱️ Processing time: {result['elapsed_time']:.1f} seconds\n"
+
+    if generate_summaries:
+        response += f"📝 Summary level: {detail_level}\n"
+
+    # Show processed files
+    if result['processed_files']:
+        response += "\n**Processed Files:**\n"
+        for doc in result['processed_files'][:10]:  # Show first 10
+            response += f"• {doc['name']} "
+            if doc.get('cached'):
+                response += "(cached) "
             else:
-                response = f"📁 **Directory Information:**\n"
-                response += f"🗂️ Path: `{dir_info['path']}`\n"
-                response += f"📊 PDF files: {dir_info['pdf_count']}\n"
-                
-                if dir_info['pdf_count'] > 0:
-                    response += f"💾 Total size: {dir_info['total_size_mb']:.1f} MB\n\n"
-                    response += "📄 **PDF Files:**\n"
-                    
-                    for i, file_info in enumerate(dir_info['pdf_files'], 1):
-                        response += f"{i}. {file_info['name']} ({file_info['size_mb']:.1f} MB)\n"
+                response += f"({doc['sections']} sections, {doc['chunks']} chunks) "
+            if doc['has_summary']:
+                response += "📝"
+            response += "\n"
+
+        if len(result['processed_files']) > 10:
+            response += f"... and {len(result['processed_files']) - 10} more files\n"
+
+    # Show skipped sensitive files
+    if result.get('skipped_files'):
+        response += "\n**Skipped Sensitive Files:**\n"
+        for filename in result['skipped_files'][:5]:
+            response += f"• {filename} (contains sensitive keywords)\n"
+        if len(result['skipped_files']) > 5:
+            response += f"... and {len(result['skipped_files']) - 5} more files\n"
+
+    # Show failed files
+    if result['failed_files']:
+        response += "\n**Failed Files:**\n"
+        for doc in result['failed_files'][:5]:
+            response += f"• {doc['name']}: {doc['error']}\n"
+
+    if result['current_document']:
+        response += f"\n📄 Current document set to: {result['current_document']}"
+
+    response += "\n\n💡 You can now:\n"
+    response += "• Use 'search_by_content' to find documents by content\n"
+    response += "• Use 'load_document_by_summary_search' to quickly switch documents\n"
+    response += "• Use 'ask_question' to query the current document"
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_search_by_content(arguments: Dict[str, Any]) -> List[TextContent]:
+    query = arguments["query"]
+    folder_path = arguments.get("folder_path")
+    detail_level = arguments.get("detail_level", "brief")
+    top_k = _int_arg(arguments, "top_k", 5)
+
+    result = search_by_content(query, folder_path, detail_level, top_k)
+
+    response = f"🔍 **Document Search Results**\n\n"
+    response += f"Query: \"{query}\"\n"
+    response += f"Found: {result['total_documents']} documents with summaries\n\n"
+
+    if result['results']:
+        response += "**Top Results:**\n"
+        for i, doc in enumerate(result['results'], 1):
+            response += f"\n{i}. **{doc['document']}**\n"
+            response += f"   📊 Similarity: {doc['similarity']:.3f}\n"
+
+            # Show summary preview
+            summary_preview = doc['summary'].split('\n')[0:10]  # First 3 lines
+            response += "   📝 Summary preview:\n"
+            for line in summary_preview:
+                if line.strip():
+                    response += f"      {line.strip()}\n"
+            response += "\n"
+    else:
+        response += "No documents found with summaries.\n"
+        response += "💡 Run 'process_all_documents' first to generate summaries."
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_load_document_by_summary_search(arguments: Dict[str, Any]) -> List[TextContent]:
+    query = arguments["query"]
+    folder_path = arguments.get("folder_path")
+
+    success, message = load_document_by_summary_search(query, folder_path)
+
+    if success:
+        response = f"🎯 **Document Loaded by Search**\n\n{message}"
+    else:
+        response = f"❌ **Search Failed**\n\n{message}"
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_get_document_summaries(arguments: Dict[str, Any]) -> List[TextContent]:
+    folder_path = arguments.get("folder_path")
+    detail_level = arguments.get("detail_level")
+
+    result = get_document_summaries(folder_path, detail_level)
+
+    response = f"📚 **Document Summaries**\n\n"
+    response += f"📁 Directory: {result['folder']}\n"
+
+    # Handle the new return format
+    if "summaries_by_document" in result:
+        docs_summary = result["summaries_by_document"]
+        response += f"📝 Total documents with summaries: {result['total_documents']}\n"
+
+        if result.get("detail_level_filter"):
+            response += f"🔍 Filtered by: {result['detail_level_filter']} level\n"
+
+        response += "\n"
+
+        if docs_summary:
+            parts = []
+            for doc_name, levels in docs_summary.items():
+                parts.append(f"**{doc_name}**\n")
+
+                # Show available summary levels
+                available_levels = []
+                for level in ["brief", "standard", "detailed"]:
+                    if level in levels:
+                        if levels[level].get("has_embedding"):
+                            available_levels.append(f"{level} ✅")
+                        else:
+                            available_levels.append(f"{level} ⚠️")
+
+                if available_levels:
+                    parts.append(f"  Available: {', '.join(available_levels)}\n")
+
+                # Show preview of the first available summary
+                preview_shown = False
+                for level in ["brief", "standard", "detailed"]:
+                    if level in levels and not preview_shown:
+                        summary_text = levels[level].get("summary", "")
+                        summary_lines = summary_text.split('\n')[:3]
+                        parts.append("  Preview:\n")
+                        parts.extend(f"    {line.strip()}\n" for line in summary_lines if line.strip())
+                        preview_shown = True
+                        break
+
+                parts.append("\n")
+            response += "".join(parts)
+        else:
+            response += "📭 No summaries found.\n"
+            response += "💡 Run 'process_all_documents' with generate_summaries=True"
+
+    # Handle old format (backward compatibility)
+    elif "summaries" in result:
+        summaries = result["summaries"]
+        response += f"📝 Total summaries: {len(summaries)}\n\n"
+
+        if summaries:
+            for summary_info in summaries:
+                response += f"**{summary_info['document']}**"
+                if summary_info['has_embedding']:
+                    response += " ✅"
                 else:
-                    response += "\n📭 No PDF files found in this directory."
-            
-            return [TextContent(type="text", text=response)]
-        
-        elif name == "list_documents":
-            folder_path = arguments.get("folder_path")
-            doc_list = list_documents(folder_path)
-            
-            if folder_path:
-                folder_name = folder_path
-            else:
-                folder_name = f"current directory ({current_pdf_folder})"
-            
-            if not doc_list:
-                return [TextContent(type="text", text=f"❌ No supported documents found in {folder_name}")]
-            
-            # Group by type
-            by_type = {}
-            for doc in doc_list:
-                doc_type = doc["type"]
-                if doc_type not in by_type:
-                    by_type[doc_type] = []
-                by_type[doc_type].append(doc["name"])
-            
-            # Format the list
-            response = f"📁 Found {len(doc_list)} supported documents in {folder_name}:\n\n"
-            
-            for doc_type, files in sorted(by_type.items()):
-                response += f"**{doc_type}** ({len(files)} files):\n"
-                for i, filename in enumerate(files, 1):
-                    response += f"  {i}. {filename}\n"
+                    response += " ⚠️ (no embedding)"
+                response += f" [{summary_info.get('detail_level', 'unknown')}]\n"
+
+                # Show first few lines of summary
+                summary_lines = summary_info['summary'].split('\n')[:3]
+                for line in summary_lines:
+                    if line.strip():
+                        response += f"  {line.strip()}\n"
                 response += "\n"
-            
-            response += f"💡 Use 'load_document' with the filename to process any of these files."
-            
-            return [TextContent(type="text", text=response)]
-       
-        elif name == "load_document":
-            filename = arguments["filename"]
-            folder_path = arguments.get("folder_path")
-            analyze_visuals = arguments.get("analyze_visuals")
-            
-            if folder_path:
-                file_path = Path(folder_path) / filename
-            else:
-                file_path = current_pdf_folder / filename
-            
-            # Check if file exists
-            if not file_path.exists():
-                # Try with common extensions if no extension provided
-                if '.' not in filename:
-                    converter = FileConverter()
-                    for ext in converter.SUPPORTED_FORMATS.keys():
-                        test_path = file_path.parent / f"{filename}{ext}"
-                        if test_path.exists():
-                            file_path = test_path
-                            break
-                
-                if not file_path.exists():
-                    return [TextContent(type="text", text=f"❌ Document file not found: {file_path}")]
-            
-            # Process the document
-            #try:
-            from docsray.scripts import pdf_extractor
-            
-            # Use global setting if not specified
-            if analyze_visuals is None:
-                analyze_visuals = visual_analysis_enabled
-            
-            # Extract content with visual analysis option
-            extracted = pdf_extractor.extract_content(
-                str(file_path),
-                analyze_visuals=analyze_visuals
-            )
-            
-            # Process extracted content
-            chunks = chunker.process_extracted_file(extracted)
-            chunk_index = build_index.build_chunk_index(chunks)
-            sections = section_rep_builder.build_section_reps(extracted["sections"], chunk_index)
-            
-            current_sections = sections
-            current_index = chunk_index
-            current_pdf_name = file_path.name
-            current_pages_text = extracted.get("pages_text", [])
-            
-            # Get file info
-            file_size = file_path.stat().st_size / (1024 * 1024)  # MB
-            num_sections = len(sections)
-            num_chunks = len(chunk_index)
-            num_pages = len(current_pages_text)
-            
-            response = f"✅ Successfully loaded: {file_path.name}\n"
-            response += f"📂 From: {file_path.parent}\n"
-            
-            if extracted["metadata"].get("was_converted", False):
-                original_format = extracted["metadata"].get("original_format", "unknown")
-                response += f"🔄 Converted from: {original_format.upper()} to PDF\n"
-            
-            response += f"👁️ Visual analysis: {'Enabled' if analyze_visuals else 'Disabled'}\n"
-            response += f"📊 File size: {file_size:.1f} MB\n"
-            response += f"📄 Pages: {num_pages}\n"
-            response += f"📑 Sections: {num_sections}\n"
-            response += f"🔍 Chunks: {num_chunks}\n\n"
-            response += "You can now:\n"
-            response += "• Ask questions about this document using 'ask_question'\n"
-            response += "• Generate a comprehensive summary using 'summarize_document'"
-            
-            return [TextContent(type="text", text=response)]
+        else:
+            response += "No summaries found.\n"
+            response += "💡 Run 'process_all_documents' with generate_summaries=True"
 
-            #except Exception as e:
-            #    return [TextContent(type="text", text=f"❌ Error processing document: {str(e)}")]
-        
-        elif name == "set_visual_analysis":
-            enabled = arguments["enabled"]
-            success, message = set_visual_analysis(enabled)
-            
-            if success:
-                # Add status information
-                status = get_visual_analysis_status()
-                response = f"{message}\n\n"
-                response += f"📊 **Current Settings:**\n"
-                response += f"• Visual Analysis: {'✅ Enabled' if status['enabled'] else '❌ Disabled'}\n"
-                response += f"• Fast Mode: {'Yes' if status['fast_mode'] else 'No'}\n"
-                response += f"• Environment Override: {'Yes' if status['env_disabled'] else 'No'}\n"
-            else:
-                response = message
-            
-            return [TextContent(type="text", text=response)]
-        
-        elif name == "get_visual_analysis_status":
-            status = get_visual_analysis_status()
-            
-            response = f"👁️ **Visual Analysis Status:**\n\n"
-            response += f"• **Currently:** {'✅ Enabled' if status['enabled'] else '❌ Disabled'}\n"
-            response += f"• **Fast Mode:** {'Yes (forced off)' if status['fast_mode'] else 'No'}\n"
-            response += f"• **Environment Variable:** {'DOCSRAY_DISABLE_VISUALS=1 (forced off)' if status['env_disabled'] else 'Not set'}\n"
-            response += f"• **Can Enable:** {'Yes' if status['can_enable'] else 'No'}\n\n"
-            
-            if not status['can_enable']:
-                response += "⚠️ **Note:** Visual analysis cannot be enabled due to:\n"
-                if status['env_disabled']:
-                    response += "• DOCSRAY_DISABLE_VISUALS environment variable is set\n"
-            else:
-                response += "💡 **Tip:** Use 'set_visual_analysis' to toggle this setting."
-            
-            return [TextContent(type="text", text=response)]
-             
-        elif name == "reset_initial_setup":
-            # Reset config and run initial setup again
-            try:
-                # Remove the saved directory preference
-                config = load_config()
-                if "current_pdf_folder" in config:
-                    del config["current_pdf_folder"]
-                if "setup_completed" in config:
-                    del config["setup_completed"]
-                save_config(config)
-                
-                # Run setup again
-                globals()['current_pdf_folder'] = setup_initial_directory()
-                dir_info = get_directory_info()
-                response = f"🔄 **Initial setup reset completed!**\n"
-                response += f"📁 New current directory: `{current_pdf_folder}`\n"
-                response += f"📊 Found {dir_info['pdf_count']} PDF files"
-                if dir_info['pdf_count'] > 0:
-                    response += f" ({dir_info['total_size_mb']:.1f} MB total)"
-                
-                return [TextContent(type="text", text=response)]
-                
-            except Exception as e:
-                return [TextContent(type="text", text=f"❌ Error resetting setup: {str(e)}")]
-        
-        elif name == "ask_question":
-            if current_sections is None or current_index is None:
-                return [TextContent(type="text", text="❌ Please load a PDF first using 'load_document'")]
-            
-            question = arguments["question"]
-            use_coarse = arguments.get("use_coarse_search", True)
-            fine_only = not use_coarse
-            
-            # Create chatbot and get answer
-            chatbot = PDFChatBot(current_sections, current_index, system_prompt=current_prompt)
-            answer_output, reference_output = chatbot.answer(question, max_iterations=1, fine_only=fine_only)
-            
-            # Format response
-            response = f"📄 **Current PDF:** {current_pdf_name}\n"
-            response += f"❓ **Question:** {question}\n\n"
-            response += f"💡 **Answer:**\n{answer_output}\n\n"
-            response += f"📚 **References:**\n{reference_output}"
-            
-            return [TextContent(type="text", text=response)]
-        
-        elif name == "summarize_document":
-            if current_sections is None or current_index is None:
-                return [TextContent(type="text", text="❌ Please load a PDF first using 'load_document'")]
-            
-            detail_level = arguments.get("detail_level", "standard")
-            
-            # Generate and save summary with embedding
-            response = f"📄 **Generating {detail_level} summary for:** {current_pdf_name}\n"
-            
-            try:
-                start_time = time.time()
-                
-                summary, embedding = generate_and_save_summary(
-                    current_sections,
-                    current_index,
-                    current_pdf_name,
-                    detail_level
-                )
-                
-                elapsed = time.time() - start_time
-                
-                response += f"⏱️ Generated in {elapsed:.1f} seconds\n"
-                response += f"✅ Summary saved with embedding\n\n"
-                response += summary
-                
-            except Exception as e:
-                response += f"❌ Error generating summary: {str(e)}"
-            
-            return [TextContent(type="text", text=response)]
-
-        elif name == "process_all_documents":
-            folder_path = arguments.get("folder_path")
-            analyze_visuals = arguments.get("analyze_visuals")
-            generate_summaries = arguments.get("generate_summaries", True)
-            detail_level = arguments.get("detail_level", "brief")
-            extensions = arguments.get("extensions")
-            max_files = arguments.get("max_files")
-            
-            response = "🚀 **Batch Processing Documents**\n\n"
-            
-            # Process all documents
-            result = process_all_documents(
-                folder_path=folder_path,
-                analyze_visuals=analyze_visuals,
-                generate_summaries=generate_summaries,
-                detail_level=detail_level,
-                extensions=extensions,
-                max_files=max_files
-            )
-            
-            if "error" in result:
-                return [TextContent(type="text", text=f"❌ Error: {result['error']}")]
-            
-            # Format results
-            response += f"📁 Directory: {result['folder']}\n"
-            response += f"📊 Total files found: {result['total_files']}\n"
-            response += f"✅ Successfully processed: {result['processed']}\n"
-            
-            if result.get('skipped_sensitive', 0) > 0:
-                response += f"⏭️  Skipped (sensitive): {result['skipped_sensitive']}\n"
-            
-            if result['failed'] > 0:
-                response += f"❌ Failed: {result['failed']}\n"
-            
-            response += f"⏱️ Processing time: {result['elapsed_time']:.1f} seconds\n"
-            
-            if generate_summaries:
-                response += f"📝 Summary level: {detail_level}\n"
-            
-            # Show processed files
-            if result['processed_files']:
-                response += "\n**Processed Files:**\n"
-                for doc in result['processed_files'][:10]:  # Show first 10
-                    response += f"• {doc['name']} "
-                    if doc.get('cached'):
-                        response += "(cached) "
-                    else:
-                        response += f"({doc['sections']} sections, {doc['chunks']} chunks) "
-                    if doc['has_summary']:
-                        response += "📝"
-                    response += "\n"
-                
-                if len(result['processed_files']) > 10:
-                    response += f"... and {len(result['processed_files']) - 10} more files\n"
-            
-            # Show skipped sensitive files
-            if result.get('skipped_files'):
-                response += "\n**Skipped Sensitive Files:**\n"
-                for filename in result['skipped_files'][:5]:
-                    response += f"• {filename} (contains sensitive keywords)\n"
-                if len(result['skipped_files']) > 5:
-                    response += f"... and {len(result['skipped_files']) - 5} more files\n"
-            
-            # Show failed files
-            if result['failed_files']:
-                response += "\n**Failed Files:**\n"
-                for doc in result['failed_files'][:5]:
-                    response += f"• {doc['name']}: {doc['error']}\n"
-            
-            if result['current_document']:
-                response += f"\n📄 Current document set to: {result['current_document']}"
-            
-            response += "\n\n💡 You can now:\n"
-            response += "• Use 'search_by_content' to find documents by content\n"
-            response += "• Use 'load_document_by_summary_search' to quickly switch documents\n"
-            response += "• Use 'ask_question' to query the current document"
-            
-            return [TextContent(type="text", text=response)]
+    return [TextContent(type="text", text=response)]      
 
-        elif name == "search_by_content":
-            query = arguments["query"]
-            folder_path = arguments.get("folder_path")
-            detail_level = arguments.get("detail_level", "brief")
-            top_k = arguments.get("top_k", 5)
-            
-            result = search_by_content(query, folder_path, detail_level, top_k)
-            
-            response = f"🔍 **Document Search Results**\n\n"
-            response += f"Query: \"{query}\"\n"
-            response += f"Found: {result['total_documents']} documents with summaries\n\n"
-            
-            if result['results']:
-                response += "**Top Results:**\n"
-                for i, doc in enumerate(result['results'], 1):
-                    response += f"\n{i}. **{doc['document']}**\n"
-                    response += f"   📊 Similarity: {doc['similarity']:.3f}\n"
-                    
-                    # Show summary preview
-                    summary_preview = doc['summary'].split('\n')[0:10]  # First 3 lines
-                    response += "   📝 Summary preview:\n"
-                    for line in summary_preview:
-                        if line.strip():
-                            response += f"      {line.strip()}\n"
-                    response += "\n"
-            else:
-                response += "No documents found with summaries.\n"
-                response += "💡 Run 'process_all_documents' first to generate summaries."
-            
-            return [TextContent(type="text", text=response)]
 
-        elif name == "load_document_by_summary_search":
-            query = arguments["query"]
-            folder_path = arguments.get("folder_path")
-            
-            success, message = load_document_by_summary_search(query, folder_path)
-            
-            if success:
-                response = f"🎯 **Document Loaded by Search**\n\n{message}"
-            else:
-                response = f"❌ **Search Failed**\n\n{message}"
-            
-            return [TextContent(type="text", text=response)]
-        
-        elif name == "get_document_summaries":
-            folder_path = arguments.get("folder_path")
-            detail_level = arguments.get("detail_level")
-            
-            result = get_document_summaries(folder_path, detail_level)
-            
-            response = f"📚 **Document Summaries**\n\n"
-            response += f"📁 Directory: {result['folder']}\n"
-            
-            # Handle the new return format
-            if "summaries_by_document" in result:
-                docs_summary = result["summaries_by_document"]
-                response += f"📝 Total documents with summaries: {result['total_documents']}\n"
-                
-                if result.get("detail_level_filter"):
-                    response += f"🔍 Filtered by: {result['detail_level_filter']} level\n"
-                
-                response += "\n"
-                
-                if docs_summary:
-                    for doc_name, levels in docs_summary.items():
-                        response += f"**{doc_name}**\n"
-                        
-                        # Show available summary levels
-                        available_levels = []
-                        for level in ["brief", "standard", "detailed"]:
-                            if level in levels:
-                                if levels[level].get("has_embedding"):
-                                    available_levels.append(f"{level} ✅")
-                                else:
-                                    available_levels.append(f"{level} ⚠️")
-                        
-                        if available_levels:
-                            response += f"  Available: {', '.join(available_levels)}\n"
-                        
-                        # Show preview of the first available summary
-                        preview_shown = False
-                        for level in ["brief", "standard", "detailed"]:
-                            if level in levels and not preview_shown:
-                                summary_text = levels[level].get("summary", "")
-                                summary_lines = summary_text.split('\n')[:3]
-                                response += "  Preview:\n"
-                                for line in summary_lines:
-                                    if line.strip():
-                                        response += f"    {line.strip()}\n"
-                                preview_shown = True
-                                break
-                        
-                        response += "\n"
-                else:
-                    response += "📭 No summaries found.\n"
-                    response += "💡 Run 'process_all_documents' with generate_summaries=True"
-            
-            # Handle old format (backward compatibility)
-            elif "summaries" in result:
-                summaries = result["summaries"]
-                response += f"📝 Total summaries: {len(summaries)}\n\n"
-                
-                if summaries:
-                    for summary_info in summaries:
-                        response += f"**{summary_info['document']}**"
-                        if summary_info['has_embedding']:
-                            response += " ✅"
-                        else:
-                            response += " ⚠️ (no embedding)"
-                        response += f" [{summary_info.get('detail_level', 'unknown')}]\n"
-                        
-                        # Show first few lines of summary
-                        summary_lines = summary_info['summary'].split('\n')[:3]
-                        for line in summary_lines:
-                            if line.strip():
-                                response += f"  {line.strip()}\n"
+def _tool_clear_all_cache(arguments: Dict[str, Any]) -> List[TextContent]:
+    # Get cache info before clearing
+    cache_info = get_cache_info()
+
+    # Clear cache
+    success, message = clear_all_cache()
+
+    response = f"🗑️ **Cache Clearing Result:**\n"
+
+    if cache_info.get("error"):
+        response += f"⚠️ Could not get cache info: {cache_info['error']}\n"
+    else:
+        response += f"📊 Before clearing:\n"
+        response += f"   • Files: {cache_info['total_files']}\n"
+        response += f"   • Size: {cache_info['total_size_mb']:.1f} MB\n"
+
+        if cache_info['pdf_sections'] or cache_info['pdf_summaries']:
+            response += f"   • PDFs with cache: {len(set(list(cache_info['pdf_sections'].keys()) + list(cache_info['pdf_summaries'].keys())))}\n"
+
+    response += f"\n{'✅' if success else '❌'} {message}\n"
+
+    if success:
+        response += "\n💡 All cache has been cleared. PDFs will need to be reprocessed."
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_get_cache_info(arguments: Dict[str, Any]) -> List[TextContent]:
+    cache_info = get_cache_info()
+
+    if cache_info.get("error"):
+        return [TextContent(type="text", text=f"❌ Error getting cache info: {cache_info['error']}")]
+
+    response = f"📊 **Cache Information:**\n"
+    response += f"📁 Cache directory: `{cache_info['cache_dir']}`\n"
+    response += f"📄 Total files: {cache_info['total_files']}\n"
+    response += f"💾 Total size: {cache_info['total_size_mb']:.1f} MB\n\n"
+
+    # PDFs with cached data
+    all_pdfs = set()
+    if cache_info['pdf_sections']:
+        all_pdfs.update(cache_info['pdf_sections'].keys())
+    if cache_info['pdf_indices']:
+        all_pdfs.update(cache_info['pdf_indices'].keys())
+    if cache_info['pdf_summaries']:
+        all_pdfs.update(cache_info['pdf_summaries'].keys())
+
+    if all_pdfs:
+        response += f"📚 **Cached PDFs ({len(all_pdfs)}):**\n"
+        for pdf_name in sorted(all_pdfs):
+            response += f"\n**{pdf_name}:**\n"
+
+            # Check what's cached for this PDF
+            has_sections = pdf_name in cache_info['pdf_sections']
+            has_index = pdf_name in cache_info['pdf_indices']
+            summaries = cache_info['pdf_summaries'].get(pdf_name, {})
+
+            if has_sections or has_index:
+                response += f"  • {'✅' if has_sections else '❌'} Sections data\n"
+                response += f"  • {'✅' if has_index else '❌'} Search index\n"
+
+            if summaries:
+                for level in ["brief", "standard", "detailed"]:
+                    count = summaries.get(level, 0)
+                    has_overall = summaries.get(f"{level}_overall", False)
+                    if count > 0 or has_overall:
+                        response += f"  • {level.capitalize()} summary: {count} sections"
+                        if has_overall:
+                            response += " + overall"
                         response += "\n"
-                else:
-                    response += "No summaries found.\n"
-                    response += "💡 Run 'process_all_documents' with generate_summaries=True"
-            
-            return [TextContent(type="text", text=response)]      
-        elif name == "clear_all_cache":
-            # Get cache info before clearing
-            cache_info = get_cache_info()
-            
-            # Clear cache
-            success, message = clear_all_cache()
-            
-            response = f"🗑️ **Cache Clearing Result:**\n"
-            
-            if cache_info.get("error"):
-                response += f"⚠️ Could not get cache info: {cache_info['error']}\n"
-            else:
-                response += f"📊 Before clearing:\n"
-                response += f"   • Files: {cache_info['total_files']}\n"
-                response += f"   • Size: {cache_info['total_size_mb']:.1f} MB\n"
-                
-                if cache_info['pdf_sections'] or cache_info['pdf_summaries']:
-                    response += f"   • PDFs with cache: {len(set(list(cache_info['pdf_sections'].keys()) + list(cache_info['pdf_summaries'].keys())))}\n"
-            
-            response += f"\n{'✅' if success else '❌'} {message}\n"
-            
-            if success:
-                response += "\n💡 All cache has been cleared. PDFs will need to be reprocessed."
-            
-            return [TextContent(type="text", text=response)]
-        
-        elif name == "get_cache_info":
-            cache_info = get_cache_info()
-            
-            if cache_info.get("error"):
-                return [TextContent(type="text", text=f"❌ Error getting cache info: {cache_info['error']}")]
-            
-            response = f"📊 **Cache Information:**\n"
-            response += f"📁 Cache directory: `{cache_info['cache_dir']}`\n"
-            response += f"📄 Total files: {cache_info['total_files']}\n"
-            response += f"💾 Total size: {cache_info['total_size_mb']:.1f} MB\n\n"
-            
-            # PDFs with cached data
-            all_pdfs = set()
-            if cache_info['pdf_sections']:
-                all_pdfs.update(cache_info['pdf_sections'].keys())
-            if cache_info['pdf_indices']:
-                all_pdfs.update(cache_info['pdf_indices'].keys())
-            if cache_info['pdf_summaries']:
-                all_pdfs.update(cache_info['pdf_summaries'].keys())
-            
-            if all_pdfs:
-                response += f"📚 **Cached PDFs ({len(all_pdfs)}):**\n"
-                for pdf_name in sorted(all_pdfs):
-                    response += f"\n**{pdf_name}:**\n"
-                    
-                    # Check what's cached for this PDF
-                    has_sections = pdf_name in cache_info['pdf_sections']
-                    has_index = pdf_name in cache_info['pdf_indices']
-                    summaries = cache_info['pdf_summaries'].get(pdf_name, {})
-                    
-                    if has_sections or has_index:
-                        response += f"  • {'✅' if has_sections else '❌'} Sections data\n"
-                        response += f"  • {'✅' if has_index else '❌'} Search index\n"
-                    
-                    if summaries:
-                        for level in ["brief", "standard", "detailed"]:
-                            count = summaries.get(level, 0)
-                            has_overall = summaries.get(f"{level}_overall", False)
-                            if count > 0 or has_overall:
-                                response += f"  • {level.capitalize()} summary: {count} sections"
-                                if has_overall:
-                                    response += " + overall"
-                                response += "\n"
-            else:
-                response += "📭 No cached PDFs found.\n"
-            
-            if cache_info['other_files']:
-                response += f"\n📎 Other files: {len(cache_info['other_files'])}\n"
-            
-            response += f"\n💡 Use 'clear_all_cache' to remove all cached data."
-            
-            return [TextContent(type="text", text=response)]
-        
-        elif name == "get_recommended_search_paths":
-            recommendations = get_recommended_search_paths()
-            
-            if not recommendations:
-                return [TextContent(type="text", text="❌ No recommended paths found on your system")]
-            
-            response = "🔍 **Recommended Search Starting Points:**\n\n"
-            
-            # Group by category
-            by_category = {}
-            for rec in recommendations:
-                cat = rec["category"]
-                if cat not in by_category:
-                    by_category[cat] = []
-                by_category[cat].append(rec)
-            
-            # Display by category
-            category_names = {
-                "primary": "📁 Primary Folders",
-                "cloud": "☁️ Cloud Storage",
-                "work": "💼 Work/Projects",
-                "shared": "👥 Shared Folders",
-                "external": "💾 External Storage",
-                "general": "🏠 General"
-            }
-            
-            for category in ["primary", "work", "cloud", "shared", "external", "general"]:
-                if category in by_category:
-                    response += f"**{category_names.get(category, category.title())}:**\n"
-                    
-                    for rec in by_category[category]:
-                        response += f"\n📍 **{rec['description']}**\n"
-                        response += f"   Path: `{rec['path']}`\n"
-                        
-                        if rec['immediate_docs'] > 0:
-                            response += f"   📄 {rec['immediate_docs']} documents found (immediate)\n"
-                            response += f"   💾 {rec['immediate_size_mb']:.1f} MB\n"
-                        
-                        if rec['subdirs'] > 0:
-                            response += f"   📂 {rec['subdirs']} subdirectories\n"
-                        
-                    response += "\n"
-            
-            response += "💡 **Tips:**\n"
-            response += "• Use 'analyze_search_path' to get more details about a specific path\n"
-            response += "• Primary folders are usually the best starting points\n"
-            response += "• Cloud folders may take longer to search"
-            
-            return [TextContent(type="text", text=response)]
+    else:
+        response += "📭 No cached PDFs found.\n"
 
-        elif name == "analyze_search_path":
-            path = arguments["path"]
-            analysis = analyze_path_for_search(path)
-            
-            if "error" in analysis:
-                return [TextContent(type="text", text=f"❌ {analysis['error']}")]
-            
-            response = f"📊 **Path Analysis:**\n\n"
-            response += f"📍 Path: `{analysis['path']}`\n\n"
-            
-            info = analysis["analysis"]
-            response += f"**Quick Statistics:**\n"
-            response += f"• 📄 Documents (immediate): {info['immediate_documents']}\n"
-            response += f"• 📈 Estimated total documents: {info['estimated_total_documents']}\n"
-            response += f"• 📂 Subdirectories: {info['subdirectories']}\n"
-            response += f"• ⏱️ Estimated search time: {info['estimated_search_seconds']} seconds\n"
-            response += f"• 🔍 Complexity: {info['complexity']}\n\n"
-            
-            response += f"**Recommendation:** {analysis['recommendation']}\n\n"
-            
-            if info['complexity'] == "high":
-                response += "⚠️ **Note:** This path has many subdirectories. Consider:\n"
-                response += "• Using more specific starting points\n"
-                response += "• Setting stricter filters\n"
-                response += "• Using 'exclude_dirs' to skip unnecessary folders"
-            
-            return [TextContent(type="text", text=response)]
+    if cache_info['other_files']:
+        response += f"\n📎 Other files: {len(cache_info['other_files'])}\n"
 
-        elif name == "search_documents":
-            # Show search is starting
-            start_path = arguments.get("start_path", str(Path.home()))
-            
-            response = "🔍 **Starting Document Search...**\n"
-            response += f"📍 Starting from: `{start_path}`\n"
-            response += "⏳ This may take a while depending on the directory size...\n\n"
-            
-            # Run search
-            search_result = search_files_in_path(
-                start_path=arguments.get("start_path"),
-                extensions=arguments.get("extensions"),
-                exclude_dirs=arguments.get("exclude_dirs"),
-                max_results=arguments.get("max_results", 1000),
-                min_size_kb=arguments.get("min_size_kb", 0),
-                max_size_mb=arguments.get("max_size_mb"),
-                modified_after=arguments.get("modified_after"),
-                search_term=arguments.get("search_term"),
-                show_progress=True
-            )
-            
-            if "error" in search_result:
-                return [TextContent(type="text", text=f"❌ Search error: {search_result['error']}")]
-            
-            # Format results
-            response = f"✅ **Search {search_result['status'].title()}**\n\n"
-            
-            # Statistics
-            stats = search_result["statistics"]
-            response += f"**Search Statistics:**\n"
-            response += f"• 📊 Files found: {search_result['total_found']}\n"
-            response += f"• 📂 Directories scanned: {stats['dirs_scanned']}\n"
-            response += f"• 📄 Files examined: {stats['files_scanned']}\n"
-            response += f"• ⏱️ Time: {stats['elapsed_seconds']:.1f} seconds\n"
-            response += f"• 🚀 Speed: {stats['files_per_second']:.1f} files/second\n\n"
-            
-            if search_result['total_found'] > 0:
-                # Group results by type
-                by_type = {}
-                for doc in search_result['results']:
-                    doc_type = doc['type']
-                    if doc_type not in by_type:
-                        by_type[doc_type] = []
-                    by_type[doc_type].append(doc)
-                
-                response += "**Results by Type:**\n"
-                for doc_type, docs in sorted(by_type.items()):
-                    response += f"\n**{doc_type}** ({len(docs)} files):\n"
-                    
-                    # Show first 5 of each type
-                    for i, doc in enumerate(docs[:5]):
-                        response += f"{i+1}. {doc['name']}\n"
-                        response += f"   📁 {doc['directory']}\n"
-                        response += f"   💾 {doc['size_mb']:.1f} MB\n"
-                        response += f"   📅 Modified: {doc['modified'][:10]}\n"
-                    
-                    if len(docs) > 5:
-                        response += f"   ... and {len(docs) - 5} more {doc_type} files\n"
-                
-                response += f"\n💾 **Cache Key:** `{search_result['cache_key']}`\n"
-                response += "💡 Use 'get_search_results' with this cache key to retrieve full results\n"
-            else:
-                response += "📭 No documents found matching your criteria.\n\n"
-                response += "💡 Try:\n"
-                response += "• Using a different starting path\n"
-                response += "• Relaxing your search filters\n"
-                response += "• Checking 'get_recommended_search_paths' for better locations"
-            
-            return [TextContent(type="text", text=response)]
+    response += f"\n💡 Use 'clear_all_cache' to remove all cached data."
 
-        elif name == "stop_search":
-            result = stop_document_search()
-            
-            if result["status"] == "no_search":
-                response = "ℹ️ No search is currently running."
-            else:
-                response = "🛑 " + result["message"]
-            
-            return [TextContent(type="text", text=response)]
+    return [TextContent(type="text", text=response)]
 
-        elif name == "get_search_results":
-            cache_key = arguments["cache_key"]
-            result = get_cached_search_results(cache_key)
-            
-            if "error" in result:
-                response = f"❌ {result['error']}\n\n"
-                if result.get("available_keys"):
-                    response += "Recent cache keys:\n"
-                    for key in result["available_keys"]:
-                        response += f"• `{key}`\n"
-                return [TextContent(type="text", text=response)]
-            
-            # Format full results
-            response = f"📋 **Cached Search Results**\n"
-            response += f"Cache key: `{cache_key}`\n"
-            response += f"Total results: {result['total_results']}\n\n"
-            
-            # Group by directory
-            by_dir = {}
-            for doc in result['results']:
-                dir_path = doc['directory']
-                if dir_path not in by_dir:
-                    by_dir[dir_path] = []
-                by_dir[dir_path].append(doc)
-            
-            # Show results organized by directory
-            for dir_path, docs in sorted(by_dir.items()):
-                response += f"\n📁 **{dir_path}**\n"
-                for doc in docs:
-                    response += f"  • {doc['name']} ({doc['type']}, {doc['size_mb']:.1f} MB)\n"
-            
-            response += f"\n💡 Use 'load_document' with the full path to process any of these files."
-            
-            return [TextContent(type="text", text=response)]
-        else:
-            return [TextContent(type="text", text=f"❌ Unknown tool: {name}")]
-            
+
+def _tool_get_recommended_search_paths(arguments: Dict[str, Any]) -> List[TextContent]:
+    recommendations = get_recommended_search_paths()
+
+    if not recommendations:
+        return [TextContent(type="text", text="❌ No recommended paths found on your system")]
+
+    response = "🔍 **Recommended Search Starting Points:**\n\n"
+
+    # Group by category
+    by_category = {}
+    for rec in recommendations:
+        cat = rec["category"]
+        if cat not in by_category:
+            by_category[cat] = []
+        by_category[cat].append(rec)
+
+    # Display by category
+    category_names = {
+        "primary": "📁 Primary Folders",
+        "cloud": "☁️ Cloud Storage",
+        "work": "💼 Work/Projects",
+        "shared": "👥 Shared Folders",
+        "external": "💾 External Storage",
+        "general": "🏠 General"
+    }
+
+    for category in ["primary", "work", "cloud", "shared", "external", "general"]:
+        if category in by_category:
+            response += f"**{category_names.get(category, category.title())}:**\n"
+
+            for rec in by_category[category]:
+                response += f"\n📍 **{rec['description']}**\n"
+                response += f"   Path: `{rec['path']}`\n"
+
+                if rec['immediate_docs'] > 0:
+                    response += f"   📄 {rec['immediate_docs']} documents found (immediate)\n"
+                    response += f"   💾 {rec['immediate_size_mb']:.1f} MB\n"
+
+                if rec['subdirs'] > 0:
+                    response += f"   📂 {rec['subdirs']} subdirectories\n"
+
+            response += "\n"
+
+    response += "💡 **Tips:**\n"
+    response += "• Use 'analyze_search_path' to get more details about a specific path\n"
+    response += "• Primary folders are usually the best starting points\n"
+    response += "• Cloud folders may take longer to search"
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_analyze_search_path(arguments: Dict[str, Any]) -> List[TextContent]:
+    path = arguments["path"]
+    analysis = analyze_path_for_search(path)
+
+    if "error" in analysis:
+        return [TextContent(type="text", text=f"❌ {analysis['error']}")]
+
+    response = f"📊 **Path Analysis:**\n\n"
+    response += f"📍 Path: `{analysis['path']}`\n\n"
+
+    info = analysis["analysis"]
+    response += f"**Quick Statistics:**\n"
+    response += f"• 📄 Documents (immediate): {info['immediate_documents']}\n"
+    response += f"• 📈 Estimated total documents: {info['estimated_total_documents']}\n"
+    response += f"• 📂 Subdirectories: {info['subdirectories']}\n"
+    response += f"• ⏱️ Estimated search time: {info['estimated_search_seconds']} seconds\n"
+    response += f"• 🔍 Complexity: {info['complexity']}\n\n"
+
+    response += f"**Recommendation:** {analysis['recommendation']}\n\n"
+
+    if info['complexity'] == "high":
+        response += "⚠️ **Note:** This path has many subdirectories. Consider:\n"
+        response += "• Using more specific starting points\n"
+        response += "• Setting stricter filters\n"
+        response += "• Using 'exclude_dirs' to skip unnecessary folders"
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_search_documents(arguments: Dict[str, Any]) -> List[TextContent]:
+    # Show search is starting
+    start_path = arguments.get("start_path", str(Path.home()))
+
+    response = "🔍 **Starting Document Search...**\n"
+    response += f"📍 Starting from: `{start_path}`\n"
+    response += "⏳ This may take a while depending on the directory size...\n\n"
+
+    # Run search
+    search_result = search_files_in_path(
+        start_path=arguments.get("start_path"),
+        extensions=arguments.get("extensions"),
+        exclude_dirs=arguments.get("exclude_dirs"),
+        max_results=_int_arg(arguments, "max_results", 1000),
+        min_size_kb=arguments.get("min_size_kb", 0),
+        max_size_mb=arguments.get("max_size_mb"),
+        modified_after=arguments.get("modified_after"),
+        search_term=arguments.get("search_term"),
+        show_progress=True
+    )
+
+    if "error" in search_result:
+        return [TextContent(type="text", text=f"❌ Search error: {search_result['error']}")]
+
+    # Format results
+    response = f"✅ **Search {search_result['status'].title()}**\n\n"
+
+    # Statistics
+    stats = search_result["statistics"]
+    response += f"**Search Statistics:**\n"
+    response += f"• 📊 Files found: {search_result['total_found']}\n"
+    response += f"• 📂 Directories scanned: {stats['dirs_scanned']}\n"
+    response += f"• 📄 Files examined: {stats['files_scanned']}\n"
+    response += f"• ⏱️ Time: {stats['elapsed_seconds']:.1f} seconds\n"
+    response += f"• 🚀 Speed: {stats['files_per_second']:.1f} files/second\n\n"
+
+    if search_result['total_found'] > 0:
+        # Group results by type
+        by_type = {}
+        for doc in search_result['results']:
+            doc_type = doc['type']
+            if doc_type not in by_type:
+                by_type[doc_type] = []
+            by_type[doc_type].append(doc)
+
+        response += "**Results by Type:**\n"
+        for doc_type, docs in sorted(by_type.items()):
+            response += f"\n**{doc_type}** ({len(docs)} files):\n"
+
+            # Show first 5 of each type
+            for i, doc in enumerate(docs[:5]):
+                response += f"{i+1}. {doc['name']}\n"
+                response += f"   📁 {doc['directory']}\n"
+                response += f"   💾 {doc['size_mb']:.1f} MB\n"
+                response += f"   📅 Modified: {doc['modified'][:10]}\n"
+
+            if len(docs) > 5:
+                response += f"   ... and {len(docs) - 5} more {doc_type} files\n"
+
+        response += f"\n💾 **Cache Key:** `{search_result['cache_key']}`\n"
+        response += "💡 Use 'get_search_results' with this cache key to retrieve full results\n"
+    else:
+        response += "📭 No documents found matching your criteria.\n\n"
+        response += "💡 Try:\n"
+        response += "• Using a different starting path\n"
+        response += "• Relaxing your search filters\n"
+        response += "• Checking 'get_recommended_search_paths' for better locations"
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_stop_search(arguments: Dict[str, Any]) -> List[TextContent]:
+    result = stop_document_search()
+
+    if result["status"] == "no_search":
+        response = "ℹ️ No search is currently running."
+    else:
+        response = "🛑 " + result["message"]
+
+    return [TextContent(type="text", text=response)]
+
+
+def _tool_get_search_results(arguments: Dict[str, Any]) -> List[TextContent]:
+    cache_key = arguments["cache_key"]
+    result = get_cached_search_results(cache_key)
+
+    if "error" in result:
+        response = f"❌ {result['error']}\n\n"
+        if result.get("available_keys"):
+            response += "Recent cache keys:\n"
+            for key in result["available_keys"]:
+                response += f"• `{key}`\n"
+        return [TextContent(type="text", text=response)]
+
+    # Format full results
+    response = f"📋 **Cached Search Results**\n"
+    response += f"Cache key: `{cache_key}`\n"
+    response += f"Total results: {result['total_results']}\n\n"
+
+    # Group by directory
+    by_dir = {}
+    for doc in result['results']:
+        dir_path = doc['directory']
+        if dir_path not in by_dir:
+            by_dir[dir_path] = []
+        by_dir[dir_path].append(doc)
+
+    # Show results organized by directory (up to max_results lines, so build in parts)
+    parts = [response]
+    for dir_path, docs in sorted(by_dir.items()):
+        parts.append(f"\n📁 **{dir_path}**\n")
+        parts.extend(f"  • {doc['name']} ({doc['type']}, {doc['size_mb']:.1f} MB)\n" for doc in docs)
+
+    parts.append(f"\n💡 Use 'load_document' with the full path to process any of these files.")
+
+    return [TextContent(type="text", text="".join(parts))]
+
+
+# Tool name -> handler; each handler returns the tool's TextContent list
+TOOL_HANDLERS = {
+    "get_current_directory": _tool_get_current_directory,
+    "set_current_directory": _tool_set_current_directory,
+    "get_directory_info": _tool_get_directory_info,
+    "list_documents": _tool_list_documents,
+    "load_document": _tool_load_document,
+    "set_visual_analysis": _tool_set_visual_analysis,
+    "get_visual_analysis_status": _tool_get_visual_analysis_status,
+    "reset_initial_setup": _tool_reset_initial_setup,
+    "ask_question": _tool_ask_question,
+    "summarize_document": _tool_summarize_document,
+    "process_all_documents": _tool_process_all_documents,
+    "search_by_content": _tool_search_by_content,
+    "load_document_by_summary_search": _tool_load_document_by_summary_search,
+    "get_document_summaries": _tool_get_document_summaries,
+    "clear_all_cache": _tool_clear_all_cache,
+    "get_cache_info": _tool_get_cache_info,
+    "get_recommended_search_paths": _tool_get_recommended_search_paths,
+    "analyze_search_path": _tool_analyze_search_path,
+    "search_documents": _tool_search_documents,
+    "stop_search": _tool_stop_search,
+    "get_search_results": _tool_get_search_results,
+}
+
+def _call_tool_sync(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Blocking implementation of call_tool."""
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return [TextContent(type="text", text=f"❌ Unknown tool: {name}")]
+    
+    try:
+        return handler(arguments)
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -2814,10 +3199,59 @@ async def run_mcp_server():
             server.create_initialization_options()
         )
 
-def main():
+async def run_scenario(scenario_path: str, csv_path: Optional[str] = None) -> None:
+    """
+    Replay a JSON list of {"tool": ..., "args": {...}} steps through call_tool
+    without a client, timing every call (for regression and profiling runs).
+    
+    Steps run one after another, so each step's seconds cover only its own
+    call (tool calls share one worker, so overlapped steps would also count
+    the time spent queued behind each other). Writes a tool,args_hash,seconds
+    CSV to csv_path (stdout if not given); the total wall time goes to stderr.
+    """
+    with open(scenario_path, 'r', encoding='utf-8') as f:
+        steps = json.load(f)
+    if isinstance(steps, dict):
+        steps = steps.get("steps", [])
+    
+    async def _timed(step):
+        args = step.get("args") or {}
+        start = time.perf_counter()
+        result = await call_tool(step["tool"], args)
+        elapsed = time.perf_counter() - start
+        args_hash = hashlib.sha1(_tool_cache_key(step["tool"], args)[1].encode("utf-8")).hexdigest()[:12]
+        status = "❌" if _is_error(result) else "✅"
+        print(f"{status} {step['tool']} ({elapsed:.3f}s)", file=sys.stderr)
+        return step["tool"], args_hash, elapsed
+    
+    timings = []
+    total_start = time.perf_counter()
+    for step in steps:
+        timings.append(await _timed(step))
+    print(f"⏱️ Scenario finished: {len(timings)} calls in {time.perf_counter() - total_start:.3f}s", file=sys.stderr)
+    
+    out = open(csv_path, 'w', newline='', encoding='utf-8') if csv_path else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["tool", "args_hash", "seconds"])
+        for tool, args_hash, seconds in timings:
+            writer.writerow([tool, args_hash, f"{seconds:.6f}"])
+    finally:
+        if csv_path:
+            out.close()
+
+def main(argv: Optional[List[str]] = None):
     """Entry point for docsray mcp command (sync version for PyPI)."""
+    parser = argparse.ArgumentParser(description="DocsRay MCP server")
+    parser.add_argument("--scenario", help="Replay tool calls from a JSON scenario file instead of serving")
+    parser.add_argument("--csv", help="Write scenario timings to this CSV file (default: stdout)")
+    args = parser.parse_args(argv)
+    
     try:
-        asyncio.run(run_mcp_server())
+        if args.scenario:
+            asyncio.run(run_scenario(args.scenario, args.csv))
+        else:
+            asyncio.run(run_mcp_server())
     except KeyboardInterrupt:
         print("\n🛑 MCP Server stopped by user", file=sys.stderr)
     except Exception as e:
@@ -7,7 +7,16 @@ ROOT = pathlib.Path(__file__).resolve().parents[2]
 sys.path.append(str(ROOT))
 
 import json
-from docsray.inference.embedding_model import embedding_model
+import numpy as np
+from docsray.inference.embedding_model import get_embedding_model
+from docsray.config import PQ_MIN_CHUNKS
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+PQ_NPROBE = 16  # IVF cells visited per query
 
 def build_chunk_index(chunks):
     """
@@ -23,16 +32,69 @@ def build_chunk_index(chunks):
         [{ "embedding": [...], "metadata": {...} }, ...]
     """
     
-    contents = [c["content"] for c in chunks]
-    embeddings = embedding_model.get_embeddings(contents)  # shape: (N, emb_dim)
-
-    index_data = []
-    for i, emb in enumerate(embeddings):
-        index_data.append({
-            "embedding": emb.tolist(),
-            "metadata": chunks[i]
-        })
-    return index_data
+    builder = ChunkIndexBuilder()
+    builder.update(chunks)
+    return builder.index_data
+
+class ChunkIndexBuilder:
+    """
+    Incremental version of :func:`build_chunk_index`: feed chunks batch by
+    batch (e.g. page by page while extraction is still running) with
+    :meth:`update`; the finished index is ``index_data``.
+    """
+
+    def __init__(self):
+        self.index_data = []
+
+    def update(self, chunks):
+        if not chunks:
+            return
+        contents = [c["content"] for c in chunks]
+        embeddings = get_embedding_model().get_embeddings(contents)  # shape: (N, emb_dim)
+
+        for i, emb in enumerate(embeddings):
+            self.index_data.append({
+                "embedding": emb.tolist(),
+                "metadata": chunks[i]
+            })
+
+def build_pq_index(embs, nlist=None, m=None, nbits=8):
+    """
+    Build a faiss IVF-PQ (inner product) index over an (N, D) embedding matrix.
+
+    Returns None when faiss is not installed or there are fewer than
+    PQ_MIN_CHUNKS rows (too few to train the codebooks, and brute force is
+    fast enough there). By default nlist ~ 4*sqrt(N) and one sub-quantizer
+    per 8 dimensions.
+    """
+    if faiss is None:
+        return None
+    embs = np.ascontiguousarray(embs, dtype=np.float32)
+    n, d = embs.shape
+    if n < PQ_MIN_CHUNKS:
+        return None
+
+    nlist = nlist or max(1, int(4 * np.sqrt(n)))
+    m = m or max(1, d // 8)
+    while d % m:
+        m -= 1
+    quantizer = faiss.IndexFlatIP(d)
+    index = faiss.IndexIVFPQ(quantizer, d, nlist, m, nbits, faiss.METRIC_INNER_PRODUCT)
+    index.train(embs)
+    index.add(embs)
+    index.nprobe = min(nlist, PQ_NPROBE)
+    return index
+
+def serialize_pq_index(index) -> bytes:
+    return faiss.serialize_index(index).tobytes()
+
+def load_pq_index(path):
+    """Load an index written with serialize_pq_index, or None if unavailable"""
+    if faiss is None or not os.path.exists(path):
+        return None
+    index = faiss.deserialize_index(np.fromfile(path, dtype=np.uint8))
+    faiss.extract_index_ivf(index).nprobe = PQ_NPROBE
+    return index
 
 if __name__ == "__main__":
     chunk_folder = "data/chunks"
@@ -72,6 +72,34 @@ def chunk_text(text: str,
         start += step
     return chunks
 
+def chunk_page(page_idx: int,
+               text: str,
+               pdf_path: str = "",
+               section_title: str = "Others") -> List[Dict[str, Any]]:
+    """
+    Chunk a single page. Used directly when pages are streamed from the
+    extractor; file path and section title can be filled in later with
+    :func:`assign_page_metadata` once the whole document is known.
+    """
+    return [
+        {
+            "file_path": pdf_path,
+            "page_idx": page_idx,
+            "section_title": section_title,
+            "chunk_index": c_i,
+            "content": c_text
+        }
+        for c_i, c_text in enumerate(chunk_text(text))
+    ]
+
+def assign_page_metadata(chunks: List[Dict[str, Any]], json_data: Dict[str, Any]) -> None:
+    """Fill in ``file_path`` and ``section_title`` (in place) from the extracted document"""
+    pdf_path = json_data["file_path"]
+    toc = [(0, s["title"], s["start_page"]) for s in json_data["sections"]]
+    for chunk in chunks:
+        chunk["file_path"] = pdf_path
+        chunk["section_title"] = get_section_of_page(chunk["page_idx"], toc)
+
 def process_extracted_file(json_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     json_data: {
@@ -89,15 +117,7 @@ def process_extracted_file(json_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     for page_idx, text in enumerate(pages_text):
         section_title = get_section_of_page(page_idx, toc)
         # chunkify
-        splitted = chunk_text(text)
-        for c_i, c_text in enumerate(splitted):
-            chunked_result.append({
-                "file_path": pdf_path,
-                "page_idx": page_idx,
-                "section_title": section_title,
-                "chunk_index": c_i,
-                "content": c_text
-            })
+        chunked_result.extend(chunk_page(page_idx, text, pdf_path, section_title))
     return chunked_result
 
 if __name__ == "__main__":
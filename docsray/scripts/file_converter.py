@@ -5,6 +5,7 @@ docsray/scripts/file_converter.py
 Convert various file formats to PDF for processing
 """
 
+import functools
 import os
 import sys
 from pathlib import Path
@@ -1413,6 +1414,11 @@ class FileConverter:
         except Exception as e:
             return False, f"Video conversion failed: {str(e)}"
 
+@functools.lru_cache(maxsize=1)
+def get_converter() -> FileConverter:
+    """Shared converter for the default output directory (probes LibreOffice once per process)"""
+    return FileConverter()
+
 def convert_file_to_pdf(input_path: str, output_dir: Optional[str] = None) -> Tuple[bool, str]:
     """
     Convenience function to convert a file to PDF
@@ -1424,7 +1430,7 @@ def convert_file_to_pdf(input_path: str, output_dir: Optional[str] = None) -> Tu
     Returns:
         Tuple of (success: bool, output_path_or_error: str)
     """
-    converter = FileConverter(Path(output_dir) if output_dir else None)
+    converter = FileConverter(Path(output_dir)) if output_dir else get_converter()
     return converter.convert_to_pdf(input_path)
 
 
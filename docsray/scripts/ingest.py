@@ -0,0 +1,86 @@
+# src/scripts/ingest.py
+"""
+Pipelined extract -> chunk -> embed for a single document.
+
+Extraction runs on its own thread and streams pages through a bounded queue;
+the calling thread chunks and embeds each page as it arrives, so embedding
+overlaps with extraction instead of waiting for the whole document.
+"""
+
+import queue
+import threading
+
+from docsray.scripts import pdf_extractor, chunker, build_index
+
+# Extracted pages waiting to be chunked/embedded; bounds how far extraction runs ahead
+PIPELINE_QUEUE_SIZE = 4
+
+
+class _Stopped(Exception):
+    """Raised in the extractor thread once the consumer has given up"""
+
+
+def extract_and_index(file_path, check_cancelled=None, **extract_kwargs):
+    """
+    Equivalent to ``extract_content`` -> ``process_extracted_file`` ->
+    ``build_chunk_index``, with the stages overlapped page by page.
+
+    check_cancelled, if given, is called before each page is processed;
+    raising from it aborts the pipeline (the extractor stops at its next page).
+
+    Returns (extracted, chunks, chunk_index).
+    """
+    pages = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    done = object()
+    extracted = {}
+
+    def _on_page(page_idx, page_text):
+        while True:
+            if stop.is_set():
+                raise _Stopped()
+            try:
+                pages.put((page_idx, page_text), timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _extract():
+        try:
+            extracted["result"] = pdf_extractor.extract_content(
+                file_path, page_callback=_on_page, **extract_kwargs
+            )
+        except BaseException as e:
+            extracted["error"] = e
+        finally:
+            pages.put(done)
+
+    producer = threading.Thread(target=_extract, name="docsray-extract", daemon=True)
+    producer.start()
+    chunks = []
+    index_builder = build_index.ChunkIndexBuilder()
+    try:
+        while True:
+            item = pages.get()
+            if item is done:
+                break
+            if check_cancelled is not None:
+                check_cancelled()
+            page_chunks = chunker.chunk_page(*item)
+            chunks.extend(page_chunks)
+            index_builder.update(page_chunks)
+    finally:
+        # On cancellation, unblock and stop the extractor at its next page
+        stop.set()
+        while producer.is_alive():
+            try:
+                pages.get_nowait()
+            except queue.Empty:
+                producer.join(timeout=0.1)
+    if "error" in extracted:
+        raise extracted["error"]
+    result = extracted["result"]
+
+    # Section titles are only known once the whole document is extracted
+    chunker.assign_page_metadata(chunks, result)
+    return result, chunks, index_builder.index_data
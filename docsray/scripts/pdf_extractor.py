@@ -21,16 +21,24 @@ if USE_TESSERACT:
     import pytesseract
 
 # LLM for outline generation and image analysis
-from docsray.inference.llm_model import local_llm
+from docsray.inference import llm_model  # model loads on first use of llm_model.local_llm
 
-from docsray.scripts.file_converter import FileConverter
+from docsray.scripts.file_converter import get_converter
 from pathlib import Path
 
+# Tokens reserved for the fixed instruction text around excerpts in outline prompts
+PROMPT_TEMPLATE_TOKENS = 128
+
+# Pages per extraction window; after each window MuPDF's resource cache is
+# released so memory stays bounded on very large documents
+EXTRACT_WINDOW_PAGES = 500
+
 def extract_content(file_path: str,
                    analyze_visuals: bool = True,
                    visual_analysis_interval: int = 1,
                    auto_convert: bool = True,
-                   page_limit: int=0) -> Dict[str, Any]:
+                   page_limit: int=0,
+                   page_callback=None) -> Dict[str, Any]:
     """
     Extract text from a document file with optional visual content analysis using LLM.
     Automatically converts non-PDF files to PDF if auto_convert is True.
@@ -41,6 +49,9 @@ def extract_content(file_path: str,
         Path to the document file (PDF or other supported format)
     auto_convert : bool
         Whether to automatically convert non-PDF files to PDF
+    page_callback : callable, optional
+        Called as ``page_callback(page_idx, page_text)`` as soon as each page
+        is extracted, so later stages can start before the whole document is done
     """
     input_path = Path(file_path)
     
@@ -55,7 +66,7 @@ def extract_content(file_path: str,
         print(f"📄 File is not PDF. Attempting to convert {input_path.suffix} to PDF...", file=sys.stderr)
         
         # Create converter
-        converter = FileConverter()
+        converter = get_converter()
         
         # Check if format is supported
         if not converter.is_supported(file_path):
@@ -78,7 +89,8 @@ def extract_content(file_path: str,
     
     try:
         # Call original extract_pdf_content function
-        result = extract_pdf_content(pdf_path, analyze_visuals, visual_analysis_interval, page_limit)
+        result = extract_pdf_content(pdf_path, analyze_visuals, visual_analysis_interval, page_limit,
+                                     page_callback=page_callback)
         
         # Update metadata to reflect original file
         result["metadata"]["original_file"] = str(input_path)
@@ -247,10 +259,10 @@ For each figure, identify if it's a chart/graph/diagram (and what data it shows)
     
     try:
         # Use the large model for better image understanding
-        response = local_llm.generate(prompt, images=images)
+        response = llm_model.local_llm.generate(prompt, images=images)
         
         # Clean up the response
-        cleaned_response = local_llm.strip_response(response)
+        cleaned_response = llm_model.local_llm.strip_response(response)
         
         return f"\n\n[Visual Content - Page {page_num + 1}]\n{cleaned_response}\n\n"
         
@@ -266,8 +278,8 @@ def ocr_with_llm(image: Image.Image, page_num: int) -> str:
     # OCR-specific prompt
     prompt = """Extract text from this image and present it as readable paragraphs. Start directly with the content."""
 
-    response = local_llm.generate(prompt, images=[image])
-    extracted_text = local_llm.strip_response(response)
+    response = llm_model.local_llm.generate(prompt, images=[image])
+    extracted_text = llm_model.local_llm.strip_response(response)
     return extracted_text.strip()
 
 def detect_tables(page) -> List[fitz.Rect]:
@@ -571,6 +583,9 @@ Returns a list of dicts identical in structure to build_sections_from_toc.
     # ------------------------------------------------------------------
     # 2. Boundary verification with LLM
     # ------------------------------------------------------------------
+    # Token budgets (not characters: dense scripts such as Korean run close to
+    # one token per character). The character slice stays as a cheap upper bound.
+    excerpt_tokens = (MAX_TOKENS - 100 - PROMPT_TEMPLATE_TOKENS) // 2
     verified = [0]  # always start at page 1 (idx 0)
     for b in boundaries[1:]:
         a_idx = b - 1  # last page of previous block
@@ -578,17 +593,20 @@ Returns a list of dicts identical in structure to build_sections_from_toc.
             verified.append(b)
             continue
 
-        prompt = (
-            "Below are short excerpts from two consecutive pages.\n"
-            "If both excerpts discuss the same topic, reply with '0'. "
-            "If the second excerpt introduces a new topic, reply with '1'. "
-            "Reply with a single character only.\n\n"
-            f"[Page A]\n{pages_text[a_idx][: (MAX_TOKENS - 100)//2]}\n\n"
-            f"[Page B]\n{pages_text[a_idx+1][:(MAX_TOKENS - 100)//2]}\n\n"
-        )
         try:
-            resp = local_llm.generate(prompt).strip()
-            resp = local_llm.strip_response(resp)
+            fit = llm_model.local_llm.fit_to_tokens
+            excerpt_a = fit(pages_text[a_idx][: (MAX_TOKENS - 100)//2], excerpt_tokens)
+            excerpt_b = fit(pages_text[a_idx+1][:(MAX_TOKENS - 100)//2], excerpt_tokens)
+            prompt = (
+                "Below are short excerpts from two consecutive pages.\n"
+                "If both excerpts discuss the same topic, reply with '0'. "
+                "If the second excerpt introduces a new topic, reply with '1'. "
+                "Reply with a single character only.\n\n"
+                f"[Page A]\n{excerpt_a}\n\n"
+                f"[Page B]\n{excerpt_b}\n\n"
+            )
+            resp = llm_model.local_llm.generate(prompt).strip()
+            resp = llm_model.local_llm.strip_response(resp)
 
             if "0" in resp:
                 same_topic = True 
@@ -631,10 +649,11 @@ Returns a list of dicts identical in structure to build_sections_from_toc.
     sections: List[Dict[str, Any]] = []
     for start, end in segments:
         sample_text = " ".join(pages_text[start:end])[: MAX_TOKENS - 100]  # leave space for LLM response
-        title_prompt = prompt_template.format(sample=sample_text)
         try:
-            title_line = local_llm.generate(title_prompt)
-            title_line = local_llm.strip_response(title_line).strip()
+            sample_text = llm_model.local_llm.fit_to_tokens(sample_text, MAX_TOKENS - 100 - PROMPT_TEMPLATE_TOKENS)
+            title_prompt = prompt_template.format(sample=sample_text)
+            title_line = llm_model.local_llm.generate(title_prompt)
+            title_line = llm_model.local_llm.strip_response(title_line).strip()
 
         except Exception:
             title_line = f"Miscellaneous Section {start + 1}-{end}"
@@ -790,7 +809,8 @@ def rebuild_text_from_columns(df: pd.DataFrame, line_tol: int = 8) -> str:
 def extract_pdf_content(pdf_path: str,
                        analyze_visuals: bool = True,
                        visual_analysis_interval: int = 1,
-                       page_limit: int=0) -> Dict[str, Any]:
+                       page_limit: int=0,
+                       page_callback=None) -> Dict[str, Any]:
     """
     Extract text from a PDF with optional visual content analysis using LLM.
     
@@ -798,6 +818,8 @@ def extract_pdf_content(pdf_path: str,
     -----------
     pdf_path : str
         Path to the PDF file
+    page_callback : callable, optional
+        Called as ``page_callback(page_idx, page_text)`` after each page
     """
 
     try:
@@ -809,9 +831,8 @@ def extract_pdf_content(pdf_path: str,
     # Store original document for cleanup
     original_doc = doc
     
-    if page_limit > 0:
-        doc = doc[:page_limit]
-    total_pages = len(doc)
+    # Pages are loaded one at a time (slicing the document would load them all up front)
+    total_pages = min(page_limit, doc.page_count) if page_limit > 0 else doc.page_count
     pages_text: List[str] = []
 
     print(f"Extracting content from {total_pages} pages...", file=sys.stderr)
@@ -896,6 +917,8 @@ def extract_pdf_content(pdf_path: str,
         finally:
             # Always append the result (even if empty)
             pages_text.append(page_text)
+            if page_callback is not None:
+                page_callback(i, page_text)
             
             # Clean up page resources
             if page:
@@ -904,6 +927,10 @@ def extract_pdf_content(pdf_path: str,
             # More frequent garbage collection and memory management
             if (i + 1) % 3 == 0:
                 gc.collect()
+            
+            # End of a window: free cached fonts/images/display lists
+            if (i + 1) % EXTRACT_WINDOW_PAGES == 0:
+                fitz.TOOLS.store_shrink(100)
                 
             # Progress indicator
             if (i + 1) % 5 == 0:
@@ -7,7 +7,7 @@ sys.path.append(str(ROOT))
 
 import json
 import numpy as np
-from docsray.inference.embedding_model import embedding_model
+from docsray.inference.embedding_model import get_embedding_model
 
 
 def build_section_reps(sections, chunk_index):
@@ -39,7 +39,7 @@ def build_section_reps(sections, chunk_index):
     
     # 1) Section title embeddings (batch)
     titles = [sec["title"] for sec in sections]
-    title_embs = embedding_model.get_embeddings(titles)  # shape: (num_sections, dim)
+    title_embs = get_embedding_model().get_embeddings(titles)  # shape: (num_sections, dim)
     for i, sec in enumerate(sections):
         sec["title_emb"] = title_embs[i].tolist()
 
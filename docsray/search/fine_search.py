@@ -1,12 +1,15 @@
 # src/search/fine_search.py
 import numpy as np
-import torch
+
+PQ_RERANK_K = 50  # PQ shortlist size, re-scored exactly
 
 def fine_search_chunks(query_emb,
                        chunk_index,
                        target_sections,
                        top_k: int = 10,
-                       fine_only: bool = False):
+                       fine_only: bool = False,
+                       chunk_embeddings=None,
+                       pq_index=None):
     """
     Find the most relevant text chunks within the specified sections.
 
@@ -28,6 +31,16 @@ def fine_search_chunks(query_emb,
         ]
     top_k : int, default = 10
         Number of top‑scoring chunks to return.
+    chunk_embeddings : np.ndarray, optional
+        (N, D) matrix whose row *i* is the embedding of ``chunk_index[i]``
+        (e.g. a memory-mapped cache). When given, candidate rows are gathered
+        from it instead of stacking the per-chunk embeddings. int8 codes are
+        scored directly; packed binary codes (uint8) are ranked by Hamming
+        distance to the query's sign bits.
+    pq_index : faiss.Index, optional
+        Approximate (IVF-PQ) index over the same rows. Used to shortlist
+        candidates when the whole index would otherwise be scanned; the
+        shortlist is then re-scored exactly from *chunk_embeddings*.
 
     Notes
     -----
@@ -46,35 +59,45 @@ def fine_search_chunks(query_emb,
     # 2. Filter candidates by section, unless fine_only is requested.
     # -------------------------------------------------------------
     if fine_only:
-        candidates = chunk_index
+        cand_idx = None
     else:
-        candidates = [
-            item
-            for item in chunk_index
+        cand_idx = [
+            i
+            for i, item in enumerate(chunk_index)
             if item["metadata"]["section_title"] in section_title_set
-        ] or chunk_index  # fall back to full index if filter is empty
+        ] or None  # fall back to full index if filter is empty
+    if cand_idx is None and pq_index is not None and chunk_embeddings is not None:
+        query_mat = np.asarray(query_emb, dtype=np.float32)[None, :]
+        _, ids = pq_index.search(query_mat, max(top_k, PQ_RERANK_K))
+        cand_idx = [int(i) for i in ids[0] if i >= 0] or None
+    candidates = chunk_index if cand_idx is None else [chunk_index[i] for i in cand_idx]
 
     # -------------------------------------------------------------
-    # 3. Vectorise search — build a single (N, D) matrix on CPU,
-    #    then optionally move to GPU for the dot product.
+    # 3. Vectorise search — build a single (N, D) matrix and score it
+    #    with one BLAS mat-vec on CPU.
     # -------------------------------------------------------------
-    embed_mat = np.vstack([c["embedding"] for c in candidates]).astype(np.float32)
+    if chunk_embeddings is not None:
+        # Only the candidate rows are read (faulted in, for a memory map)
+        rows = chunk_embeddings if cand_idx is None else chunk_embeddings[cand_idx]
+        if rows.dtype == np.uint8:
+            # Binary codes: fewer differing bits means more similar
+            from docsray.utils.quantize import hamming_distances
+            sims = -hamming_distances(query_emb, rows).astype(np.int64)
+            return _top_k(candidates, sims, top_k)
+        embed_mat = np.asarray(rows, dtype=np.float32)
+    else:
+        embed_mat = np.vstack([c["embedding"] for c in candidates]).astype(np.float32)
     query_vec = np.asarray(query_emb, dtype=np.float32)
 
-    # ---------- set up compute device ----------
-    if torch.cuda.is_available():
-        device = "cuda"
-    elif torch.backends.mps.is_available():
-        device = "mps"
-    else:
-        device = "cpu"
-    # -------- GPU path --------
-    embed_mat_t = torch.as_tensor(embed_mat, device=device)
-    query_vec_t = torch.as_tensor(query_vec, device=device)
-    sims_t = torch.matmul(embed_mat_t, query_vec_t)         # (N,)
-    sims = sims_t.cpu().numpy()                             # back to CPU
+    # A single query is a memory-bound mat-vec: copying the matrix to a GPU
+    # costs more than the product itself, so it stays on the CPU
+    sims = embed_mat @ query_vec                                # (N,)
+
+    return _top_k(candidates, sims, top_k)
 
 
+def _top_k(candidates, sims, top_k):
+    """Return the top_k candidates by descending score"""
     # -------------------------------------------------------------
     # 5. Partial sort — O(N log k) instead of full sort.
     # -------------------------------------------------------------
@@ -1,6 +1,5 @@
 # src/search/section_coarse_search.py
 import numpy as np
-import torch
 
 def coarse_search_sections(query_emb,
                            sections: list,
@@ -28,13 +27,6 @@ def coarse_search_sections(query_emb,
         Top-k sections sorted by combined similarity score.
     """
 
-    # ---------- set up compute device ----------
-    if torch.cuda.is_available():
-        device = "cuda"
-    elif torch.backends.mps.is_available():
-        device = "mps"
-    else:
-        device = "cpu"
     # 1. gather embeddings --------------------------------------------
     title_list, chunk_list, meta_list = [], [], []
     for sec in sections:
@@ -47,20 +39,20 @@ def coarse_search_sections(query_emb,
     if not meta_list:
         return []
 
-    # 2. numpy → torch tensors (float32) ------------------------------
-    title_mat = torch.as_tensor(title_list, dtype=torch.float32, device=device)
-    chunk_mat = torch.as_tensor(chunk_list, dtype=torch.float32, device=device)
-    query_vec = torch.as_tensor(query_emb, dtype=torch.float32, device=device)
+    # 2. stack into float32 matrices (scored on CPU; too small for a GPU
+    #    round trip to pay off) ----------------------------------------
+    title_mat = np.asarray(title_list, dtype=np.float32)
+    chunk_mat = np.asarray(chunk_list, dtype=np.float32)
+    query_vec = np.asarray(query_emb, dtype=np.float32)
 
     # 3. dot product = cosine similarity ------------------------------
     sim_title  = title_mat @ query_vec          # shape (N,)
     sim_chunk  = chunk_mat @ query_vec
     final_sims = beta * sim_title + (1 - beta) * sim_chunk
 
-    # 4. top-k on CPU for ease of use ---------------------------------
-    sims_cpu = final_sims.cpu().numpy()
-    k = min(top_k, sims_cpu.shape[0])
-    idx = np.argpartition(-sims_cpu, k - 1)[:k]
-    idx = idx[np.argsort(-sims_cpu[idx])]
+    # 4. top-k ---------------------------------------------------------
+    k = min(top_k, final_sims.shape[0])
+    idx = np.argpartition(-final_sims, k - 1)[:k]
+    idx = idx[np.argsort(-final_sims[idx])]
 
     return [meta_list[i] for i in idx]
\ No newline at end of file
@@ -1,14 +1,14 @@
 # docsray/search/vector_search.py
 
 import numpy as np
-import torch
 from typing import List, Dict, Tuple, Union
+from docsray.config import CUDA_AVAILABLE, MPS_AVAILABLE
 
 def get_device():
     """Get the best available compute device"""
-    if torch.cuda.is_available():
+    if CUDA_AVAILABLE:
         return "cuda"
-    elif torch.backends.mps.is_available():
+    elif MPS_AVAILABLE:
         return "mps"
     else:
         return "cpu"
@@ -22,18 +22,23 @@ def cosine_similarity(v1, v2):
 
 def batch_cosine_similarity(query_emb: np.ndarray, embeddings: np.ndarray, device: str = None) -> np.ndarray:
     """
-    Compute cosine similarity between a query and multiple embeddings using GPU if available
+    Compute cosine similarity between a query and multiple embeddings
     
     Args:
         query_emb: Query embedding vector (1D array)
         embeddings: Matrix of embeddings (2D array, each row is an embedding)
-        device: Device to use ('cuda', 'mps', 'cpu', or None for auto-detect)
+        device: 'cuda' or 'mps' to run the product there; by default it runs
+            on CPU, since moving the matrix for a single query costs more
+            than the mat-vec itself (use get_device() to pick the best one)
     
     Returns:
         Array of similarity scores
     """
-    if device is None:
-        device = get_device()
+    if device is None or device == "cpu":
+        embed_mat = np.asarray(embeddings, dtype=np.float32)
+        return embed_mat @ np.asarray(query_emb, dtype=np.float32)
+    
+    import torch
     
     # Convert to tensors and move to device
     query_vec = torch.as_tensor(query_emb, dtype=torch.float32, device=device)
@@ -76,7 +81,7 @@ def vector_search_optimized(
     return_scores: bool = False
 ) -> Union[List[Dict], List[Tuple[Dict, float]]]:
     """
-    Optimized vector search using GPU acceleration and vectorized operations
+    Optimized vector search using vectorized operations
     
     Args:
         query_emb: Query embedding (list or numpy array)
@@ -99,7 +104,7 @@ def vector_search_optimized(
     embed_mat = np.vstack(embeddings).astype(np.float32)
     query_vec = np.asarray(query_emb, dtype=np.float32)
     
-    # Compute similarities using GPU if available
+    # Compute similarities
     sims = batch_cosine_similarity(query_vec, embed_mat)
     
     # Partial sort - O(N log k) instead of full sort
@@ -0,0 +1,73 @@
+# src/utils/json_io.py
+"""
+Fast JSON (de)serialization for cache files.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise (both accept numpy arrays and non-string dict keys). Cache files
+are written compactly (no indentation); they are read back by DocsRay, not
+by people. Writes go through a temp file and os.replace so an interrupted
+write never leaves a truncated file behind.
+"""
+
+import contextlib
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes (numpy arrays allowed)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def loads(data):
+    """Deserialize JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@contextlib.contextmanager
+def atomic_open(path):
+    """Open a binary temp file next to path; it replaces path only if the block succeeds"""
+    # A unique name per writer, so concurrent writers of the same path never
+    # share (and interleave into) one temp file
+    path = os.fspath(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def dump_file(obj, path) -> None:
+    """Atomically write obj as compact JSON to path"""
+    data = dumps(obj)
+    with atomic_open(path) as f:
+        f.write(data)
+
+
+def load_file(path):
+    """Read a JSON file written by dump_file (or any JSON file)"""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def _default(obj):
+    # Mirror orjson's OPT_SERIALIZE_NUMPY for the stdlib fallback
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
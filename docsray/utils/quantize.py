@@ -0,0 +1,54 @@
+# src/utils/quantize.py
+"""
+Compact storage formats for L2-normalized embedding matrices.
+
+- ``int8``:   scalar quantization with one max-abs scale per matrix
+              (4x smaller than float32). Ranking by dot product is unchanged
+              by the shared scale, so the codes can be scored as is.
+- ``binary``: one sign bit per dimension, packed 8 per byte (32x smaller).
+
+``decode`` reconstructs float16 vectors when real values are needed, and
+``hamming_distances`` scores binary codes without decoding them.
+"""
+
+import numpy as np
+
+QUANT_MODES = ("none", "int8", "binary")
+
+
+def quantize(embs, mode="int8"):
+    """Return (codes, scale) for an (N, D) float matrix; scale is None for binary"""
+    embs = np.asarray(embs, dtype=np.float32)
+    if mode == "int8":
+        max_abs = float(np.abs(embs).max()) if embs.size else 0.0
+        scale = max_abs / 127.0 if max_abs > 0 else 1.0
+        codes = np.rint(embs / scale)
+        np.clip(codes, -127, 127, out=codes)
+        return codes.astype(np.int8), scale
+    if mode == "binary":
+        return np.packbits(embs > 0, axis=-1), None
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+# Set-bit count of every byte value (fallback for numpy < 2.0)
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+def hamming_distances(query_emb, codes):
+    """Hamming distance between the query's sign bits and each row of packed binary codes"""
+    codes = np.asarray(codes, dtype=np.uint8)
+    q_bits = np.packbits(np.asarray(query_emb) > 0)
+    xor = np.bitwise_xor(codes, q_bits)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor).sum(axis=1, dtype=np.uint32)
+    return _POPCOUNT[xor].sum(axis=1, dtype=np.uint32)
+
+
+def decode(codes, mode, scale=None, dim=None):
+    """Reconstruct float16 vectors from codes produced by quantize()"""
+    if mode == "int8":
+        return np.asarray(codes).astype(np.float16) * np.float16(scale)
+    if mode == "binary":
+        bits = np.unpackbits(np.asarray(codes, dtype=np.uint8), axis=-1, count=dim)
+        return bits.astype(np.float16) * 2 - 1
+    raise ValueError(f"Unknown quantization mode: {mode}")
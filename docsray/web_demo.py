@@ -7,7 +7,6 @@ import tempfile
 from pathlib import Path
 import json
 import uuid
-import pickle
 import time
 import pathlib
 import gradio as gr
@@ -20,11 +19,16 @@ import threading
 import queue
 import sys
 import concurrent.futures
+import functools
+import hashlib
 import signal
+from collections import OrderedDict
+import numpy as np
 
 from docsray.chatbot import PDFChatBot, DEFAULT_SYSTEM_PROMPT
-from docsray.scripts import pdf_extractor, chunker, build_index, section_rep_builder
-from docsray.scripts.file_converter import FileConverter
+from docsray.scripts import ingest, section_rep_builder
+from docsray.scripts.file_converter import get_converter
+from docsray.utils import json_io
 
 # Setup logging
 log_dir = Path.home() / ".docsray" / "logs"
@@ -43,7 +47,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # --- Liveness watchdog variables ---
-LAST_ACTIVITY = time.time()           # Timestamp of last successful UI update
+LAST_ACTIVITY = time.monotonic()      # Monotonic timestamp of last successful UI update
 HEALTH_TIMEOUT = 86400               # Seconds of silence → watchdog restart
 
 def safe_progress(cb, pct, msg):
@@ -54,7 +58,7 @@ def safe_progress(cb, pct, msg):
     (3) triggers auto‑recovery on lost connection.
     """
     global LAST_ACTIVITY
-    LAST_ACTIVITY = time.time()
+    LAST_ACTIVITY = time.monotonic()
     if cb is None:
         return
     try:
@@ -71,6 +75,24 @@ TEMP_DIR.mkdir(exist_ok=True)
 SESSION_TIMEOUT = 86400
 PAGE_LIMIT = None  # None means process all pages
 PDF_PROCESS_TIMEOUT = None  # None means no timeout
+CHATBOT_CACHE_SIZE = 4  # Chatbots (one per system prompt) kept per document
+
+EXAMPLE_QUESTIONS = [
+    "What is the main topic of this document?",
+    "Summarize the key findings in bullet points",
+    "What data or statistics are mentioned?",
+    "What are the conclusions or recommendations?",
+    "Explain the methodology used",
+    "What charts or figures are in this document?",
+    "List all the important dates mentioned",
+    "What are the limitations discussed?",
+]
+EXAMPLE_EMBS = {}  # Example question -> query embedding, filled at launch
+
+# Per-session documents (chunk indexes, chatbots) stay on the server; the
+# Gradio state only carries the session id
+SESSION_STORE: Dict[str, Dict] = {}
+SESSION_LOCK = threading.Lock()
 # Error recovery settings
 MAX_MEMORY_PERCENT = 90  # Restart if memory usage exceeds this
 ERROR_THRESHOLD = 1  # Number of errors before restart
@@ -192,12 +214,20 @@ class ErrorRecoveryMixin:
             current_time = time.time()
             cleaned = 0
             
-            for session_dir in TEMP_DIR.iterdir():
-                if session_dir.is_dir():
-                    dir_age = current_time - session_dir.stat().st_mtime
-                    if dir_age > SESSION_TIMEOUT:
-                        shutil.rmtree(session_dir, ignore_errors=True)
-                        cleaned += 1
+            # scandir: the entry type comes free with the listing, one stat per directory
+            with os.scandir(TEMP_DIR) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        dir_age = current_time - entry.stat(follow_symlinks=False).st_mtime
+                        if dir_age > SESSION_TIMEOUT:
+                            shutil.rmtree(entry.path, ignore_errors=True)
+                            cleaned += 1
+            
+            # Drop server-side session data that has been idle as long
+            with SESSION_LOCK:
+                for sid, session in list(SESSION_STORE.items()):
+                    if current_time - session.get("last_access", 0) > SESSION_TIMEOUT:
+                        del SESSION_STORE[sid]
             
             if cleaned > 0:
                 logger.info(f"Cleaned up {cleaned} old sessions")
@@ -212,7 +242,7 @@ def memory_monitor():
         try:
             ErrorRecoveryMixin.check_memory()
             # Watchdog: restart if no UI activity for HEALTH_TIMEOUT seconds
-            if time.time() - LAST_ACTIVITY > HEALTH_TIMEOUT:
+            if time.monotonic() - LAST_ACTIVITY > HEALTH_TIMEOUT:
                 logger.error("Health watchdog timeout, triggering recovery.")
                 ErrorRecoveryMixin.trigger_recovery("health_timeout")
             time.sleep(30)  # Check every 30 seconds
@@ -445,6 +475,12 @@ def create_session_dir() -> Path:
     session_dir.mkdir(exist_ok=True)
     return session_dir
 
+@functools.lru_cache(maxsize=1)
+def _get_process_executor():
+    """Persistent worker thread for timed document processing"""
+    # A single worker: every stage shares the llama.cpp models, which are not thread-safe
+    return concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="docsray-proc")
+
 def process_document_with_timeout(file_path: str, session_dir: Path, analyze_visuals: bool = True, progress_callback=None) -> Tuple[list, list, str]:
     """Process a document file with optional timeout handling"""
     
@@ -459,36 +495,44 @@ def process_document_with_timeout(file_path: str, session_dir: Path, analyze_vis
     # Progress: Starting
     safe_progress(progress_callback, 0.1, f"📄 Starting to process: {file_name}")
     
-    # Create a thread pool for timeout handling
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-        # Submit the processing task
-        future = executor.submit(_do_process_document, file_path, session_dir, analyze_visuals, progress_callback)
+    # Submit the processing task to the shared worker
+    cancel_event = threading.Event()
+    future = _get_process_executor().submit(
+        _do_process_document, file_path, session_dir, analyze_visuals, progress_callback, cancel_event
+    )
+    
+    try:
+        # Wait for completion with timeout
+        return future.result(timeout=PDF_PROCESS_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        # Cancel the future if possible; a running job stops at its next stage
+        future.cancel()
+        cancel_event.set()
         
-        try:
-            # Wait for completion with timeout
-            return future.result(timeout=PDF_PROCESS_TIMEOUT)
-        except concurrent.futures.TimeoutError:
-            # Cancel the future if possible
-            future.cancel()
-            
-            elapsed_time = time.time() - start_time
-            error_msg = (
-                f"⏰ Processing timeout: {file_name}\n"
-                f"⚠️ Document processing exceeded {PDF_PROCESS_TIMEOUT//60} minutes limit\n"
-                f"📊 Elapsed time: {elapsed_time:.1f} seconds\n"
-                f"💡 Try with a smaller document or disable visual analysis"
-            )
+        elapsed_time = time.time() - start_time
+        error_msg = (
+            f"⏰ Processing timeout: {file_name}\n"
+            f"⚠️ Document processing exceeded {PDF_PROCESS_TIMEOUT//60} minutes limit\n"
+            f"📊 Elapsed time: {elapsed_time:.1f} seconds\n"
+            f"💡 Try with a smaller document or disable visual analysis"
+        )
 
-            safe_progress(progress_callback, 1.0, error_msg)
+        safe_progress(progress_callback, 1.0, error_msg)
+
+        logger.error(f"PDF processing timeout for {file_name} after {elapsed_time:.1f}s")
+        gc.collect()
+        ErrorRecoveryMixin.trigger_recovery("timeout")
+        raise ProcessingTimeoutError(error_msg)
 
-            logger.error(f"PDF processing timeout for {file_name} after {elapsed_time:.1f}s")
-            gc.collect()
-            ErrorRecoveryMixin.trigger_recovery("timeout")
-            raise ProcessingTimeoutError(error_msg)
-        
 
+def _check_cancelled(cancel_event):
+    """Abort a timed-out job between processing stages"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise ProcessingTimeoutError("Processing cancelled")
 
-def _do_process_document(file_path: str, session_dir: Path, analyze_visuals: bool = True, progress_callback=None) -> Tuple[list, list, str]:
+
+
+def _do_process_document(file_path: str, session_dir: Path, analyze_visuals: bool = True, progress_callback=None, cancel_event=None) -> Tuple[list, list, str]:
     """Actual document processing function (runs in thread with timeout)"""
     start_time = time.time()
     file_name = Path(file_path).name
@@ -499,7 +543,7 @@ def _do_process_document(file_path: str, session_dir: Path, analyze_visuals: boo
                     "analyze_visuals": analyze_visuals
                 }
         if progress_callback is not None:
-            status_msg = f"📖 Extracting content from {file_name}..."
+            status_msg = f"📖 Extracting content from {file_name} (chunking and indexing pages as they arrive)..."
             if analyze_visuals:
                 status_msg += " (with visual analysis)"
                 # Only apply page_limit if it's set and greater than 0
@@ -510,28 +554,11 @@ def _do_process_document(file_path: str, session_dir: Path, analyze_visuals: boo
                     status_msg += "\n📄 Processing all pages"
             safe_progress(progress_callback, 0.2, status_msg)
 
-        extracted = pdf_extractor.extract_content(file_path, **extract_kwargs)
-
-        # Create chunks
-        if progress_callback is not None:
-            progress_msg = "✂️ Creating text chunks..."
-            # Show elapsed time
-            elapsed = time.time() - start_time
-            if elapsed > 10:  # Show elapsed time after 10 seconds
-                progress_msg += f" ({elapsed:.0f}s elapsed)"
-            safe_progress(progress_callback, 0.4, progress_msg)
-
-        chunks = chunker.process_extracted_file(extracted)
-
-        # Build search index
-        if progress_callback is not None:
-            progress_msg = "🔍 Building search index..."
-            elapsed = time.time() - start_time
-            if elapsed > 10:
-                progress_msg += f" ({elapsed:.0f}s elapsed)"
-            safe_progress(progress_callback, 0.6, progress_msg)
-
-        chunk_index = build_index.build_chunk_index(chunks)
+        # Extraction, chunking and embedding overlap page by page
+        extracted, chunks, chunk_index = ingest.extract_and_index(
+            file_path, check_cancelled=lambda: _check_cancelled(cancel_event), **extract_kwargs
+        )
+        _check_cancelled(cancel_event)
 
         # Build section representations
         if progress_callback is not None:
@@ -547,17 +574,9 @@ def _do_process_document(file_path: str, session_dir: Path, analyze_visuals: boo
         if progress_callback is not None:
             safe_progress(progress_callback, 0.9, "💾 Saving to cache...")
 
-        cache_data = {
-            "sections": sections,
-            "chunk_index": chunk_index,
-            "filename": file_name,
-            "metadata": extracted.get("metadata", {})
-        }
-
-        # Save with pickle for better performance
-        cache_file = session_dir / f"{Path(file_path).stem}_cache.pkl"
-        with open(cache_file, "wb") as f:
-            pickle.dump(cache_data, f)
+        _save_session_cache(session_dir, Path(file_path).stem, sections, chunk_index,
+                            file_name, extracted.get("metadata", {}),
+                            _source_fingerprint(file_path, analyze_visuals))
 
         # Calculate processing time
         elapsed_time = time.time() - start_time
@@ -588,22 +607,89 @@ def _do_process_document(file_path: str, session_dir: Path, analyze_visuals: boo
         raise
 
 
+def _source_fingerprint(file_path: str, analyze_visuals: bool) -> Dict:
+    """Identify an upload and the options that shape its index (cache validity key)"""
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for block in iter(functools.partial(f.read, 1 << 20), b""):
+            digest.update(block)
+    return {"sha1": digest.hexdigest(), "analyze_visuals": bool(analyze_visuals), "page_limit": PAGE_LIMIT}
+
+
+def _save_session_cache(session_dir: Path, stem: str, sections, chunk_index, file_name: str,
+                        metadata: Dict, source: Dict):
+    """Save a processed document as a float16 embedding matrix plus a JSON sidecar"""
+    # Chunk vectors go to {stem}_vecs.npy (reopened with mmap_mode="r");
+    # each chunk in the JSON refers to its row by vec_id
+    vec_path = session_dir / f"{stem}_vecs.npy"
+    if chunk_index:
+        vecs = np.asarray([c["embedding"] for c in chunk_index], dtype=np.float16)
+        with json_io.atomic_open(vec_path) as f:
+            np.save(f, vecs)
+    else:
+        vec_path.unlink(missing_ok=True)
+
+    json_io.dump_file({
+        "sections": sections,
+        "chunks": [{"vec_id": i, "metadata": c["metadata"]} for i, c in enumerate(chunk_index)],
+        "filename": file_name,
+        "metadata": metadata,
+        "source": source,
+    }, session_dir / f"{stem}_cache.json")
+
+
+def _open_session_vecs(session_dir: Path, stem: str):
+    """Memory-map a document's saved embedding matrix (None if it has no chunks)"""
+    vec_path = session_dir / f"{stem}_vecs.npy"
+    return np.load(vec_path, mmap_mode="r") if vec_path.exists() else None
+
+
+def _load_session_cache(session_dir: Path, stem: str, source: Dict):
+    """Return (sections, chunk_index, vecs) saved for this exact upload, or None"""
+    cache_path = session_dir / f"{stem}_cache.json"
+    if not cache_path.exists():
+        return None
+    try:
+        data = json_io.load_file(cache_path)
+        if data.get("source") != source:
+            return None
+        vecs = _open_session_vecs(session_dir, stem)
+        chunk_index = [
+            {"embedding": vecs[c["vec_id"]], "metadata": c["metadata"]} for c in data["chunks"]
+        ]
+        return data["sections"], chunk_index, vecs
+    except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable session cache for {stem}: {e}")
+        return None
+
+
 # Remove the wrapper function and use direct call
 def process_document(file_path: str, session_dir: Path, analyze_visuals: bool = True, progress_callback=None) -> Tuple[list, list, str]:
     """Process a document file with error recovery and timeout"""
     return process_document_with_timeout(file_path, session_dir, analyze_visuals, progress_callback)
 
+def _get_session(session_state: Dict, create: bool = False) -> Optional[Dict]:
+    """Server-side data for this browser session; created on demand when create=True"""
+    with SESSION_LOCK:
+        sid = session_state.get("sid")
+        session = SESSION_STORE.get(sid) if sid else None
+        if session is None and create:
+            sid = uuid.uuid4().hex
+            session = {"session_dir": str(create_session_dir()), "documents": {}}
+            SESSION_STORE[sid] = session
+            session_state["sid"] = sid
+        if session is not None:
+            session["last_access"] = time.time()
+        return session
+
 def load_document(file, analyze_visuals: bool, session_state: Dict, progress=gr.Progress()) -> Tuple[Dict, str, gr.update]:
     """Load and process uploaded document with error recovery"""
     if file is None:
         return session_state, "Please upload a document", gr.update()
     
     # Initialize session if needed
-    if "session_dir" not in session_state:
-        session_state["session_dir"] = str(create_session_dir())
-        session_state["documents"] = {}
-    
-    session_dir = Path(session_state["session_dir"])
+    session = _get_session(session_state, create=True)
+    session_dir = Path(session["session_dir"])
     
     # Copy file to session directory
     file_name = Path(file.name).name
@@ -628,30 +714,45 @@ def load_document(file, analyze_visuals: bool, session_state: Dict, progress=gr.
         initial_message += "\n⚡ Visual analysis disabled (faster)"
     
     safe_progress(progress, 0.05, initial_message)
-    shutil.copy(file.name, dest_path)
+    # copyfile uses os.sendfile on Linux (in-kernel copy); mode bits aren't needed
+    shutil.copyfile(file.name, dest_path)
     
     try:
-        # Process document with visual analysis option and timeout
-        sections, chunk_index, msg = process_document(
-            str(dest_path), 
-            session_dir,
-            analyze_visuals=analyze_visuals,
-            progress_callback=progress
-        )
+        doc_id = Path(file_name).stem
+        
+        # Re-uploading the same file with the same options reuses its saved index
+        cached = _load_session_cache(session_dir, doc_id, _source_fingerprint(str(dest_path), analyze_visuals))
+        if cached is not None:
+            sections, chunk_index, chunk_embeddings = cached
+            msg = f"♻️ Reused cached index for: {file_name}\n"
+            msg += f"📑 Sections: {len(sections)}\n"
+            msg += f"🔍 Chunks: {len(chunk_index)}"
+            safe_progress(progress, 1.0, "✅ Loaded from cache!")
+        else:
+            # Process document with visual analysis option and timeout
+            sections, chunk_index, msg = process_document(
+                str(dest_path), 
+                session_dir,
+                analyze_visuals=analyze_visuals,
+                progress_callback=progress
+            )
+            # The matrix just saved is shared with the chatbot instead of re-stacked
+            chunk_embeddings = _open_session_vecs(session_dir, doc_id) if sections is not None else None
         
         if sections is not None:
             # Store in session
-            doc_id = Path(file_name).stem
-            session_state["documents"][doc_id] = {
+            session["documents"][doc_id] = {
                 "filename": file_name,
                 "sections": sections,
                 "chunk_index": chunk_index,
+                "chunk_embeddings": chunk_embeddings,
                 "path": str(dest_path)
             }
-            session_state["current_doc"] = doc_id
+            _get_chatbot(session["documents"][doc_id], DEFAULT_SYSTEM_PROMPT)
+            session["current_doc"] = doc_id
             
             # Update dropdown
-            choices = [doc["filename"] for doc in session_state["documents"].values()]
+            choices = [doc["filename"] for doc in session["documents"].values()]
             dropdown_update = gr.update(
                 choices=choices, 
                 value=file_name, 
@@ -689,32 +790,56 @@ def load_document(file, analyze_visuals: bool, session_state: Dict, progress=gr.
         return session_state, display_msg, gr.update()
 
 
+def _get_chatbot(doc: Dict, system_prompt: str) -> PDFChatBot:
+    """Return the document's chatbot for this system prompt, building it on first use"""
+    chatbots = doc.setdefault("chatbots", OrderedDict())
+    chatbot = chatbots.get(system_prompt)
+    if chatbot is not None:
+        chatbots.move_to_end(system_prompt)
+        return chatbot
+
+    # Normally the memory-mapped matrix saved with the document; stacked here
+    # (once, shared by all its chatbots) only if that file is unavailable
+    if doc.get("chunk_embeddings") is None:
+        chunk_index = doc["chunk_index"]
+        doc["chunk_embeddings"] = (
+            np.asarray([c["embedding"] for c in chunk_index], dtype=np.float32) if chunk_index else None
+        )
+    chatbot = PDFChatBot(
+        doc["sections"], doc["chunk_index"],
+        system_prompt=system_prompt, chunk_embeddings=doc["chunk_embeddings"]
+    )
+    chatbots[system_prompt] = chatbot
+    while len(chatbots) > CHATBOT_CACHE_SIZE:
+        chatbots.popitem(last=False)
+    return chatbot
+
 def ask_question(question: str, session_state: Dict, system_prompt: str, use_coarse: bool, progress=gr.Progress()) -> Tuple[str, str]:
     """Process a question with error recovery"""
     if not question.strip():
         return "Please enter a question", ""
     
-    if "current_doc" not in session_state or not session_state.get("documents"):
+    session = _get_session(session_state)
+    if not session or "current_doc" not in session or not session.get("documents"):
         return "Please upload a document first", ""
     
     try:
         # Get current document
-        current_doc = session_state["documents"][session_state["current_doc"]]
-        sections = current_doc["sections"]
-        chunk_index = current_doc["chunk_index"]
+        current_doc = session["documents"][session["current_doc"]]
         
         safe_progress(progress, 0.2, "🤔 Thinking about your question...")
         
-        # Create chatbot and get answer
+        # Reuse the document's chatbot for this prompt
         prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
-        chatbot = PDFChatBot(sections, chunk_index, system_prompt=prompt)
+        chatbot = _get_chatbot(current_doc, prompt)
         
         safe_progress(progress, 0.5, "🔍 Searching relevant sections...")
         
-        # Get answer
+        # Get answer (example questions reuse their precomputed embedding)
         answer_output, reference_output = chatbot.answer(
             question, 
-            fine_only=not use_coarse
+            fine_only=not use_coarse,
+            question_emb=EXAMPLE_EMBS.get(question)
         )
         
         safe_progress(progress, 1.0, "✅ Answer ready!")
@@ -743,13 +868,14 @@ def ask_question(question: str, session_state: Dict, system_prompt: str, use_coa
     
 def switch_document(selected_file: str, session_state: Dict) -> Tuple[Dict, str]:
     """Switch to a different loaded document"""
-    if not selected_file or "documents" not in session_state:
+    session = _get_session(session_state)
+    if not selected_file or not session:
         return session_state, "No document selected"
     
     # Find document by filename
-    for doc_id, doc_info in session_state["documents"].items():
+    for doc_id, doc_info in session["documents"].items():
         if doc_info["filename"] == selected_file:
-            session_state["current_doc"] = doc_id
+            session["current_doc"] = doc_id
             
             # Get document info
             sections = doc_info["sections"]
@@ -765,9 +891,11 @@ def switch_document(selected_file: str, session_state: Dict) -> Tuple[Dict, str]
 
 def clear_session(session_state: Dict) -> Tuple[Dict, str, gr.update, gr.update, gr.update]:
     """Clear all documents and reset session"""
-    # Clean up session directory
-    if "session_dir" in session_state:
-        session_dir = Path(session_state["session_dir"])
+    # Drop the server-side data and clean up the session directory
+    with SESSION_LOCK:
+        session = SESSION_STORE.pop(session_state.get("sid"), None)
+    if session is not None:
+        session_dir = Path(session["session_dir"])
         if session_dir.exists():
             shutil.rmtree(session_dir, ignore_errors=True)
     
@@ -782,9 +910,10 @@ def clear_session(session_state: Dict) -> Tuple[Dict, str, gr.update, gr.update,
         gr.update(value="")   # references
     )
 
+@functools.lru_cache(maxsize=1)
 def get_supported_formats() -> str:
-    """Get list of supported file formats"""
-    converter = FileConverter()
+    """Get list of supported file formats (computed once; the converter set doesn't change at runtime)"""
+    converter = get_converter()
     formats = converter.get_supported_formats()
     
     # Group by category
@@ -805,214 +934,209 @@ def get_supported_formats() -> str:
 
     return info
 
-# Create Gradio interface with error handling
-try:
-    with gr.Blocks(
-        title="DocsRay - Universal Document Q&A",
-        theme=gr.themes.Soft(
-            primary_hue="indigo",
-            secondary_hue="purple",
-            neutral_hue="slate",
-            font=[gr.themes.GoogleFont("Noto Sans KR"), gr.themes.GoogleFont("Inter")]
-        ),
-        css=CUSTOM_CSS
-    ) as demo:
-        header_html = """
-        <div style="text-align: center; padding: 20px 0;">
-            <h1 style="font-size: 32px; font-weight: 700; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); -webkit-background-clip: text; -webkit-text-fill-color: transparent; margin-bottom: 8px;">
-                🚀 DocsRay
-            </h1>
-            <p style="font-size: 18px; color: #6b7280; font-weight: 500;">
-                Universal Document Q&A System
-            </p>
-            <p style="font-size: 14px; color: #9ca3af; max-width: 600px; margin: 8px auto;">
-                Upload any document (PDF, Word, Excel, PowerPoint, Images, etc.) and ask questions about it!
-                All processing happens in your session - no login required.
-            </p></div>"""
-
-        # Create the Markdown component
-        gr.Markdown(
-            header_html,
-            elem_classes=["header-section"]
-        )
+def build_demo():
+    """Create the Gradio interface (built by main(), so importing this module stays cheap)"""
+    try:
+        with gr.Blocks(
+            title="DocsRay - Universal Document Q&A",
+            theme=gr.themes.Soft(
+                primary_hue="indigo",
+                secondary_hue="purple",
+                neutral_hue="slate",
+                font=[gr.themes.GoogleFont("Noto Sans KR"), gr.themes.GoogleFont("Inter")]
+            ),
+            css=CUSTOM_CSS
+        ) as demo:
+            header_html = """
+            <div style="text-align: center; padding: 20px 0;">
+                <h1 style="font-size: 32px; font-weight: 700; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); -webkit-background-clip: text; -webkit-text-fill-color: transparent; margin-bottom: 8px;">
+                    🚀 DocsRay
+                </h1>
+                <p style="font-size: 18px; color: #6b7280; font-weight: 500;">
+                    Universal Document Q&A System
+                </p>
+                <p style="font-size: 14px; color: #9ca3af; max-width: 600px; margin: 8px auto;">
+                    Upload any document (PDF, Word, Excel, PowerPoint, Images, etc.) and ask questions about it!
+                    All processing happens in your session - no login required.
+                </p></div>"""
+
+            # Create the Markdown component
+            gr.Markdown(
+                header_html,
+                elem_classes=["header-section"]
+            )
                 
-        # Session state
-        session_state = gr.State({})
+            # Session state
+            session_state = gr.State({})
         
-        # Main layout
-        with gr.Row():
-            # Left column - Document management
-            with gr.Column(scale=1):
-                gr.Markdown("### 📁 Document Management")
+            # Main layout
+            with gr.Row():
+                # Left column - Document management
+                with gr.Column(scale=1):
+                    gr.Markdown("### 📁 Document Management")
                 
-                # File upload
-                file_input = gr.File(
-                        label="Upload Document",
-                        file_types=[
-                            ".pdf", 
-                            ".docx", ".doc", 
-                            ".hwpx", ".hwp",
-                            ".xlsx", ".xls", 
-                            ".pptx", ".ppt",
-                            ".txt", 
-                            ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".tif", ".webp",
-                            ".mp3", ".wav", ".m4a", ".flac", ".ogg", ".wma", ".aac",
-                            ".mp4", ".avi", ".mov", ".wmv", ".flv", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg",
-                        ],
-                        type="filepath",
-                      )
-
-                # Visual analysis toggle
-                with gr.Row():
-                    analyze_visuals_checkbox = gr.Checkbox(
-                        label="👁️ Analyze Visual Content",
-                        value=True,
-                        info="Extract and analyze images, charts, and figures (slower processing)",
-                    )
+                    # File upload
+                    file_input = gr.File(
+                            label="Upload Document",
+                            file_types=[
+                                ".pdf", 
+                                ".docx", ".doc", 
+                                ".hwpx", ".hwp",
+                                ".xlsx", ".xls", 
+                                ".pptx", ".ppt",
+                                ".txt", 
+                                ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff", ".tif", ".webp",
+                                ".mp3", ".wav", ".m4a", ".flac", ".ogg", ".wma", ".aac",
+                                ".mp4", ".avi", ".mov", ".wmv", ".flv", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg",
+                            ],
+                            type="filepath",
+                          )
+
+                    # Visual analysis toggle
+                    with gr.Row():
+                        analyze_visuals_checkbox = gr.Checkbox(
+                            label="👁️ Analyze Visual Content",
+                            value=True,
+                            info="Extract and analyze images, charts, and figures (slower processing)",
+                        )
                 
-                upload_btn = gr.Button("📤 Process Document", variant="primary", size="lg")
+                    upload_btn = gr.Button("📤 Process Document", variant="primary", size="lg")
                 
-                # Document selector (hidden initially)
-                doc_dropdown = gr.Dropdown(
-                    label="Loaded Documents",
-                    choices=[],
-                    visible=False,
-                    interactive=True,
-                    elem_id="doc-dropdown"
-                )
+                    # Document selector (hidden initially)
+                    doc_dropdown = gr.Dropdown(
+                        label="Loaded Documents",
+                        choices=[],
+                        visible=False,
+                        interactive=True,
+                        elem_id="doc-dropdown"
+                    )
                 
-                # Status with better styling
-                status = gr.Textbox(
-                    label="Status", 
-                    lines=5, 
-                    interactive=False,
-                    show_label=True
-                )
+                    # Status with better styling
+                    status = gr.Textbox(
+                        label="Status", 
+                        lines=5, 
+                        interactive=False,
+                        show_label=True
+                    )
                 
-                # Action buttons in a row
-                with gr.Row():
-                    clear_btn = gr.Button("🗑️ Clear Session", variant="stop", size="sm")
-                    refresh_btn = gr.Button("🔄 Refresh", variant="secondary", size="sm")
+                    # Action buttons in a row
+                    with gr.Row():
+                        clear_btn = gr.Button("🗑️ Clear Session", variant="stop", size="sm")
+                        refresh_btn = gr.Button("🔄 Refresh", variant="secondary", size="sm")
                 
-                # Supported formats in accordion
-                with gr.Accordion("📋 Supported Formats", open=False):
-                    gr.Markdown(get_supported_formats())
+                    # Supported formats in accordion
+                    with gr.Accordion("📋 Supported Formats", open=False):
+                        gr.Markdown(get_supported_formats())
             
-            # Right column - Q&A interface
-            with gr.Column(scale=2):
-                gr.Markdown("### 💬 Ask Questions")
+                # Right column - Q&A interface
+                with gr.Column(scale=2):
+                    gr.Markdown("### 💬 Ask Questions")
                 
-                # Question input
-                question_input = gr.Textbox(
-                    label="Your Question",
-                    placeholder="What would you like to know about the document?",
-                    lines=2,
-                    autofocus=True
-                )
-                
-                # Search options in a row
-                with gr.Row():
-                    use_coarse = gr.Checkbox(
-                        label="Use Coarse-to-Fine Search",
-                        value=True,
+                    # Question input
+                    question_input = gr.Textbox(
+                        label="Your Question",
+                        placeholder="What would you like to know about the document?",
+                        lines=2,
+                        autofocus=True
                     )
-                    ask_btn = gr.Button("🔍 Ask Question", variant="primary", size="lg")
                 
-                # Results in tabs
-                with gr.Tabs():
-                    with gr.TabItem("💡 Answer"):
-                        answer_output = gr.Textbox(
-                            label="",
-                            lines=12,
-                            interactive=False
+                    # Search options in a row
+                    with gr.Row():
+                        use_coarse = gr.Checkbox(
+                            label="Use Coarse-to-Fine Search",
+                            value=True,
                         )
+                        ask_btn = gr.Button("🔍 Ask Question", variant="primary", size="lg")
+                
+                    # Results in tabs
+                    with gr.Tabs():
+                        with gr.TabItem("💡 Answer"):
+                            answer_output = gr.Textbox(
+                                label="",
+                                lines=12,
+                                interactive=False
+                            )
                     
-                    with gr.TabItem("📚 References"):
-                        reference_output = gr.Textbox(
-                            label="",
-                            lines=10,
-                            interactive=False
-                        )
+                        with gr.TabItem("📚 References"):
+                            reference_output = gr.Textbox(
+                                label="",
+                                lines=10,
+                                interactive=False
+                            )
                 
-                # System prompt in accordion
-                with gr.Accordion("⚙️ Advanced Settings", open=False):
-                    prompt_input = gr.Textbox(
-                        label="System Prompt",
-                        lines=5,
-                        value=DEFAULT_SYSTEM_PROMPT,
-                        info="Customize how the AI responds"
-                    )
+                    # System prompt in accordion
+                    with gr.Accordion("⚙️ Advanced Settings", open=False):
+                        prompt_input = gr.Textbox(
+                            label="System Prompt",
+                            lines=5,
+                            value=DEFAULT_SYSTEM_PROMPT,
+                            info="Customize how the AI responds"
+                        )
         
-        # Examples section
-        with gr.Row():
-            gr.Examples(
-                examples=[
-                    ["What is the main topic of this document?"],
-                    ["Summarize the key findings in bullet points"],
-                    ["What data or statistics are mentioned?"],
-                    ["What are the conclusions or recommendations?"],
-                    ["Explain the methodology used"],
-                    ["What charts or figures are in this document?"],
-                    ["List all the important dates mentioned"],
-                    ["What are the limitations discussed?"],
-                ],
-                inputs=question_input,
-                label="Example Questions"
-            )
+            # Examples section
+            with gr.Row():
+                gr.Examples(
+                    examples=[[q] for q in EXAMPLE_QUESTIONS],
+                    inputs=question_input,
+                    label="Example Questions"
+                )
         
-        # Update event handlers
-        upload_btn.click(
-            load_document,
-            inputs=[file_input, analyze_visuals_checkbox, session_state],
-            outputs=[session_state, status, doc_dropdown],
-            show_progress=True
-        ).then(
-            lambda: gr.update(value=None),
-            outputs=[file_input]
-        )
+            # Update event handlers
+            upload_btn.click(
+                load_document,
+                inputs=[file_input, analyze_visuals_checkbox, session_state],
+                outputs=[session_state, status, doc_dropdown],
+                show_progress=True
+            ).then(
+                lambda: gr.update(value=None),
+                outputs=[file_input]
+            )
 
-        doc_dropdown.change(
-            switch_document,
-            inputs=[doc_dropdown, session_state],
-            outputs=[session_state, status]
-        )
+            doc_dropdown.change(
+                switch_document,
+                inputs=[doc_dropdown, session_state],
+                outputs=[session_state, status]
+            )
         
-        ask_btn.click(
-            ask_question,
-            inputs=[question_input, session_state, prompt_input, use_coarse],
-            outputs=[answer_output, reference_output],
-            show_progress=True
-        )
+            ask_btn.click(
+                ask_question,
+                inputs=[question_input, session_state, prompt_input, use_coarse],
+                outputs=[answer_output, reference_output],
+                show_progress=True
+            )
         
-        question_input.submit(
-            ask_question,
-            inputs=[question_input, session_state, prompt_input, use_coarse],
-            outputs=[answer_output, reference_output],
-            show_progress=True
-        )
+            question_input.submit(
+                ask_question,
+                inputs=[question_input, session_state, prompt_input, use_coarse],
+                outputs=[answer_output, reference_output],
+                show_progress=True
+            )
         
-        clear_btn.click(
-            clear_session,
-            inputs=[session_state],
-            outputs=[session_state, status, doc_dropdown, answer_output, reference_output]
-        )
+            clear_btn.click(
+                clear_session,
+                inputs=[session_state],
+                outputs=[session_state, status, doc_dropdown, answer_output, reference_output]
+            )
         
-        refresh_btn.click(
-            lambda s: (s, "🔄 Refreshed", gr.update()),
-            inputs=[session_state],
-            outputs=[session_state, status, doc_dropdown]
-        )
+            refresh_btn.click(
+                lambda s: (s, "🔄 Refreshed", gr.update()),
+                inputs=[session_state],
+                outputs=[session_state, status, doc_dropdown]
+            )
 
-except Exception as e:
-    logger.critical(f"Failed to create Gradio interface: {e}")
-    ErrorRecoveryMixin.trigger_recovery("interface_creation_failed")
+        return demo
+    except Exception as e:
+        logger.critical(f"Failed to create Gradio interface: {e}")
+        ErrorRecoveryMixin.trigger_recovery("interface_creation_failed")
+        # Never hand main() a None to launch if recovery returns
+        raise
 
 def cleanup_old_sessions():
     """Clean up old session directories (called periodically)"""
     ErrorRecoveryMixin.cleanup_temp_files()
 
-def main():
-    """Entry point for docsray-web command with error recovery"""
+def _build_parser():
+    """Argument parser for the standalone docsray-web entry point"""
     import argparse
     
     parser = argparse.ArgumentParser(description="Launch DocsRay web interface")
@@ -1021,7 +1145,16 @@ def main():
     parser.add_argument("--host", type=str, default="0.0.0.0", help="Host address")
     parser.add_argument("--timeout", type=int, default=None, help="PDF processing timeout in seconds (no timeout if not specified)")
     parser.add_argument("--pages", type=int, default=None, help="Maximum pages to process during visual analysis (all pages if not specified)") 
-    args = parser.parse_args()
+    return parser
+
+def main(args=None):
+    """Entry point for docsray-web command with error recovery
+    
+    `args` may be an already-parsed namespace (e.g. from `docsray web`) with
+    share/port/host/timeout/pages attributes; otherwise sys.argv is parsed.
+    """
+    if args is None:
+        args = _build_parser().parse_args()
     
     # Update global timeout if specified
     global PDF_PROCESS_TIMEOUT, HEALTH_TIMEOUT
@@ -1038,6 +1171,14 @@ def main():
     # Clean up old sessions before starting
     cleanup_old_sessions()
     
+    # Embed the example questions once, so clicking one skips the query encode
+    try:
+        from docsray.inference.embedding_model import get_embedding_model
+        embs = get_embedding_model().get_embeddings(EXAMPLE_QUESTIONS, is_query=True)
+        EXAMPLE_EMBS.update(zip(EXAMPLE_QUESTIONS, embs))
+    except Exception as e:
+        logger.warning(f"Could not precompute example question embeddings: {e}")
+    
     logger.info(f"🚀 Starting DocsRay Web Interface")
     logger.info(f"📍 Local URL: http://localhost:{args.port}")
     logger.info(f"🌐 Network URL: http://{args.host}:{args.port}")
@@ -1050,6 +1191,9 @@ def main():
     else:
         logger.info(f"📄 Page Limit: No limit")
     
+    global demo
+    demo = build_demo()
+    
     try:
         demo.launch(
             server_name=args.host,